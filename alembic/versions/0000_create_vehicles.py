@@ -0,0 +1,38 @@
+"""create vehicles
+
+Revision ID: 0000_vehicles
+Revises: 
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0000_vehicles'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Базы, созданные create_all до появления миграций, уже содержат таблицу
+    # в этом виде: для них ревизия только отмечается как примененная
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('vehicles'):
+        return
+    op.create_table(
+        'vehicles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('license_plate', sa.String(), nullable=False),
+        sa.Column('vehicle_type', sa.Enum('CAR', 'TRUCK', 'MOTORCYCLE', name='vehicletype'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('license_plate'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('vehicles')
+    sa.Enum(name='vehicletype').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,44 @@
+"""create access_events
+
+Revision ID: 0001_access_events
+Revises: 0000_vehicles
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_access_events'
+down_revision: Union[str, None] = '0000_vehicles'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'access_events',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('license_plate', sa.String(), nullable=False),
+        sa.Column('plate_key', sa.String(), nullable=False),
+        sa.Column('access_granted', sa.Boolean(), nullable=False),
+        sa.Column('lane', sa.String(), nullable=True),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('matched_plate', sa.String(), nullable=True),
+        sa.Column('match_distance', sa.Float(), nullable=True),
+        sa.Column('ocr_confidence', sa.Float(), nullable=True),
+        sa.Column('decision_ms', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_access_events_plate_key_created_at', 'access_events', ['plate_key', 'created_at'])
+    op.create_index('ix_access_events_created_at', 'access_events', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_access_events_created_at', table_name='access_events')
+    op.drop_index('ix_access_events_plate_key_created_at', table_name='access_events')
+    op.drop_table('access_events')
@@ -0,0 +1,91 @@
+"""add vehicles.plate_key
+
+Revision ID: 0002_plate_key
+Revises: 0001_access_events
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_plate_key'
+down_revision: Union[str, None] = '0001_access_events'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Число строк, обновляемых одним UPDATE при заполнении ключей
+BACKFILL_BATCH_SIZE = 10000
+
+# Нормализация номера в том виде, в каком она была при создании ревизии
+# (src.utils.plate_format.normalize_plate): ревизия не импортирует код
+# приложения, поэтому его изменения не меняют заполненные ею ключи
+LATIN_LETTERS = 'ABEKMHOPCTYX'
+CYRILLIC_LETTERS = 'АВЕКМНОРСТУХ'
+FOLD_TABLE = str.maketrans(LATIN_LETTERS, CYRILLIC_LETTERS)
+NOISE_RE = re.compile(r'[\W_]+')
+
+OFFLINE_BACKFILL_SQL = (
+    "UPDATE vehicles SET plate_key = translate("
+    "upper(regexp_replace(license_plate, '[^[:alnum:]]', '', 'g')), "
+    f"'{LATIN_LETTERS}', '{CYRILLIC_LETTERS}')"
+)
+
+
+def plate_key(license_plate: str) -> str:
+    """Ключ номера: верхний регистр, без пробелов и знаков, латиница заменена кириллицей."""
+    return NOISE_RE.sub('', license_plate.upper()).translate(FOLD_TABLE)
+
+
+def backfill_plate_keys(connection, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Заполняет plate_key для существующих строк пачками по id.
+
+    Нормализация (замена латинских букв кириллическими) выполняется
+    в Python копией plate_key этой ревизии, поэтому одинакова для любой СУБД.
+
+    :return: Число обновленных строк.
+    """
+    vehicles = sa.table('vehicles', sa.column('id', sa.Integer), sa.column('license_plate', sa.String),
+                        sa.column('plate_key', sa.String))
+    update = (
+        sa.update(vehicles)
+        .where(vehicles.c.id == sa.bindparam('row_id'))
+        .values(plate_key=sa.bindparam('key'))
+    )
+    updated = 0
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(vehicles.c.id, vehicles.c.license_plate)
+            .where(vehicles.c.id > last_id, vehicles.c.plate_key.is_(None))
+            .order_by(vehicles.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        connection.execute(update, [{'row_id': row.id, 'key': plate_key(row.license_plate)} for row in rows])
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column('vehicles', sa.Column('plate_key', sa.String(), nullable=True))
+    if op.get_context().as_sql:
+        # В режиме --sql строк нет: ключ вычисляется выражением PostgreSQL с той же нормализацией
+        op.execute(OFFLINE_BACKFILL_SQL)
+    else:
+        backfill_plate_keys(op.get_bind())
+    with op.batch_alter_table('vehicles') as batch_op:
+        batch_op.alter_column('plate_key', existing_type=sa.String(), nullable=False)
+    op.create_index('ix_vehicles_plate_key', 'vehicles', ['plate_key'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vehicles_plate_key', table_name='vehicles')
+    op.drop_column('vehicles', 'plate_key')
+
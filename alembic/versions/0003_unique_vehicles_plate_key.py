@@ -0,0 +1,54 @@
+"""make vehicles.plate_key unique
+
+Revision ID: 0003_unique_plate_key
+Revises: 0002_plate_key
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_unique_plate_key'
+down_revision: Union[str, None] = '0002_plate_key'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# Написания одного номера латиницей и кириллицей ("A123BC77" и "А123ВС77")
+# до появления ключа импортировались разными строками: остается самая ранняя,
+# остальные перед удалением копируются в DUPLICATES_TABLE для разбора вручную
+DUPLICATES_TABLE = 'vehicles_plate_key_duplicates'
+DUPLICATE_ROWS = (
+    "id NOT IN (SELECT min_id FROM (SELECT MIN(id) AS min_id FROM vehicles GROUP BY plate_key) AS first_rows)"
+)
+COPY_DUPLICATES_SQL = f"INSERT INTO {DUPLICATES_TABLE} SELECT * FROM vehicles WHERE {DUPLICATE_ROWS}"
+DEDUPLICATE_SQL = f"DELETE FROM vehicles WHERE {DUPLICATE_ROWS}"
+
+
+def upgrade() -> None:
+    op.execute(f"CREATE TABLE {DUPLICATES_TABLE} AS SELECT * FROM vehicles WHERE 1 = 0")
+    op.execute(COPY_DUPLICATES_SQL)
+    if not op.get_context().as_sql:
+        count = op.get_bind().execute(sa.text(f"SELECT COUNT(*) FROM {DUPLICATES_TABLE}")).scalar()
+        if count:
+            logger.warning(
+                "Удалено %s повторных номеров с одинаковым plate_key, копии сохранены в таблице %s",
+                count, DUPLICATES_TABLE,
+            )
+    op.execute(DEDUPLICATE_SQL)
+    op.drop_index('ix_vehicles_plate_key', table_name='vehicles')
+    op.create_index('ix_vehicles_plate_key', 'vehicles', ['plate_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vehicles_plate_key', table_name='vehicles')
+    op.create_index('ix_vehicles_plate_key', 'vehicles', ['plate_key'])
+    # Удаленные при обновлении строки возвращаются на место
+    op.execute(f"INSERT INTO vehicles SELECT * FROM {DUPLICATES_TABLE}")
+    op.drop_table(DUPLICATES_TABLE)
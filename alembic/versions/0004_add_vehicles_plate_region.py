@@ -0,0 +1,93 @@
+"""split vehicles.plate_key into plate_number and plate_region
+
+Revision ID: 0004_plate_region
+Revises: 0003_unique_plate_key
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_plate_region'
+down_revision: Union[str, None] = '0003_unique_plate_key'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Число строк, обновляемых одним UPDATE при заполнении частей ключа
+BACKFILL_BATCH_SIZE = 10000
+
+# Код региона - 2-3 последние цифры после буквы (копия src.utils.plate_format.split_plate
+# на момент создания ревизии): ключ уже нормализован ревизией 0002
+REGION_PATTERN = r'^(.*\D)(\d{2,3})$'
+REGION_RE = re.compile(REGION_PATTERN)
+
+OFFLINE_BACKFILL_SQL = (
+    "UPDATE vehicles SET "
+    r"plate_number = coalesce(substring(plate_key from '^(.*\D)\d{2,3}$'), plate_key), "
+    r"plate_region = substring(plate_key from '^.*\D(\d{2,3})$')"
+)
+
+
+def split_plate_key(key: str):
+    """Делит ключ номера на номер без региона и код региона (None, если не выделен)."""
+    match = REGION_RE.match(key)
+    if match is None:
+        return key, None
+    return match.group(1), match.group(2)
+
+
+def backfill_plate_parts(connection, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Заполняет plate_number и plate_region существующих строк пачками по id.
+
+    :return: Число обновленных строк.
+    """
+    vehicles = sa.table('vehicles', sa.column('id', sa.Integer), sa.column('plate_key', sa.String),
+                        sa.column('plate_number', sa.String), sa.column('plate_region', sa.String))
+    update = (
+        sa.update(vehicles)
+        .where(vehicles.c.id == sa.bindparam('row_id'))
+        .values(plate_number=sa.bindparam('number'), plate_region=sa.bindparam('region'))
+    )
+    updated = 0
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(vehicles.c.id, vehicles.c.plate_key)
+            .where(vehicles.c.id > last_id, vehicles.c.plate_number.is_(None))
+            .order_by(vehicles.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        parts = [(row.id, split_plate_key(row.plate_key)) for row in rows]
+        connection.execute(
+            update, [{'row_id': row_id, 'number': number, 'region': region} for row_id, (number, region) in parts]
+        )
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column('vehicles', sa.Column('plate_number', sa.String(), nullable=True))
+    op.add_column('vehicles', sa.Column('plate_region', sa.String(), nullable=True))
+    if op.get_context().as_sql:
+        # В режиме --sql строк нет: части ключа выделяются выражениями PostgreSQL с тем же шаблоном
+        op.execute(OFFLINE_BACKFILL_SQL)
+    else:
+        backfill_plate_parts(op.get_bind())
+    with op.batch_alter_table('vehicles') as batch_op:
+        batch_op.alter_column('plate_number', existing_type=sa.String(), nullable=False)
+    op.create_index('ix_vehicles_plate_region_plate_number', 'vehicles', ['plate_region', 'plate_number'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vehicles_plate_region_plate_number', table_name='vehicles')
+    with op.batch_alter_table('vehicles') as batch_op:
+        batch_op.drop_column('plate_region')
+        batch_op.drop_column('plate_number')
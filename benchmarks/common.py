@@ -0,0 +1,99 @@
+"""Общие функции бенчмарков: перцентили задержек и сравнение с базовым результатом."""
+
+import json
+import statistics
+from typing import Dict, List
+
+
+def percentiles(samples) -> dict:
+    """p50/p95/p99 и среднее в миллисекундах."""
+    ordered = sorted(samples)
+
+    def at(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": at(0.50),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+    }
+
+
+def summarize(samples, elapsed: float, items: int = None) -> dict:
+    """
+    Перцентили задержек и пропускная способность сценария.
+
+    :param samples: Задержки отдельных операций в секундах.
+    :param elapsed: Общее время сценария в секундах.
+    :param items: Число обработанных элементов (кадров, номеров), по умолчанию - число операций.
+    :return: Словарь с throughput_per_s и полями percentiles().
+    """
+    items = len(samples) if items is None else items
+    return {"throughput_per_s": items / elapsed if elapsed > 0 else 0.0, **percentiles(samples)}
+
+
+# Метрики, по которым сравниваются сценарии, и направление "лучше"
+COMPARED_METRICS = {"p50_ms": "lower", "p95_ms": "lower", "p99_ms": "lower", "throughput_per_s": "higher"}
+
+# Метрики, ухудшение которых считается регрессией. Хвосты p95/p99 на общих
+# машинах CI зависят от соседних процессов, поэтому только сравниваются
+GATED_METRICS = ("p50_ms", "throughput_per_s")
+
+
+def compare_to_baseline(
+    report: dict,
+    baseline: dict,
+    tolerance: float = 0.25,
+    min_delta_ms: float = 1.0,
+    gated_metrics=GATED_METRICS,
+) -> List[Dict]:
+    """
+    Сравнивает сценарии отчета с базовым отчетом.
+
+    :param report: Текущий отчет ({"scenarios": {имя: метрики}}).
+    :param baseline: Базовый отчет того же формата.
+    :param tolerance: Допустимое относительное ухудшение (0.25 - на 25%).
+    :param min_delta_ms: Ухудшение задержки меньше этого значения не считается
+        регрессией: хвосты субмиллисекундных задержек зашумлены планировщиком.
+    :param gated_metrics: Метрики, ухудшение которых отмечается как регрессия.
+    :return: Список сравнений {scenario, metric, baseline, current, change, regression};
+        change - относительное изменение, положительное - улучшение.
+    """
+    comparisons = []
+    for name, current in report.get("scenarios", {}).items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        for metric, better in COMPARED_METRICS.items():
+            if not previous.get(metric) or metric not in current:
+                continue
+            delta = current[metric] - previous[metric]
+            change = delta / previous[metric]
+            significant = True
+            if better == "lower":
+                change = -change
+                significant = delta >= min_delta_ms
+            comparisons.append(
+                {
+                    "scenario": name,
+                    "metric": metric,
+                    "baseline": previous[metric],
+                    "current": current[metric],
+                    "change": change,
+                    "regression": metric in gated_metrics and change < -tolerance and significant,
+                }
+            )
+    return comparisons
+
+
+def load_report(path: str) -> dict:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_report(report: dict, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+        file.write("\n")
@@ -0,0 +1,150 @@
+"""
+Проверка совпадения боксов и FPS бэкендов детектора с эталоном.
+
+Эталон - исходные веса через ultralytics (--reference), кандидат -
+экспортированная модель (--candidate, --backend). Оба детектора
+обрабатывают одни и те же кадры: изображения из --images или кадры
+генератора синтетических номеров, после предобработки детектора
+(Config.DETECTOR_PREPROCESS). Для каждого кадра сравниваются лучшие боксы
+(как их выбирает plate_recognition): кадр считается совпавшим, если оба
+детектора ничего не нашли или IoU боксов не меньше --iou. Для каждого
+детектора измеряются задержки и FPS на поток вычислений (--threads).
+С --min-agreement процесс завершается с кодом 1, если доля совпавших
+кадров меньше заданной.
+
+Запуск:
+    python -m benchmarks.detector_parity --candidate models/yolov8s_int8.onnx --backend onnxruntime --threads 1
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import cv2
+
+from benchmarks.common import summarize
+
+
+def box_iou(first, second) -> float:
+    """IoU двух боксов (x, y, w, h, ...)."""
+    x1, y1 = max(first[0], second[0]), max(first[1], second[1])
+    x2 = min(first[0] + first[2], second[0] + second[2])
+    y2 = min(first[1] + first[3], second[1] + second[3])
+    intersection = max(0, x2 - x1) * max(0, y2 - y1)
+    union = first[2] * first[3] + second[2] * second[3] - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def compare_detections(reference, candidate, iou_threshold: float = 0.9) -> dict:
+    """
+    Сравнивает лучшие боксы двух детекторов по кадрам.
+
+    :param reference: Боксы эталона по кадрам: (x, y, w, h, confidence) или None.
+    :param candidate: Боксы кандидата в том же формате.
+    :param iou_threshold: Минимальный IoU совпавших боксов.
+    :return: Доля совпавших кадров, средний IoU и наибольшая разница уверенности
+        для кадров, где номер нашли оба детектора, число пропусков и лишних боксов.
+    """
+    agreed = missed = extra = 0
+    ious, confidence_deltas = [], []
+    for expected, actual in zip(reference, candidate):
+        if expected is None or actual is None:
+            agreed += expected is None and actual is None
+            missed += expected is not None and actual is None
+            extra += expected is None and actual is not None
+            continue
+        iou = box_iou(expected, actual)
+        ious.append(iou)
+        confidence_deltas.append(abs(expected[4] - actual[4]))
+        agreed += iou >= iou_threshold
+    return {
+        "frames": len(reference),
+        "agreement": agreed / len(reference) if reference else 0.0,
+        "mean_iou": sum(ious) / len(ious) if ious else None,
+        "max_confidence_delta": max(confidence_deltas) if confidence_deltas else None,
+        "missed": missed,
+        "extra": extra,
+    }
+
+
+def load_frames(images: str, count: int, seed: int):
+    if images:
+        paths = sorted(glob.glob(os.path.join(images, "*.jpg")) + glob.glob(os.path.join(images, "*.png")))[:count]
+        return [cv2.imread(path) for path in paths]
+    from benchmarks.preprocess import make_samples
+
+    return make_samples(count, 1280, 720, seed)[0]
+
+
+def run_detector(detector, frames):
+    """Лучший бокс каждого кадра и задержки вызовов детектора."""
+    from src.recognition.image_processing import get_preprocess_pipeline
+    from src.recognition.plate_recognition import _select_best_box
+
+    pipeline = get_preprocess_pipeline("detector")
+    inputs = [pipeline(frame).copy() if pipeline is not None else frame for frame in frames]
+    detector(inputs[0])  # Прогрев
+    boxes, samples = [], []
+    started_at = time.perf_counter()
+    for frame, image in zip(frames, inputs):
+        call_started_at = time.perf_counter()
+        result = detector(image)[0]
+        samples.append(time.perf_counter() - call_started_at)
+        boxes.append(
+            _select_best_box(
+                result.boxes, frame.shape, (frame.shape[1] / image.shape[1], frame.shape[0] / image.shape[0])
+            )
+        )
+    return boxes, summarize(samples, time.perf_counter() - started_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Совпадение боксов и FPS бэкенда детектора с эталоном")
+    parser.add_argument("--reference", default="models/yolov8s.pt", help="Эталонные веса (ultralytics)")
+    parser.add_argument("--candidate", required=True, help="Проверяемая модель")
+    parser.add_argument("--backend", default="onnxruntime", help="Бэкенд проверяемой модели")
+    parser.add_argument("--imgsz", type=int, default=640, help="Сторона входа моделей")
+    parser.add_argument("--threads", type=int, default=1, help="Потоков вычислений на детектор")
+    parser.add_argument("--images", default=None, help="Каталог кадров (по умолчанию - синтетические)")
+    parser.add_argument("--frames", type=int, default=200, help="Число кадров")
+    parser.add_argument("--seed", type=int, default=23)
+    parser.add_argument("--iou", type=float, default=0.9, help="Минимальный IoU совпавших боксов")
+    parser.add_argument("--min-agreement", type=float, default=None, help="Код 1, если доля совпадений ниже")
+    parser.add_argument("--output", default=None, help="Файл для JSON-отчета")
+    args = parser.parse_args()
+
+    from src.recognition.detector import create_detector
+
+    frames = load_frames(args.images, args.frames, args.seed)
+    report = {"environment": {"frames": len(frames), "imgsz": args.imgsz, "threads": args.threads}}
+    boxes = {}
+    for name, backend, path in (
+        ("reference", "ultralytics", args.reference),
+        ("candidate", args.backend, args.candidate),
+    ):
+        detector = create_detector(backend, path, args.imgsz, args.threads)
+        boxes[name], timing = run_detector(detector, frames)
+        report[name] = {
+            "backend": backend,
+            "path": path,
+            **timing,
+            "fps_per_thread": timing["throughput_per_s"] / max(1, args.threads),
+        }
+    report["parity"] = compare_detections(boxes["reference"], boxes["candidate"], args.iou)
+    report["speedup"] = report["candidate"]["throughput_per_s"] / report["reference"]["throughput_per_s"]
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    print(text)
+    if args.min_agreement is not None and report["parity"]["agreement"] < args.min_agreement:
+        print(f"Доля совпадений {report['parity']['agreement']:.3f} ниже {args.min_agreement}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
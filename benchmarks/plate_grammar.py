@@ -0,0 +1,143 @@
+"""
+Бенчмарк проверки формата номера (src.recognition.plate_grammar).
+
+Номера и регионы генерируются generate_dataset_chunks с фиксированным
+зерном и превращаются в типичные результаты OCR: латиница вместо
+кириллицы, нижний регистр, пробелы, переводы строк, надпись RUS и
+путаница похожих символов на одной-двух позициях (О/0, В/8, З/3). К ним
+добавляется мусор: обрывки символов, лишние и пропущенные символы,
+несуществующие регионы. Измеряется число строк в секунду для уникальных
+строк (запоминание отключено) и для повторных чтений (поток с камеры), а
+также доли правильно принятых номеров и отброшенного мусора. Отдельно
+считаются номера, исправленные в другой формат: первый символ "0"/"О",
+"4"/"А", "7"/"Т", "8"/"В" допустим и для легкового, и для мотоциклетного
+номера, и без контекста такие чтения неразличимы.
+
+Запуск:
+    python -m benchmarks.plate_grammar [--reads 200000] [--garbage 0.3]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.data_generation.license_plate_generator import LicensePlateGenerator, generate_dataset_chunks
+from src.recognition.plate_grammar import PlateGrammar, TO_DIGIT, TO_LETTER
+from src.utils.plate_format import CYRILLIC_TO_LATIN
+
+_GARBAGE_CHARS = list("|-_.,:;!?'\"()[]IlJ1oO0АВСЕКМНРТХУ0123456789 ")
+
+
+def _confuse(plate: str, rng) -> str:
+    """Заменяет один-два символа похожими (буква на месте цифры и наоборот)."""
+    chars = list(plate)
+    positions = [index for index, char in enumerate(chars) if char in TO_DIGIT or char in TO_LETTER]
+    for index in rng.choice(positions, size=min(len(positions), int(rng.integers(1, 3))), replace=False):
+        chars[index] = TO_DIGIT.get(chars[index]) or TO_LETTER[chars[index]]
+    return "".join(chars)
+
+
+def _ocr_noise(plate: str, region: str, rng) -> str:
+    """Запись номера в виде, который возвращает OCR."""
+    text = plate
+    if rng.random() < 0.5:
+        text = text.translate(CYRILLIC_TO_LATIN)
+    if rng.random() < 0.3:
+        text = text.lower()
+    separator = rng.choice(["", " ", "  ", "|", "\n"])
+    suffix = rng.choice(["", "", " RUS", "\n"])
+    return f"{text}{separator}{region}{suffix}"
+
+
+def _garbage(rng, plates) -> str:
+    kind = rng.integers(4)
+    if kind == 0:
+        return "".join(rng.choice(_GARBAGE_CHARS, size=int(rng.integers(1, 12))))
+    plate = plates[int(rng.integers(len(plates)))]
+    if kind == 1:
+        return plate[: int(rng.integers(2, len(plate) - 1))]
+    if kind == 2:
+        return plate + "".join(rng.choice(list("0123456789ВС"), size=int(rng.integers(2, 4))))
+    return plate[:6] + "00"
+
+
+def make_reads(count: int, garbage: float, seed: int):
+    """Результаты OCR и ожидаемые номера (None для мусора)."""
+    rng = np.random.default_rng(seed)
+    chunk = next(iter(generate_dataset_chunks(count, chunk_size=count, seed=seed)))
+    plates = [number + region for number, region in zip(chunk.numbers.tolist(), chunk.regions.tolist())]
+    reads, expected = [], []
+    for number, region in zip(chunk.numbers.tolist(), chunk.regions.tolist()):
+        if rng.random() < garbage:
+            reads.append(_garbage(rng, plates))
+            expected.append(None)
+            continue
+        text = _confuse(number, rng) if rng.random() < 0.2 else number
+        reads.append(_ocr_noise(text, region, rng))
+        expected.append(number + region)
+    return reads, expected
+
+
+def bench(grammar: PlateGrammar, reads, repeats: int = 1) -> float:
+    """Строк в секунду при проверке всего набора repeats раз."""
+    started_at = time.perf_counter()
+    for _ in range(repeats):
+        grammar.normalize_batch(reads)
+    return len(reads) * repeats / (time.perf_counter() - started_at)
+
+
+def accuracy(grammar: PlateGrammar, reads, expected) -> dict:
+    results = grammar.normalize_batch(reads)
+    valid = [(result, plate) for result, plate in zip(results, expected) if plate is not None]
+    garbage = [result for result, plate in zip(results, expected) if plate is None]
+    wrong = [(result, plate) for result, plate in valid if result is not None and result != plate]
+    ambiguous = sum(result[1:] == plate[1:] for result, plate in wrong)
+    return {
+        "valid": len(valid),
+        "accepted_correct": sum(result == plate for result, plate in valid) / len(valid) if valid else None,
+        "accepted_ambiguous_format": ambiguous,
+        "accepted_wrong": len(wrong) - ambiguous,
+        "garbage": len(garbage),
+        "garbage_rejected": sum(result is None for result in garbage) / len(garbage) if garbage else None,
+    }
+
+
+def make_grammar(memo_size: int) -> PlateGrammar:
+    return PlateGrammar(
+        LicensePlateGenerator.FORMATS.values(),
+        LicensePlateGenerator.ALLOWED_LETTERS,
+        LicensePlateGenerator.REGIONS,
+        memo_size=memo_size,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Скорость и точность проверки формата номера")
+    parser.add_argument("--reads", type=int, default=200000, help="Число результатов OCR")
+    parser.add_argument("--garbage", type=float, default=0.3, help="Доля мусора среди результатов")
+    parser.add_argument("--distinct", type=int, default=500, help="Разных строк в сценарии повторных чтений")
+    parser.add_argument("--seed", type=int, default=25)
+    parser.add_argument("--output", default=None, help="Файл для JSON-отчета")
+    args = parser.parse_args()
+
+    reads, expected = make_reads(args.reads, args.garbage, args.seed)
+    # Поток с камер: одни и те же номера читаются многократно
+    repeated = [reads[index % args.distinct] for index in range(len(reads))]
+    report = {
+        "environment": {"reads": len(reads), "garbage": args.garbage, "seed": args.seed},
+        "unique_per_s": bench(make_grammar(memo_size=0), reads),
+        "repeated_per_s": bench(make_grammar(memo_size=65536), repeated, repeats=3),
+        "accuracy": accuracy(make_grammar(memo_size=0), reads, expected),
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Бенчмарк поиска номера в таблице vehicles по каноническому ключу plate_key.
+
+Заполняет базу сгенерированными номерами (по умолчанию 1 млн строк
+в файле SQLite) и измеряет задержку запроса проверки доступа для
+существующих и отсутствующих номеров, записанных в другом виде
+(латиница, нижний регистр, пробел перед регионом). Для сравнения
+измеряется тот же поиск без ключа - нормализацией столбца в запросе:
+он не может использовать индекс и не находит номера, записанные
+латиницей.
+
+Запуск:
+    python -m benchmarks.plate_lookup [--rows 1000000] [--lookups 2000] [--url URL]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import percentiles
+from src.data_generation.exporters import iter_rows
+from src.data_generation.license_plate_generator import generate_dataset_chunks
+from src.database.bulk_import import bulk_import_vehicles
+from src.database.engine import EngineRegistry
+from src.database.models import Base, Vehicle
+from src.utils.plate_format import CYRILLIC_TO_LATIN, plate_key
+
+
+def as_typed(plate: str) -> str:
+    """Записывает номер так, как его мог бы передать клиент: латиница, нижний регистр, пробел."""
+    number, region = plate[:-2], plate[-2:]
+    return f"{number.translate(CYRILLIC_TO_LATIN).lower()} {region}"
+
+
+async def run(url: str, rows: int, lookups: int, scan_lookups: int, seed: int) -> dict:
+    registry = EngineRegistry()
+    engine = registry.get(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    report = {"rows": rows, "url": engine.url.render_as_string(hide_password=True)}
+    async with session_factory() as session:
+        existing = await session.scalar(select(func.count(Vehicle.id)))
+    if existing < rows:
+        started_at = time.perf_counter()
+        await bulk_import_vehicles(
+            iter_rows(generate_dataset_chunks(rows - existing, seed=seed)),
+            chunk_size=5000,
+            session_factory=session_factory,
+        )
+        report["load_seconds"] = time.perf_counter() - started_at
+
+    async with session_factory() as session:
+        sample = (await session.execute(
+            select(Vehicle.license_plate).order_by(func.random()).limit(lookups // 2)
+        )).scalars().all()
+    rng = random.Random(seed)
+    queries = [as_typed(plate) for plate in sample] + [f"x{rng.randrange(10 ** 6):06d}yz 77" for _ in sample]
+    rng.shuffle(queries)
+
+    async def measure(build_query, plates):
+        samples = []
+        hits = 0
+        async with session_factory() as session:
+            for plate in plates:
+                started_at = time.perf_counter()
+                found = (await session.execute(build_query(plate))).scalar() is not None
+                samples.append(time.perf_counter() - started_at)
+                hits += found
+        return {**percentiles(samples), "hits": hits}
+
+    report["plate_key_index"] = await measure(
+        lambda plate: select(Vehicle.id).where(Vehicle.plate_key == plate_key(plate)).limit(1), queries
+    )
+    # Без канонического ключа номер приходится нормализовать в самом запросе - полный просмотр таблицы
+    report["normalized_scan"] = await measure(
+        lambda plate: select(Vehicle.id).where(
+            func.upper(func.replace(Vehicle.license_plate, " ", "")) == plate.replace(" ", "").upper()
+        ).limit(1),
+        queries[:scan_lookups],
+    )
+    await registry.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска номера по plate_key")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Число строк в таблице vehicles")
+    parser.add_argument("--lookups", type=int, default=2000, help="Число запросов по индексу")
+    parser.add_argument("--scan-lookups", type=int, default=20, help="Число запросов без индекса")
+    parser.add_argument("--url", default=None, help="URL базы (по умолчанию временный файл SQLite)")
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    url = args.url or "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "plate_lookup.db")
+    report = asyncio.run(run(url, args.rows, args.lookups, args.scan_lookups, args.seed))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Бенчмарк цепочек предобработки (PreprocessPipeline) для детектора и OCR.
+
+Кадры и разметка рисуются генератором синтетических номеров
+(src.data_generation.plate_renderer) с фиксированным зерном. Для каждой
+цепочки детектора измеряется время обработки полного кадра, для каждой
+цепочки OCR - время обработки вырезанного по разметке номера; в отчет
+попадает и среднее время каждого шага. Если установлен Tesseract,
+для цепочек OCR дополнительно считается доля номеров, прочитанных
+без ошибок, - так выбирается самая дешевая цепочка, не ухудшающая
+точность (итоговые значения задаются в DETECTOR_PREPROCESS и OCR_PREPROCESS).
+
+Запуск:
+    python -m benchmarks.preprocess [--samples 200] [--width 1920 --height 1080]
+    python -m benchmarks.preprocess --ocr-chain "height:64,gray,binarize:otsu" --ocr-chain none
+"""
+
+import argparse
+import json
+import shutil
+import time
+
+import numpy as np
+
+from benchmarks.common import summarize
+from src.data_generation.license_plate_generator import generate_dataset_chunks
+from src.data_generation.plate_renderer import RenderOptions, render_sample
+from src.recognition.image_processing import PreprocessPipeline
+from src.utils.plate_format import plate_key
+
+DETECTOR_CHAINS = (
+    "none",
+    "gray,bilateral:11:17:17,canny:30:200",
+    "resize:960,gray,bilateral:11:17:17,canny:30:200",
+    "resize:960,gray,blur:5,canny:30:200",
+    "resize:640,gray",
+)
+
+OCR_CHAINS = (
+    "none",
+    "gray",
+    "height:64,gray,binarize:otsu",
+    "height:64,gray,median:3,binarize:otsu",
+    "height:64,gray,bilateral:11:17:17,deskew:15,binarize:otsu",
+    "height:64,gray,deskew:15,binarize:adaptive:31:10",
+)
+
+
+def make_samples(count: int, width: int, height: int, seed: int):
+    """Кадры сцены с номерами, вырезанные по разметке номера и их тексты."""
+    rng = np.random.default_rng(seed)
+    options = RenderOptions(width=width, height=height)
+    chunk = next(iter(generate_dataset_chunks(count, chunk_size=count, seed=seed)))
+    frames, crops, texts = [], [], []
+    for number, region, vehicle_type in zip(chunk.numbers.tolist(), chunk.regions.tolist(), chunk.vehicle_types.tolist()):
+        frame, label = render_sample(number, region, vehicle_type, rng, options)
+        x, y, w, h = label["box"]
+        frames.append(frame)
+        crops.append(frame[y : y + h + 1, x : x + w + 1])
+        texts.append(label["license_plate"])
+    return frames, crops, texts
+
+
+def bench_chain(spec: str, images, slots: int = 1) -> dict:
+    """Время цепочки на наборе изображений и среднее время каждого шага."""
+    pipeline = PreprocessPipeline.from_spec(spec)
+    pipeline(images[0])  # Прогрев: буферы выделяются при первом вызове
+    pipeline.reset_stats()
+    samples = []
+    started_at = time.perf_counter()
+    for index, image in enumerate(images):
+        call_started_at = time.perf_counter()
+        pipeline(image, slot=index % slots)
+        samples.append(time.perf_counter() - call_started_at)
+    result = summarize(samples, time.perf_counter() - started_at)
+    result["avg_step_ms"] = pipeline.stats()["avg_step_ms"]
+    return result
+
+
+def ocr_accuracy(spec: str, crops, texts, backend: str):
+    """Доля номеров, прочитанных без ошибок; None, если Tesseract недоступен."""
+    if shutil.which("tesseract") is None:
+        return None
+    from src.recognition.ocr_engine import create_ocr_engine
+
+    try:
+        engine = create_ocr_engine(backend, preprocess=spec)
+    except (ImportError, RuntimeError):
+        return None
+    try:
+        results = engine.read_batch(crops)
+    finally:
+        engine.close()
+    return sum(plate_key(result.text) == plate_key(text) for result, text in zip(results, texts)) / len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение цепочек предобработки детектора и OCR")
+    parser.add_argument("--samples", type=int, default=200, help="Число синтетических кадров")
+    parser.add_argument("--width", type=int, default=1920, help="Ширина кадра")
+    parser.add_argument("--height", type=int, default=1080, help="Высота кадра")
+    parser.add_argument("--seed", type=int, default=22)
+    parser.add_argument("--detector-chain", action="append", help="Цепочка детектора (можно несколько)")
+    parser.add_argument("--ocr-chain", action="append", help="Цепочка OCR (можно несколько)")
+    parser.add_argument("--backend", default=None, help="Бэкенд OCR для оценки точности")
+    parser.add_argument("--output", default=None, help="Файл для JSON-отчета")
+    args = parser.parse_args()
+
+    frames, crops, texts = make_samples(args.samples, args.width, args.height, args.seed)
+    report = {"environment": {"samples": args.samples, "frame": [args.width, args.height], "seed": args.seed}}
+    report["detector"] = {spec: bench_chain(spec, frames) for spec in args.detector_chain or DETECTOR_CHAINS}
+    report["ocr"] = {}
+    for spec in args.ocr_chain or OCR_CHAINS:
+        report["ocr"][spec] = {**bench_chain(spec, crops), "accuracy": ocr_accuracy(spec, crops, texts, args.backend)}
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
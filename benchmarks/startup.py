@@ -0,0 +1,97 @@
+"""
+Бенчмарк времени запуска: импорт модулей приложения в чистом процессе
+и, по желанию, загрузка с прогревом модели детекции.
+
+Запуск:
+    python -m benchmarks.startup [--repeat 5] [--model] [--max-import-seconds 2.0]
+
+Результат печатается в JSON. Если задан --max-import-seconds и медиана
+времени импорта хотя бы одного модуля больше порога, процесс завершается
+с кодом 1 - так регрессии времени запуска ловятся в CI.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Модули, импорт которых должен оставаться дешевым
+MODULES = [
+    "src.web.app",
+    "src.database.database",
+    "src.recognition.plate_recognition",
+]
+
+# Тяжелые зависимости, которые не должны загружаться при импорте
+HEAVY_MODULES = ["torch", "ultralytics", "asyncpg", "alembic"]
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+started_at = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started_at
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, repeat: int) -> dict:
+    """Измеряет время импорта модуля в отдельном процессе repeat раз."""
+    samples = []
+    heavy = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        heavy = result["heavy"]
+    return {
+        "median_seconds": statistics.median(samples),
+        "max_seconds": max(samples),
+        "heavy_modules": heavy,
+    }
+
+
+def measure_model() -> dict:
+    """Измеряет загрузку модели и прогрев в текущем процессе."""
+    from src.recognition.plate_recognition import load_model, model_status
+
+    started_at = time.perf_counter()
+    load_model()
+    return {
+        "total_seconds": time.perf_counter() - started_at,
+        "load_seconds": model_status["load_seconds"],
+        "warmup_seconds": model_status["warmup_seconds"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк времени запуска приложения")
+    parser.add_argument("--repeat", type=int, default=5, help="Число запусков на модуль")
+    parser.add_argument("--model", action="store_true", help="Измерить загрузку и прогрев модели")
+    parser.add_argument(
+        "--max-import-seconds", type=float, default=None,
+        help="Порог медианы времени импорта; при превышении код возврата 1",
+    )
+    args = parser.parse_args()
+
+    report = {"imports": {module: measure_import(module, args.repeat) for module in MODULES}}
+    if args.model:
+        report["model"] = measure_model()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.max_import_seconds is not None:
+        slow = [
+            module for module, result in report["imports"].items()
+            if result["median_seconds"] > args.max_import_seconds or result["heavy_modules"]
+        ]
+        if slow:
+            print(f"Превышено время импорта или загружены тяжелые зависимости: {', '.join(slow)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Заглушки для запуска распознавания без камеры, весов YOLO и Tesseract.
+
+Синтетический кадр - сцена с плавным градиентом и светлой табличкой
+номера. Детектор-заглушка находит табличку по границам на кадре после
+предобработки и возвращает результат в формате ultralytics, поэтому
+через конвейер проходят те же функции выбора бокса и вырезания номера,
+что и с настоящей моделью. OCR-заглушка возвращает заданный текст.
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from src.recognition.ocr_engine import OcrEngine, OcrResult
+
+
+@dataclass
+class SyntheticFrame:
+    """Синтетический кадр и ожидаемый результат распознавания."""
+    frame: np.ndarray
+    plate: str
+    box: Tuple[int, int, int, int]  # x, y, w, h
+
+
+def make_frame(plate: str, width: int = 640, height: int = 480, seed: int = 0) -> SyntheticFrame:
+    """
+    Рисует кадр с номерным знаком в случайном месте нижней половины.
+
+    :param plate: Текст номера (латиница: шрифты OpenCV не содержат кириллицы).
+    :param width: Ширина кадра.
+    :param height: Высота кадра.
+    :param seed: Зерно положения таблички.
+    :return: SyntheticFrame.
+    """
+    rng = random.Random(seed)
+    gradient = np.linspace(40, 90, width, dtype=np.uint8)
+    frame = np.repeat(np.tile(gradient, (height, 1))[:, :, None], 3, axis=2)
+    w, h = width // 4, height // 10
+    x = rng.randrange(0, width - w)
+    y = rng.randrange(height // 2, height - h)
+    cv2.rectangle(frame, (x, y), (x + w - 1, y + h - 1), (235, 235, 235), thickness=-1)
+    # Масштаб шрифта подбирается так, чтобы текст поместился в табличку
+    (text_width, _), _ = cv2.getTextSize(plate, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 2)
+    scale = min(h / 45, (w - 12) / text_width)
+    cv2.putText(frame, plate, (x + 6, y + h - 10), cv2.FONT_HERSHEY_SIMPLEX, scale, (20, 20, 20), 2)
+    return SyntheticFrame(frame, plate, (x, y, w, h))
+
+
+def make_frames(count: int, width: int = 640, height: int = 480, seed: int = 0) -> List[SyntheticFrame]:
+    """Набор синтетических кадров с разными номерами и положениями табличек."""
+    rng = random.Random(seed)
+    letters = "ABCEHKMOPTXY"
+    return [
+        make_frame(
+            f"{rng.choice(letters)}{rng.randrange(1000):03d}{rng.choice(letters)}{rng.choice(letters)}{rng.randrange(1, 100):02d}",
+            width, height, seed=seed * 100_003 + index,
+        )
+        for index in range(count)
+    ]
+
+
+class _Boxes:
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray):
+        self.xyxy = xyxy
+        self.conf = conf
+
+
+class _Result:
+    def __init__(self, boxes: _Boxes):
+        self.boxes = boxes
+
+
+class StubDetector:
+    """
+    Детектор с интерфейсом модели ultralytics: бокс - прямоугольник,
+    охватывающий все ненулевые пиксели входа детектора
+    (после предобработки Config.DETECTOR_PREPROCESS).
+    """
+
+    def __init__(self, confidence: float = 0.9, latency: float = 0.0):
+        """
+        :param confidence: Уверенность найденного бокса.
+        :param latency: Дополнительная задержка на вызов в секундах (имитация модели).
+        """
+        self.confidence = confidence
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, frames, verbose: bool = False):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if isinstance(frames, np.ndarray):
+            frames = [frames]
+        results = []
+        for frame in frames:
+            ys, xs = np.nonzero(frame if frame.ndim == 2 else frame.max(axis=2))
+            if xs.size == 0:
+                results.append(_Result(_Boxes(np.empty((0, 4), np.float32), np.empty(0, np.float32))))
+                continue
+            xyxy = np.array([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]], dtype=np.float32)
+            results.append(_Result(_Boxes(xyxy, np.array([self.confidence], dtype=np.float32))))
+        return results
+
+
+class StubOcrEngine(OcrEngine):
+    """Движок OCR, возвращающий заданный текст с заданной задержкой."""
+
+    def __init__(self, text: str = "A123BC77", confidence: float = 0.95, workers: int = 1, latency: float = 0.0):
+        super().__init__(workers)
+        self.text = text
+        self.confidence = confidence
+        self.latency = latency
+
+    def _read_one(self, crop) -> OcrResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return OcrResult(self.text, self.confidence)
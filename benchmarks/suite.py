@@ -0,0 +1,299 @@
+"""
+Воспроизводимый набор бенчмарков горячих путей без камеры и сети.
+
+Сценарии:
+    recognition_single, recognition_batch - распознавание синтетических
+        кадров (предобработка, детектор, вырезание номера, OCR) по одному
+        кадру и пачками; детектор и OCR - заглушки из benchmarks.stubs с
+        заданной задержкой, чтобы измерялись накладные расходы конвейера;
+    check_access_db, check_access_index - AccessManager.check_access через
+        базу данных и через индекс номеров в памяти;
+    http_check_access_get, http_check_access_post, http_check_access_batch -
+        нагрузка на маршруты FastAPI внутри процесса (httpx.ASGITransport)
+        с несколькими одновременными клиентами.
+
+База - временный файл SQLite (или --url, например PostgreSQL), заполненный
+сгенерированными номерами с фиксированным зерном. Для каждого сценария
+печатаются пропускная способность и задержки p50/p95/p99 в JSON. Если
+есть базовый отчет (--baseline, по умолчанию benchmarks/baseline.json),
+результат сравнивается с ним; с --fail-on-regression процесс завершается
+с кодом 1, если p50 или пропускная способность (--gate) какого-либо
+сценария ухудшились больше чем на --tolerance.
+
+Запуск:
+    python -m benchmarks.suite [--quick] [--only recognition,http] [--output report.json]
+    python -m benchmarks.suite --save-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.common import GATED_METRICS, compare_to_baseline, load_report, save_report, summarize
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+GROUPS = ("recognition", "access", "http")
+
+
+def _configure_environment(url: str, log_dir: str) -> None:
+    # Config читает переменные окружения при импорте, поэтому модули src
+    # импортируются только после этой функции
+    os.environ["DATABASE_URL"] = url
+    os.environ["LOG_DIR"] = log_dir
+    os.environ["MODEL_PRELOAD"] = "0"
+    os.environ.setdefault("PLATE_CACHE_ENABLED", "1")
+
+
+def bench_recognition(frames_count: int, batch_size: int, detector_latency: float, ocr_latency: float, seed: int) -> dict:
+    """Распознавание синтетических кадров по одному и пачками."""
+    from benchmarks.stubs import StubDetector, StubOcrEngine, make_frames
+    from src.recognition.ocr_engine import set_ocr_engine
+    from src.recognition.plate_recognition import recognize_plates_from_frames, set_model
+
+    frames = [synthetic.frame for synthetic in make_frames(frames_count, seed=seed)]
+    set_model(StubDetector(latency=detector_latency))
+    ocr_engine = StubOcrEngine(latency=ocr_latency, workers=4)
+    set_ocr_engine(ocr_engine)
+    try:
+        recognize_plates_from_frames(frames[:1])  # Прогрев
+
+        results = {}
+        for name, size in (("recognition_single", 1), ("recognition_batch", batch_size)):
+            samples = []
+            found = 0
+            started_at = time.perf_counter()
+            for start in range(0, len(frames), size):
+                call_started_at = time.perf_counter()
+                plates = recognize_plates_from_frames(frames[start : start + size])
+                samples.append(time.perf_counter() - call_started_at)
+                found += sum(plate is not None for plate in plates)
+            results[name] = {
+                **summarize(samples, time.perf_counter() - started_at, items=len(frames)),
+                "batch_size": size,
+                "found": found,
+            }
+        return results
+    finally:
+        set_model(None)
+        set_ocr_engine(None)
+        ocr_engine.close()
+
+
+async def prepare_database(rows: int, seed: int):
+    """Создает таблицы и загружает сгенерированные номера; возвращает выборку существующих номеров."""
+    from sqlalchemy import func, select
+
+    from src.data_generation.exporters import iter_rows
+    from src.data_generation.license_plate_generator import generate_dataset_chunks
+    from src.database.bulk_import import bulk_import_vehicles
+    from src.database.database import AsyncSessionLocal, create_database
+    from src.database.models import Vehicle
+
+    await create_database()
+    async with AsyncSessionLocal() as session:
+        existing = await session.scalar(select(func.count(Vehicle.id)))
+    if existing < rows:
+        await bulk_import_vehicles(iter_rows(generate_dataset_chunks(rows - existing, seed=seed)), chunk_size=5000)
+    async with AsyncSessionLocal() as session:
+        return list((await session.execute(
+            select(Vehicle.license_plate).order_by(Vehicle.id).limit(1000)
+        )).scalars().all())
+
+
+def make_queries(known, count: int, seed: int):
+    """Половина запросов - существующие номера, половина - отсутствующие."""
+    rng = random.Random(seed)
+    queries = [rng.choice(known) for _ in range(count // 2)]
+    queries += [f"Х{rng.randrange(1000):03d}ХХ{rng.randrange(100, 1000)}" for _ in range(count - len(queries))]
+    rng.shuffle(queries)
+    return queries
+
+
+async def bench_access(queries) -> dict:
+    """check_access через базу данных и через индекс номеров в памяти."""
+    from src.access_control.access_manager import AccessManager
+    from src.access_control.plate_cache import DatabasePlateSource, PlateIndex
+    from src.database.database import AsyncSessionLocal
+
+    plate_index = PlateIndex(DatabasePlateSource())
+    await plate_index.load()
+    results = {}
+    for name, manager in (
+        ("check_access_db", AccessManager()),
+        ("check_access_index", AccessManager(plate_index=plate_index)),
+    ):
+        samples = []
+        granted = 0
+        async with AsyncSessionLocal() as session:
+            started_at = time.perf_counter()
+            for plate in queries:
+                call_started_at = time.perf_counter()
+                granted += await manager.check_access(plate, session)
+                samples.append(time.perf_counter() - call_started_at)
+        results[name] = {**summarize(samples, time.perf_counter() - started_at), "granted": granted}
+    return results
+
+
+async def _load(client, send, payloads, concurrency: int):
+    """Отправляет запросы concurrency клиентами; возвращает задержки и общее время."""
+    samples = []
+    errors = 0
+    iterator = iter(payloads)
+
+    async def worker():
+        nonlocal errors
+        for payload in iterator:
+            started_at = time.perf_counter()
+            response = await send(client, payload)
+            samples.append(time.perf_counter() - started_at)
+            errors += response.status_code >= 400
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started_at, errors
+
+
+async def bench_http(queries, concurrency: int, batch_size: int) -> dict:
+    """Маршруты проверки доступа под нагрузкой внутри процесса."""
+    import httpx
+
+    from src.web.app import create_app, plate_index
+
+    app = create_app()
+    results = {}
+    async with app.router.lifespan_context(app):
+        if plate_index is not None:
+            await plate_index.load()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            scenarios = (
+                ("http_check_access_get", queries, lambda c, plate: c.get(f"/check_access/{plate}")),
+                ("http_check_access_post", queries, lambda c, plate: c.post("/check_access", data={"plate_number": plate})),
+                (
+                    "http_check_access_batch",
+                    # Не меньше 100 пакетов, чтобы перцентили были устойчивыми
+                    [
+                        [queries[(start + offset) % len(queries)] for offset in range(batch_size)]
+                        for start in range(0, max(len(queries), 100 * batch_size), batch_size)
+                    ],
+                    lambda c, plates: c.post("/check_access/batch", json={"plates": plates}),
+                ),
+            )
+            for name, payloads, send in scenarios:
+                await send(client, payloads[0])  # Прогрев
+                samples, elapsed, errors = await _load(client, send, payloads, concurrency)
+                results[name] = {**summarize(samples, elapsed), "concurrency": concurrency, "errors": errors}
+    return results
+
+
+async def bench_database(args, groups) -> dict:
+    known = await prepare_database(args.rows, args.seed)
+    queries = make_queries(known, args.lookups, args.seed)
+    results = {}
+    if "access" in groups:
+        results.update(await bench_access(queries))
+    if "http" in groups:
+        results.update(await bench_http(queries, args.concurrency, args.http_batch_size))
+    else:
+        from src.database.database import dispose_engines
+
+        await dispose_engines()
+    return results
+
+
+def run(args) -> dict:
+    groups = set(args.only.split(",")) if args.only else set(GROUPS)
+    unknown = groups - set(GROUPS)
+    if unknown:
+        raise SystemExit(f"Неизвестные группы сценариев: {', '.join(sorted(unknown))}")
+
+    work_dir = tempfile.mkdtemp(prefix="parking_bench_")
+    url = args.url or "sqlite+aiosqlite:///" + os.path.join(work_dir, "bench.db")
+    _configure_environment(url, os.path.join(work_dir, "logs"))
+    from src.utils.logger import configure_logging, shutdown_logging
+
+    # Логи пишутся в файлы временного каталога, как в работающем приложении
+    configure_logging()
+
+    scenarios = {}
+    if "recognition" in groups:
+        scenarios.update(
+            bench_recognition(args.frames, args.batch_size, args.detector_latency, args.ocr_latency, args.seed)
+        )
+    if groups & {"access", "http"}:
+        scenarios.update(asyncio.run(bench_database(args, groups)))
+
+    shutdown_logging()
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": url.split(":", 1)[0],
+            "rows": args.rows,
+            "frames": args.frames,
+            "lookups": args.lookups,
+            "seed": args.seed,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки распознавания, проверки доступа и HTTP-маршрутов")
+    parser.add_argument("--quick", action="store_true", help="Уменьшенные объемы для быстрой проверки")
+    parser.add_argument("--only", default=None, help=f"Группы сценариев через запятую: {', '.join(GROUPS)}")
+    parser.add_argument("--frames", type=int, default=400, help="Число синтетических кадров")
+    parser.add_argument("--batch-size", type=int, default=8, help="Размер пачки кадров")
+    parser.add_argument("--detector-latency", type=float, default=0.002, help="Задержка детектора-заглушки, с")
+    parser.add_argument("--ocr-latency", type=float, default=0.001, help="Задержка OCR-заглушки, с")
+    parser.add_argument("--rows", type=int, default=20_000, help="Число номеров в базе")
+    parser.add_argument("--lookups", type=int, default=2000, help="Число проверок доступа в сценарии")
+    parser.add_argument("--concurrency", type=int, default=8, help="Число одновременных HTTP-клиентов")
+    parser.add_argument("--http-batch-size", type=int, default=100, help="Номеров в одном пакетном запросе")
+    parser.add_argument("--url", default=None, help="URL базы (по умолчанию временный файл SQLite)")
+    parser.add_argument("--seed", type=int, default=19)
+    parser.add_argument("--output", default=None, help="Файл для JSON-отчета")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Базовый отчет для сравнения")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить отчет как базовый")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Допустимое ухудшение метрики (доля)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Минимальное значимое ухудшение задержки, мс")
+    parser.add_argument(
+        "--gate", default=",".join(GATED_METRICS), help="Метрики, ухудшение которых считается регрессией"
+    )
+    parser.add_argument("--fail-on-regression", action="store_true", help="Код возврата 1 при ухудшении")
+    args = parser.parse_args()
+    if args.quick:
+        args.frames, args.rows, args.lookups = min(args.frames, 40), min(args.rows, 2000), min(args.lookups, 200)
+
+    report = run(args)
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        report["comparison"] = compare_to_baseline(
+            report, load_report(args.baseline), args.tolerance, args.min_delta_ms, args.gate.split(",")
+        )
+        regressions = [item for item in report["comparison"] if item["regression"]]
+
+    if args.output:
+        save_report(report, args.output)
+    if args.save_baseline:
+        save_report(report, args.baseline)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    for item in regressions:
+        print(
+            f"Ухудшение {item['scenario']}.{item['metric']}: {item['baseline']:.3f} -> {item['current']:.3f}",
+            file=sys.stderr,
+        )
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
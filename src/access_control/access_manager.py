@@ -1,14 +1,40 @@
+import time
+from typing import Dict, List, Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from src.access_control.event_journal import AccessEventJournal
+from src.access_control.fuzzy_match import PlateMatch
+from src.access_control.plate_cache import PlateIndex
+from src.config.config import Config
 from src.database.models import Vehicle
 from src.utils.logger import access_control_logger
+from src.utils.metrics import observe_stage, stage_timer
+from src.utils.plate_format import plate_key
 
 
 class AccessManager:
-    def __init__(self):
+    def __init__(
+        self,
+        plate_index: Optional[PlateIndex] = None,
+        journal: Optional[AccessEventJournal] = None,
+        fuzzy_grant: bool = None,
+    ):
+        """
+        :param plate_index: Индекс разрешенных номеров в памяти. Если индекс
+            загружен и актуален, проверка доступа выполняется без запроса к базе.
+        :param journal: Журнал решений о доступе. Решения ставятся в очередь
+            журнала, запись в базу выполняется в фоне.
+        :param fuzzy_grant: Разрешать ли доступ по нечеткому совпадению номера,
+            по умолчанию Config.FUZZY_MATCH_GRANT. Без этого совпадение только
+            записывается в журнал для оператора, а доступ запрещается.
+        """
         # Множество для хранения разрешенных номерных знаков
         self.allowed_plates: set[str] = set()
+        self.plate_index = plate_index
+        self.journal = journal
+        self.fuzzy_grant = fuzzy_grant if fuzzy_grant is not None else Config().FUZZY_MATCH_GRANT
 
     def add_allowed_plate(self, license_plate: str) -> None:
         """
@@ -18,37 +44,156 @@ class AccessManager:
         """
         self.allowed_plates.add(license_plate)
 
-    async def check_access(self, license_plate: str, db_session: AsyncSession) -> bool:
+    async def check_access(
+        self,
+        license_plate: str,
+        db_session: AsyncSession,
+        lane: Optional[str] = None,
+        ocr_confidence: Optional[float] = None,
+        source: str = "web",
+    ) -> bool:
         """
         Проверяет, имеет ли номерной знак доступ.
 
         :param license_plate: Номерной знак для проверки.
         :param db_session: Асинхронная сессия базы данных.
+        :param lane: Полоса (камера), с которой распознан номер, - для журнала.
+        :param ocr_confidence: Уверенность OCR (0..1) - для журнала.
+        :param source: Источник проверки (web, video) - для журнала.
         :return: True, если доступ разрешен, иначе False.
         """
-        access_control_logger.info(f"Проверка доступа для номера: {license_plate}")
+        started_at = time.perf_counter()
+        access_control_logger.info("Проверка доступа для номера: %s", license_plate)
 
-        # Создаем запрос для поиска автомобиля по номерному знаку в базе данных
-        query = select(Vehicle).where(Vehicle.license_plate == license_plate)
+        # Сначала проверяем индекс в памяти, база данных - только запасной вариант
+        found = self.plate_index.lookup(license_plate) if self.plate_index is not None else None
 
-        # Выполняем асинхронный запрос
-        result = await db_session.execute(query)
+        if found is None:
+            # Поиск по каноническому ключу использует индекс и не зависит от написания номера
+            query = select(Vehicle.id).where(Vehicle.plate_key == plate_key(license_plate)).limit(1)
 
-        # Получаем первую запись из результата
-        vehicle = result.scalars().first()
+            # Выполняем асинхронный запрос
+            with stage_timer("db_query"):
+                result = await db_session.execute(query)
+                found = result.scalar() is not None
 
         # Проверяем доступ
-        access_granted = vehicle is not None or license_plate in self.allowed_plates
+        access_granted = found or license_plate in self.allowed_plates
+
+        match = None
+        if not access_granted:
+            # Номер мог быть прочитан с типичной ошибкой OCR (О/0, В/8, Т/7)
+            with stage_timer("fuzzy_match"):
+                match = self.match_plate(license_plate)
+            if match is not None:
+                access_granted = self.fuzzy_grant
+                access_control_logger.info(
+                    "Номер %s сопоставлен с %s, расстояние %.2f%s",
+                    license_plate,
+                    match.plate,
+                    match.distance,
+                    "" if self.fuzzy_grant else " (требуется решение оператора)",
+                )
 
         if access_granted:
-            access_control_logger.info(f"Доступ разрешен для номера: {license_plate}")
+            access_control_logger.info("Доступ разрешен для номера: %s", license_plate)
         else:
-            access_control_logger.warning(
-                f"Доступ запрещен для номера: {license_plate}"
+            access_control_logger.warning("Доступ запрещен для номера: %s", license_plate)
+
+        decision_seconds = time.perf_counter() - started_at
+        observe_stage("check_access", decision_seconds)
+        if self.journal is not None:
+            self.journal.record(
+                license_plate,
+                access_granted,
+                decision_ms=decision_seconds * 1000,
+                source=source,
+                lane=lane,
+                matched_plate=match.plate if match is not None else None,
+                match_distance=match.distance if match is not None else None,
+                ocr_confidence=ocr_confidence,
             )
 
         return access_granted
 
+    async def check_access_batch(
+        self, license_plates: List[str], db_session: AsyncSession, query_chunk_size: int = 1000
+    ) -> Dict[str, bool]:
+        """
+        Проверяет доступ сразу для набора номерных знаков.
+
+        Номера сначала проверяются по индексу в памяти, а оставшиеся
+        разрешаются одним запросом с IN на каждые query_chunk_size номеров.
+
+        :param license_plates: Номерные знаки для проверки.
+        :param db_session: Асинхронная сессия базы данных.
+        :param query_chunk_size: Максимальное число номеров в одном запросе к базе.
+        :return: Словарь {номер: доступ разрешен} без повторов.
+        """
+        started_at = time.perf_counter()
+        decisions: Dict[str, bool] = {}
+        unresolved = []
+        for license_plate in dict.fromkeys(license_plates):
+            found = self.plate_index.lookup(license_plate) if self.plate_index is not None else None
+            if found is None:
+                unresolved.append(license_plate)
+            else:
+                decisions[license_plate] = found
+
+        for start in range(0, len(unresolved), query_chunk_size):
+            chunk = unresolved[start : start + query_chunk_size]
+            keys = {license_plate: plate_key(license_plate) for license_plate in chunk}
+            query = select(Vehicle.plate_key).where(Vehicle.plate_key.in_(set(keys.values())))
+            with stage_timer("db_query"):
+                result = await db_session.execute(query)
+                existing = set(result.scalars().all())
+            for license_plate in chunk:
+                decisions[license_plate] = keys[license_plate] in existing
+
+        matches: Dict[str, PlateMatch] = {}
+        for license_plate, granted in decisions.items():
+            if granted:
+                continue
+            if license_plate in self.allowed_plates:
+                decisions[license_plate] = True
+                continue
+            match = self.match_plate(license_plate)
+            if match is not None:
+                decisions[license_plate] = self.fuzzy_grant
+                matches[license_plate] = match
+
+        if self.journal is not None and decisions:
+            # Время пакета делится поровну между номерами
+            decision_ms = (time.perf_counter() - started_at) * 1000 / len(decisions)
+            for license_plate, granted in decisions.items():
+                match = matches.get(license_plate)
+                self.journal.record(
+                    license_plate,
+                    granted,
+                    decision_ms=decision_ms,
+                    source="batch",
+                    matched_plate=match.plate if match is not None else None,
+                    match_distance=match.distance if match is not None else None,
+                )
+
+        granted_count = sum(decisions.values())
+        access_control_logger.info(
+            "Пакетная проверка доступа: %s номеров, разрешено %s, запросов к базе: %s номеров",
+            len(decisions), granted_count, len(unresolved),
+        )
+        return decisions
+
+    def match_plate(self, license_plate: str) -> Optional[PlateMatch]:
+        """
+        Ищет ближайший разрешенный номер с учетом ошибок OCR.
+
+        :param license_plate: Распознанный номерной знак.
+        :return: PlateMatch (номер и расстояние) или None.
+        """
+        if self.plate_index is None:
+            return None
+        return self.plate_index.closest(license_plate)
+
     def grant_access(self, license_plate: str) -> bool:
         """
         Проверяет, находится ли номерной знак в списке разрешенных.
@@ -60,11 +205,11 @@ class AccessManager:
 
         if access_granted:
             access_control_logger.info(
-                f"Доступ разрешен для номера: {license_plate} из списка разрешенных"
+                "Доступ разрешен для номера: %s из списка разрешенных", license_plate
             )
         else:
             access_control_logger.warning(
-                f"Доступ запрещен для номера: {license_plate} из списка разрешенных"
+                "Доступ запрещен для номера: %s из списка разрешенных", license_plate
             )
 
         return access_granted
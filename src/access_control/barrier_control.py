@@ -1,6 +1,11 @@
+from src.utils.metrics import stage_timer
+
+
 def open_barrier():
-    print("Шлагбаум открыт.")
+    with stage_timer("barrier"):
+        print("Шлагбаум открыт.")
 
 
 def close_barrier():
-    print("Шлагбаум закрыт.")
+    with stage_timer("barrier"):
+        print("Шлагбаум закрыт.")
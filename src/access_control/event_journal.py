@@ -0,0 +1,232 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.config.config import Config
+from src.database.database import AsyncSessionLocal
+from src.database.models import AccessEvent
+from src.utils.logger import access_control_logger
+from src.utils.plate_format import normalize_plate
+
+
+class AccessEventJournal:
+    """
+    Журнал решений о доступе с отложенной пакетной записью (write-behind).
+
+    record() только добавляет событие в очередь в памяти и не обращается
+    к базе данных, поэтому проверка доступа не ждет INSERT. Фоновая задача
+    записывает очередь в таблицу access_events многострочными вставками,
+    как только набирается batch_size событий или проходит flush_interval
+    секунд. При остановке (close) оставшиеся события дописываются.
+    Если база недоступна, пачка возвращается в очередь и записывается
+    при следующей попытке; при переполнении очереди отбрасываются самые
+    старые события.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        batch_size: int = None,
+        flush_interval: float = None,
+        max_queue: int = None,
+    ):
+        """
+        :param session_factory: Фабрика асинхронных сессий.
+        :param batch_size: Число событий в одной вставке и порог внеочередной записи.
+        :param flush_interval: Максимальная задержка записи события в секундах.
+        :param max_queue: Максимальное число событий, ожидающих записи.
+        """
+        config = Config()
+        self.session_factory = session_factory
+        self.batch_size = batch_size or config.ACCESS_JOURNAL_BATCH_SIZE
+        self.flush_interval = flush_interval or config.ACCESS_JOURNAL_FLUSH_INTERVAL
+        self.max_queue = max_queue or config.ACCESS_JOURNAL_MAX_QUEUE
+
+        self._events = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def record(
+        self,
+        license_plate: str,
+        access_granted: bool,
+        decision_ms: float,
+        source: str = "web",
+        lane: Optional[str] = None,
+        matched_plate: Optional[str] = None,
+        match_distance: Optional[float] = None,
+        ocr_confidence: Optional[float] = None,
+    ) -> None:
+        """
+        Ставит решение о доступе в очередь на запись.
+
+        :param license_plate: Проверенный номер.
+        :param access_granted: Решение.
+        :param decision_ms: Время принятия решения в миллисекундах.
+        :param source: Откуда пришла проверка (web, batch, video).
+        :param lane: Полоса (камера).
+        :param matched_plate: Разрешенный номер, если совпадение нечеткое.
+        :param match_distance: Расстояние нечеткого совпадения.
+        :param ocr_confidence: Уверенность OCR (0..1).
+        """
+        if len(self._events) >= self.max_queue:
+            self._events.popleft()
+            self.dropped += 1
+        self._events.append(
+            {
+                "created_at": datetime.now(timezone.utc),
+                "license_plate": license_plate,
+                "plate_key": normalize_plate(license_plate),
+                "access_granted": access_granted,
+                "lane": lane,
+                "source": source,
+                "matched_plate": matched_plate,
+                "match_distance": match_distance,
+                "ocr_confidence": ocr_confidence,
+                "decision_ms": decision_ms,
+            }
+        )
+        self.recorded += 1
+        if self._wakeup is not None and len(self._events) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """
+        Записывает все события из очереди пачками по batch_size.
+
+        :return: Число записанных событий.
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._events:
+                batch = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+                started_at = time.perf_counter()
+                try:
+                    async with self.session_factory() as session:
+                        await session.execute(insert(AccessEvent), batch)
+                        await session.commit()
+                except Exception as e:
+                    # Пачка возвращается в начало очереди и будет записана при следующей попытке
+                    self._events.extendleft(reversed(batch))
+                    self.failed_flushes += 1
+                    access_control_logger.error("Ошибка записи журнала доступа: %s", e)
+                    break
+                self.last_flush_ms = (time.perf_counter() - started_at) * 1000
+                self.flushes += 1
+                written += len(batch)
+        self.written += written
+        return written
+
+    async def run(self) -> None:
+        """Записывает очередь по размеру или по времени до вызова close()."""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> asyncio.Task:
+        """Запускает фоновую запись в текущем цикле событий."""
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def close(self) -> None:
+        """Останавливает фоновую запись и дописывает оставшиеся события."""
+        self._closing = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._events:
+            access_control_logger.error(
+                "При остановке не удалось записать %s событий журнала доступа", len(self._events)
+            )
+
+    def stats(self) -> dict:
+        """Возвращает размер очереди и счетчики записи журнала."""
+        return {
+            "queued": len(self._events),
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+async def query_access_events(
+    session: AsyncSession,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    license_plate: Optional[str] = None,
+    lane: Optional[str] = None,
+    limit: int = 100,
+) -> List[AccessEvent]:
+    """
+    Выбирает события журнала за интервал времени, новые первыми.
+
+    Фильтр по номеру использует индекс (plate_key, created_at), выборка
+    за интервал - индекс по created_at.
+
+    :param session: Асинхронная сессия базы данных.
+    :param since: Начало интервала (включительно).
+    :param until: Конец интервала (не включительно).
+    :param license_plate: Номер в любом написании (сравнивается нормализованным).
+    :param lane: Полоса (камера).
+    :param limit: Максимальное число событий.
+    :return: Список AccessEvent.
+    """
+    query = select(AccessEvent)
+    if license_plate is not None:
+        query = query.where(AccessEvent.plate_key == normalize_plate(license_plate))
+    if since is not None:
+        query = query.where(AccessEvent.created_at >= since)
+    if until is not None:
+        query = query.where(AccessEvent.created_at < until)
+    if lane is not None:
+        query = query.where(AccessEvent.lane == lane)
+    query = query.order_by(AccessEvent.created_at.desc()).limit(limit)
+    result = await session.execute(query)
+    return list(result.scalars().all())
+
+
+def access_event_to_dict(event: AccessEvent) -> dict:
+    """Преобразует событие журнала в словарь для JSON-ответа."""
+    return {
+        "id": event.id,
+        "created_at": event.created_at.isoformat(),
+        "license_plate": event.license_plate,
+        "access_granted": event.access_granted,
+        "lane": event.lane,
+        "source": event.source,
+        "matched_plate": event.matched_plate,
+        "match_distance": event.match_distance,
+        "ocr_confidence": event.ocr_confidence,
+        "decision_ms": event.decision_ms,
+    }
@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.utils.plate_format import normalize_plate
+
+# Пары символов разных классов (буква/цифра) с одинаковым начертанием и
+# стоимость их замены. Номера сравниваются после normalize_plate, поэтому
+# буквы здесь кириллические. Буквы и цифры, которые только похожи (Н/М, 5/6,
+# 3/8), сюда не входят: их замена дает другой существующий номер. Внутри
+# формата такие пары исправляет plate_grammar, но первый символ может быть
+# и буквой (легковой номер), и цифрой (мотоциклетный), поэтому любая
+# замена из таблицы может превратить один допустимый номер в другой.
+CONFUSION_COSTS = {
+    ("О", "0"): 0.3,
+    ("В", "8"): 0.3,
+    ("Т", "7"): 0.3,
+    ("А", "4"): 0.4,
+}
+# Наименьшая стоимость замены, превращающей один допустимый номер в другой:
+# совпадение на таком расстоянии не должно открывать шлагбаум без оператора
+MIN_CONFUSION_COST = min(CONFUSION_COSTS.values())
+
+_SUBSTITUTION_COSTS: Dict[tuple, float] = {}
+for (first, second), cost in CONFUSION_COSTS.items():
+    _SUBSTITUTION_COSTS[(first, second)] = cost
+    _SUBSTITUTION_COSTS[(second, first)] = cost
+
+# Все пары CONFUSION_COSTS сворачиваются в один класс: тогда такие замены
+# не тратят бюджет правок индекса удалений
+_SKELETON_TABLE = str.maketrans({digit: letter for letter, digit in CONFUSION_COSTS})
+
+
+def plate_distance(first: str, second: str) -> float:
+    """
+    Расстояние Левенштейна с учетом типичных ошибок OCR: замена путаемых
+    символов (CONFUSION_COSTS) стоит меньше единицы, остальные правки - 1.
+
+    :param first: Нормализованный номер.
+    :param second: Нормализованный номер.
+    :return: Взвешенное расстояние редактирования.
+    """
+    if first == second:
+        return 0.0
+    previous = [float(i) for i in range(len(second) + 1)]
+    for i, first_char in enumerate(first, 1):
+        current = [float(i)]
+        for j, second_char in enumerate(second, 1):
+            if first_char == second_char:
+                substitution = previous[j - 1]
+            else:
+                substitution = previous[j - 1] + _SUBSTITUTION_COSTS.get((first_char, second_char), 1.0)
+            current.append(min(previous[j] + 1.0, current[j - 1] + 1.0, substitution))
+        previous = current
+    return previous[-1]
+
+
+def _deletes(value: str, max_edits: int) -> set:
+    """Все варианты строки, полученные удалением не более max_edits символов."""
+    variants = {value}
+    frontier = {value}
+    for _ in range(max_edits):
+        frontier = {
+            variant[:index] + variant[index + 1:]
+            for variant in frontier
+            for index in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+
+@dataclass
+class PlateMatch:
+    """Ближайший разрешенный номер и расстояние до него."""
+    plate: str
+    distance: float
+
+
+class FuzzyPlateIndex:
+    """
+    Индекс разрешенных номеров для нечеткого поиска (индекс окрестности удалений).
+
+    Для каждого номера хранятся хеши всех его вариантов с не более чем
+    max_edits удаленными символами. Кандидаты для запроса находятся поиском
+    хешей вариантов запроса, а затем ранжируются взвешенным расстоянием
+    plate_distance, поэтому коллизии хешей не влияют на результат. Хеши
+    хранятся в отсортированном массиве NumPy (12 байт на вариант), поиск
+    выполняется бинарным поиском и не зависит от числа номеров. Номера,
+    добавленные после build(), хранятся в небольшом словаре до следующей
+    перестройки индекса.
+    """
+
+    def __init__(self, plates: Iterable[str] = (), max_edits: int = 1):
+        """
+        :param plates: Начальный набор номеров.
+        :param max_edits: Максимальное число правок (кроме замен путаемых символов),
+            которое может найти индекс.
+        """
+        self.max_edits = max_edits
+        self._plates: List[str] = []
+        self._known = set()
+        self._keys = np.empty(0, dtype=np.int64)
+        self._ids = np.empty(0, dtype=np.int32)
+        self._pending: Dict[int, List[int]] = {}
+        self.build(plates)
+
+    def __len__(self) -> int:
+        return len(self._plates)
+
+    def _variant_hashes(self, plate: str) -> List[int]:
+        return [hash(variant) for variant in _deletes(plate.translate(_SKELETON_TABLE), self.max_edits)]
+
+    def build(self, plates: Iterable[str]) -> None:
+        """
+        Строит индекс заново по набору номеров.
+
+        :param plates: Номерные знаки (нормализуются автоматически).
+        """
+        self._plates = []
+        self._known = set()
+        self._pending = {}
+        keys = []
+        ids = []
+        for license_plate in plates:
+            plate = normalize_plate(license_plate)
+            if plate in self._known:
+                continue
+            self._known.add(plate)
+            plate_hashes = self._variant_hashes(plate)
+            keys.extend(plate_hashes)
+            ids.extend([len(self._plates)] * len(plate_hashes))
+            self._plates.append(plate)
+
+        keys = np.fromiter(keys, dtype=np.int64, count=len(keys))
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._ids = np.asarray(ids, dtype=np.int32)[order]
+
+    def add(self, license_plate: str) -> None:
+        """
+        Добавляет номер в индекс без перестройки.
+
+        :param license_plate: Номерной знак (нормализуется автоматически).
+        """
+        plate = normalize_plate(license_plate)
+        if plate in self._known:
+            return
+        self._known.add(plate)
+        plate_id = len(self._plates)
+        self._plates.append(plate)
+        for key in self._variant_hashes(plate):
+            self._pending.setdefault(key, []).append(plate_id)
+
+    def lookup(self, license_plate: str, max_distance: float = 1.0) -> Optional[PlateMatch]:
+        """
+        Ищет ближайший разрешенный номер.
+
+        :param license_plate: Распознанный номер.
+        :param max_distance: Максимальное допустимое взвешенное расстояние.
+        :return: PlateMatch или None, если подходящего номера нет.
+        """
+        plate = normalize_plate(license_plate)
+        if plate in self._known:
+            return PlateMatch(plate, 0.0)
+
+        query = np.array(self._variant_hashes(plate), dtype=np.int64)
+        left = np.searchsorted(self._keys, query, side="left")
+        right = np.searchsorted(self._keys, query, side="right")
+        candidates = set()
+        for start, stop in zip(left[left < right], right[left < right]):
+            candidates.update(self._ids[start:stop].tolist())
+        for key in query.tolist():
+            candidates.update(self._pending.get(key, ()))
+
+        best = None
+        for plate_id in candidates:
+            candidate = self._plates[plate_id]
+            distance = plate_distance(plate, candidate)
+            if distance <= max_distance and (best is None or distance < best.distance):
+                best = PlateMatch(candidate, distance)
+        return best
@@ -0,0 +1,287 @@
+import asyncio
+import time
+from typing import Iterable, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from src.access_control.fuzzy_match import FuzzyPlateIndex, PlateMatch
+from src.config.config import Config
+from src.database.database import AsyncSessionLocal
+from src.database.models import Vehicle
+from src.utils.logger import access_control_logger
+from src.utils.plate_format import normalize_plate
+
+
+class PlateSource:
+    """
+    Источник разрешенных номерных знаков для PlateIndex.
+
+    Маркер изменений - непрозрачное значение, по которому источник
+    определяет, что изменилось с момента предыдущей загрузки.
+    """
+
+    async def load_all(self) -> Tuple[Set[str], object]:
+        """
+        Загружает все разрешенные номера.
+
+        :return: Кортеж (множество номеров, маркер изменений).
+        """
+        raise NotImplementedError
+
+    async def load_changes(self, marker) -> Optional[Tuple[Set[str], object]]:
+        """
+        Загружает номера, добавленные после маркера.
+
+        :param marker: Маркер предыдущей загрузки.
+        :return: Кортеж (добавленные номера, новый маркер) или None, если
+            инкрементальное обновление невозможно и нужна полная перезагрузка.
+        """
+        raise NotImplementedError
+
+
+class DatabasePlateSource(PlateSource):
+    """
+    Источник номеров из таблицы vehicles.
+
+    Маркер изменений - пара (число записей, максимальный id). Если
+    изменился только максимальный id и число записей выросло ровно на
+    число новых строк, догружаются только строки с id больше прежнего
+    максимума; в остальных случаях (удаления) нужна полная перезагрузка.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def _read_marker(self, session) -> Tuple[int, int]:
+        result = await session.execute(select(func.count(Vehicle.id), func.max(Vehicle.id)))
+        count, max_id = result.one()
+        return count, max_id or 0
+
+    async def load_all(self) -> Tuple[Set[str], object]:
+        async with self.session_factory() as session:
+            marker = await self._read_marker(session)
+            result = await session.stream_scalars(select(Vehicle.plate_key))
+            plates = {plate async for plate in result}
+        return plates, marker
+
+    async def load_changes(self, marker) -> Optional[Tuple[Set[str], object]]:
+        async with self.session_factory() as session:
+            new_marker = await self._read_marker(session)
+            if new_marker == marker:
+                return set(), marker
+
+            count, max_id = marker
+            result = await session.execute(
+                select(Vehicle.plate_key).where(Vehicle.id > max_id)
+            )
+            added = set(result.scalars().all())
+            if new_marker[0] != count + len(added):
+                return None
+        return added, new_marker
+
+
+class StaticPlateSource(PlateSource):
+    """Источник номеров в памяти - замена базы данных для тестов и отладки."""
+
+    def __init__(self, plates: Iterable[str] = ()):
+        self._plates = list(plates)
+        self._deleted = 0
+
+    def add(self, license_plate: str) -> None:
+        self._plates.append(license_plate)
+
+    def remove(self, license_plate: str) -> None:
+        self._plates.remove(license_plate)
+        self._deleted += 1
+
+    async def load_all(self) -> Tuple[Set[str], object]:
+        return set(self._plates), (len(self._plates), self._deleted)
+
+    async def load_changes(self, marker) -> Optional[Tuple[Set[str], object]]:
+        loaded, deleted = marker
+        if deleted != self._deleted:
+            return None
+        return set(self._plates[loaded:]), (len(self._plates), self._deleted)
+
+
+class PlateIndex:
+    """
+    Индекс разрешенных номерных знаков в памяти.
+
+    Загружается из источника целиком при старте и поддерживается в
+    актуальном состоянии периодическим инкрементальным обновлением.
+    Пока индекс загружен и не устарел, он считается авторитетным:
+    проверка доступа сводится к поиску в множестве. Если индекс не
+    загружен или давно не обновлялся, lookup() возвращает None, и
+    вызывающий код обращается к базе данных.
+
+    Номера хранятся в нормализованном виде (normalize_plate). Если задано
+    fuzzy_max_distance, параллельно поддерживается FuzzyPlateIndex для
+    поиска ближайшего номера с учетом ошибок OCR.
+    """
+
+    def __init__(
+        self,
+        source: PlateSource,
+        max_staleness: float = None,
+        full_reload_interval: float = None,
+        fuzzy_max_distance: float = None,
+    ):
+        """
+        :param source: Источник разрешенных номеров.
+        :param max_staleness: Через сколько секунд без обновления индекс перестает быть авторитетным.
+        :param full_reload_interval: Период полной перезагрузки (учитывает изменения существующих записей).
+        :param fuzzy_max_distance: Максимальное расстояние нечеткого совпадения (0 - отключено).
+        """
+        config = Config()
+        self.source = source
+        self.max_staleness = (
+            max_staleness if max_staleness is not None else config.PLATE_CACHE_MAX_STALENESS
+        )
+        self.full_reload_interval = (
+            full_reload_interval
+            if full_reload_interval is not None
+            else config.PLATE_CACHE_FULL_RELOAD_INTERVAL
+        )
+        self.fuzzy_max_distance = (
+            fuzzy_max_distance if fuzzy_max_distance is not None else config.FUZZY_MATCH_MAX_DISTANCE
+        )
+        self.fuzzy_max_edits = config.FUZZY_MATCH_MAX_EDITS
+        self.fuzzy_index: Optional[FuzzyPlateIndex] = None
+
+        self._plates: Set[str] = set()
+        self._marker = None
+        self._lock = asyncio.Lock()
+        self.ready = False
+        self.loaded_at = 0.0
+        self.refreshed_at = 0.0
+
+        self.found = 0
+        self.not_found = 0
+        self.fallbacks = 0
+        self.full_reloads = 0
+        self.fuzzy_matches = 0
+
+    @property
+    def staleness(self) -> float:
+        """Время в секундах с момента последнего успешного обновления."""
+        if not self.ready:
+            return float("inf")
+        return time.monotonic() - self.refreshed_at
+
+    def __len__(self) -> int:
+        return len(self._plates)
+
+    async def load(self) -> None:
+        """Полностью загружает индекс из источника."""
+        async with self._lock:
+            started_at = time.monotonic()
+            plates, marker = await self.source.load_all()
+            plates = {normalize_plate(plate) for plate in plates}
+            if self.fuzzy_max_distance > 0:
+                # Построение нечеткого индекса занимает около секунды на 100 тыс.
+                # номеров, поэтому выполняется вне цикла событий
+                self.fuzzy_index = await asyncio.to_thread(
+                    FuzzyPlateIndex, plates, self.fuzzy_max_edits
+                )
+            self._plates, self._marker = plates, marker
+            self.loaded_at = self.refreshed_at = time.monotonic()
+            self.ready = True
+            self.full_reloads += 1
+        access_control_logger.info(
+            "Индекс номеров загружен: %s записей за %.3f с", len(plates), time.monotonic() - started_at
+        )
+
+    async def refresh(self) -> None:
+        """Инкрементально обновляет индекс, при необходимости - полной перезагрузкой."""
+        if not self.ready or time.monotonic() - self.loaded_at >= self.full_reload_interval:
+            await self.load()
+            return
+
+        async with self._lock:
+            changes = await self.source.load_changes(self._marker)
+            if changes is not None:
+                added, self._marker = changes
+                for plate in added:
+                    self.add(plate)
+                self.refreshed_at = time.monotonic()
+                if added:
+                    access_control_logger.info("В индекс номеров добавлено %s записей", len(added))
+                return
+        await self.load()
+
+    async def run_refresher(self, interval: float = None) -> None:
+        """
+        Периодически обновляет индекс. Предназначен для запуска как фоновая задача.
+
+        :param interval: Период обновления в секундах (по умолчанию Config.PLATE_CACHE_REFRESH_INTERVAL).
+        """
+        interval = interval or Config().PLATE_CACHE_REFRESH_INTERVAL
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                access_control_logger.error("Ошибка обновления индекса номеров: %s", e)
+            await asyncio.sleep(interval)
+
+    def add(self, license_plate: str) -> None:
+        """Добавляет номер в индекс сразу, не дожидаясь обновления из источника."""
+        plate = normalize_plate(license_plate)
+        self._plates.add(plate)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.add(plate)
+
+    def lookup(self, license_plate: str) -> Optional[bool]:
+        """
+        Проверяет номер по индексу.
+
+        :param license_plate: Номерной знак.
+        :return: True/False, если индекс авторитетен, иначе None.
+        """
+        if self.staleness > self.max_staleness:
+            self.fallbacks += 1
+            return None
+        if normalize_plate(license_plate) in self._plates:
+            self.found += 1
+            return True
+        self.not_found += 1
+        return False
+
+    def closest(self, license_plate: str) -> Optional[PlateMatch]:
+        """
+        Ищет ближайший разрешенный номер с учетом типичных ошибок OCR.
+
+        :param license_plate: Распознанный номер.
+        :return: PlateMatch с номером и расстоянием или None, если нечеткий
+            поиск отключен, индекс устарел или подходящего номера нет.
+        """
+        if self.fuzzy_index is None or self.staleness > self.max_staleness:
+            return None
+        match = self.fuzzy_index.lookup(license_plate, self.fuzzy_max_distance)
+        if match is not None and match.distance > 0:
+            self.fuzzy_matches += 1
+        return match
+
+    def stats(self) -> dict:
+        """
+        Возвращает размер индекса, его устаревание и статистику обращений.
+
+        Доля попаданий (hit_rate) - доля проверок, на которые индекс ответил
+        без обращения к базе данных.
+        """
+        served = self.found + self.not_found
+        lookups = served + self.fallbacks
+        return {
+            "ready": self.ready,
+            "size": len(self._plates),
+            "staleness": self.staleness if self.ready else None,
+            "found": self.found,
+            "not_found": self.not_found,
+            "fallbacks": self.fallbacks,
+            "hit_rate": served / lookups if lookups else 0.0,
+            "full_reloads": self.full_reloads,
+            "fuzzy_matches": self.fuzzy_matches,
+        }
@@ -0,0 +1,274 @@
+# src/data_generation/exporters.py
+
+import asyncio
+import csv
+import json
+import os
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator, List
+
+from src.database.bulk_import import iter_csv_rows, iter_json_rows
+
+# Столбцы набора номерных знаков во всех форматах
+FIELDS = ("number", "region", "vehicle_type")
+
+# Сколько строк записывается за одно обращение к файлу
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def _item_rows(item) -> Iterable[dict]:
+    """Строки одного элемента набора: PlateChunk, LicensePlate или словаря."""
+    if hasattr(item, "vehicle_types"):
+        return item.rows()
+    if isinstance(item, dict):
+        return (item,)
+    vehicle_type = getattr(item.vehicle_type, "value", item.vehicle_type)
+    return ({"number": item.number, "region": item.region, "vehicle_type": vehicle_type},)
+
+
+def iter_rows(items: Iterable) -> Iterator[dict]:
+    """
+    Разворачивает набор данных в поток словарей.
+
+    :param items: Итератор PlateChunk, LicensePlate или словарей.
+    :return: Итератор словарей с полями FIELDS.
+    """
+    for item in items:
+        yield from _item_rows(item)
+
+
+def _iter_batches(items: Iterable, batch_size: int) -> Iterator[List[dict]]:
+    rows = iter_rows(items)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _atomic_path(path: str) -> str:
+    """Временный путь рядом с целевым файлом: файл появляется только после полной записи."""
+    return f"{path}.part"
+
+
+def _remove_partial(temporary: str) -> None:
+    """Удаляет недописанный временный файл после ошибки записи."""
+    try:
+        os.remove(temporary)
+    except FileNotFoundError:
+        pass
+
+
+def write_ndjson(items: Iterable, path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Потоково записывает набор в NDJSON (один объект на строку).
+
+    :param items: Итератор PlateChunk, LicensePlate или словарей.
+    :param path: Путь к файлу.
+    :param batch_size: Число строк в одной записи в файл.
+    :return: Число записанных строк.
+    """
+    written = 0
+    temporary = _atomic_path(path)
+    try:
+        with open(temporary, "w", encoding="utf-8") as f:
+            for batch in _iter_batches(items, batch_size):
+                f.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in batch))
+                written += len(batch)
+    except BaseException:
+        _remove_partial(temporary)
+        raise
+    os.replace(temporary, path)
+    return written
+
+
+def write_json(items: Iterable, path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Потоково записывает набор в JSON-массив (по объекту на строку), не собирая его в памяти.
+
+    :param items: Итератор PlateChunk, LicensePlate или словарей.
+    :param path: Путь к файлу.
+    :param batch_size: Число строк в одной записи в файл.
+    :return: Число записанных строк.
+    """
+    written = 0
+    temporary = _atomic_path(path)
+    try:
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write("[")
+            for batch in _iter_batches(items, batch_size):
+                separator = ",\n    " if written else "\n    "
+                f.write(separator + ",\n    ".join(json.dumps(row, ensure_ascii=False) for row in batch))
+                written += len(batch)
+            f.write("\n]\n" if written else "]\n")
+    except BaseException:
+        _remove_partial(temporary)
+        raise
+    os.replace(temporary, path)
+    return written
+
+
+def write_csv(items: Iterable, path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Потоково записывает набор в CSV с заголовком.
+
+    :param items: Итератор PlateChunk, LicensePlate или словарей.
+    :param path: Путь к файлу.
+    :param batch_size: Число строк в одной записи в файл.
+    :return: Число записанных строк.
+    """
+    written = 0
+    temporary = _atomic_path(path)
+    try:
+        with open(temporary, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for batch in _iter_batches(items, batch_size):
+                writer.writerows(batch)
+                written += len(batch)
+    except BaseException:
+        _remove_partial(temporary)
+        raise
+    os.replace(temporary, path)
+    return written
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Для формата Parquet необходимо установить пакет pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+def write_parquet(items: Iterable, path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Потоково записывает набор в Parquet: каждая часть становится группой строк.
+
+    Части PlateChunk передаются в pyarrow столбцами без преобразования
+    в словари; тип ТС хранится словарным кодированием.
+
+    :param items: Итератор PlateChunk, LicensePlate или словарей.
+    :param path: Путь к файлу.
+    :param batch_size: Число строк в группе для LicensePlate и словарей.
+    :return: Число записанных строк.
+    """
+    pa, pq = _import_pyarrow()
+    schema = pa.schema([(name, pa.string()) for name in FIELDS])
+
+    def tables() -> Iterator:
+        pending = []
+        for item in items:
+            if hasattr(item, "vehicle_types"):
+                if pending:
+                    yield pa.Table.from_pylist(pending, schema=schema)
+                    pending = []
+                yield pa.table(
+                    [pa.array(item.numbers), pa.array(item.regions), pa.array(item.vehicle_types)],
+                    schema=schema,
+                )
+                continue
+            pending.extend(_item_rows(item))
+            if len(pending) >= batch_size:
+                yield pa.Table.from_pylist(pending, schema=schema)
+                pending = []
+        if pending:
+            yield pa.Table.from_pylist(pending, schema=schema)
+
+    written = 0
+    temporary = _atomic_path(path)
+    try:
+        with pq.ParquetWriter(temporary, schema, use_dictionary=["vehicle_type", "region"]) as writer:
+            for table in tables():
+                writer.write_table(table)
+                written += table.num_rows
+    except BaseException:
+        _remove_partial(temporary)
+        raise
+    os.replace(temporary, path)
+    return written
+
+
+def read_parquet(path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[dict]:
+    """
+    Потоково читает Parquet файл по группам строк.
+
+    :param path: Путь к файлу.
+    :param batch_size: Число строк, читаемых за раз.
+    :return: Итератор словарей.
+    """
+    _, pq = _import_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+WRITERS = {
+    "ndjson": write_ndjson,
+    "json": write_json,
+    "csv": write_csv,
+    "parquet": write_parquet,
+}
+
+
+def detect_format(path: str) -> str:
+    """Определяет формат набора по расширению файла."""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "jsonl":
+        return "ndjson"
+    if extension not in WRITERS:
+        raise ValueError(f"Неизвестный формат набора данных: {path}")
+    return extension
+
+
+def write_dataset(items: Iterable, path: str, fmt: str = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Записывает набор в файл в формате fmt (по умолчанию - по расширению).
+
+    :return: Число записанных строк.
+    """
+    return WRITERS[fmt or detect_format(path)](items, path, batch_size)
+
+
+def read_dataset(path: str, fmt: str = None) -> Iterator[dict]:
+    """
+    Потоково читает набор из файла в формате fmt (по умолчанию - по расширению).
+
+    :return: Итератор словарей.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == "parquet":
+        return read_parquet(path)
+    if fmt == "csv":
+        return iter_csv_rows(path)
+    return iter_json_rows(path)
+
+
+async def export_dataset(items: Iterable, path: str, fmt: str = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Асинхронно записывает набор в файл.
+
+    Генерация строк, сериализация и запись выполняются в отдельном потоке,
+    поэтому цикл событий (веб-сервер) не блокируется даже на наборах
+    в миллионы строк. items не должен использовать цикл событий.
+
+    :return: Число записанных строк.
+    """
+    return await asyncio.to_thread(write_dataset, items, path, fmt, batch_size)
+
+
+async def aread_dataset(path: str, fmt: str = None, batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+    """
+    Асинхронно читает набор из файла частями по batch_size строк.
+
+    Чтение и разбор каждой части выполняются в отдельном потоке.
+
+    :return: Асинхронный итератор списков словарей.
+    """
+    rows = read_dataset(path, fmt)
+    while True:
+        batch = await asyncio.to_thread(lambda: list(islice(rows, batch_size)))
+        if not batch:
+            return
+        yield batch
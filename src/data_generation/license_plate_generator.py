@@ -1,14 +1,16 @@
 # src.data_generation.license_plate_generator
 
-import json
-import csv
+import math
 import random
-from typing import List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
+import numpy as np
+
 from src.config.config import Config
-from src.database.models import Vehicle, VehicleType
-from src.database.database import AsyncSessionLocal
+from src.database.models import VehicleType
+from src.database.bulk_import import bulk_import_vehicles
+from src.data_generation.exporters import export_dataset, iter_rows
 
 config = Config()  # Инициализируем конфигурацию
 
@@ -26,6 +28,12 @@ class LicensePlateGenerator:
     ALLOWED_LETTERS: str = "АВЕКМНОРСТУХ"
     # Список кодов регионов (от 01 до 99 и от 102 до 199)
     REGIONS: List[str] = [f"{i:02d}" for i in range(1, 100)] + [f"{i:03d}" for i in range(102, 200)]
+    # Форматы номера без региона: X - буква из ALLOWED_LETTERS, 0 - цифра
+    FORMATS: Dict[VehicleType, str] = {
+        VehicleType.CAR: "X000XX",
+        VehicleType.TRUCK: "X000XX",
+        VehicleType.MOTORCYCLE: "0000XX",
+    }
 
     @staticmethod
     def generate_passenger_plate() -> Tuple[str, str]:
@@ -67,46 +75,172 @@ class LicensePlateGenerator:
         
         return LicensePlate(number, region, vehicle_type)
 
-def generate_dataset(size: int) -> List[LicensePlate]:
-    """Генерирует набор данных номерных знаков."""
-    vehicle_types = [VehicleType.CAR, VehicleType.TRUCK, VehicleType.MOTORCYCLE]
-    dataset = []
-    for _ in range(size):
-        vehicle_type = random.choice(vehicle_types)
-        plate = LicensePlateGenerator.generate_plate(vehicle_type)
-        dataset.append(plate)
-    return dataset
-
-async def save_to_json(dataset: List[LicensePlate], filename: str):
-    """Асинхронно сохраняет датасет в JSON файл."""
-    # Преобразуем данные перед записью
-    data = [
-        {
-            'number': plate.number,
-            'region': plate.region,
-            'vehicle_type': plate.vehicle_type.value
-        }
-        for plate in dataset
-    ]
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
-
-async def save_to_csv(dataset: List[LicensePlate], filename: str):
-    """Асинхронно сохраняет датасет в CSV файл."""
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['number', 'region', 'vehicle_type'])  # Заголовки
-        for plate in dataset:
-            writer.writerow([plate.number, plate.region, plate.vehicle_type.value])
-
-async def save_to_database(dataset: List[LicensePlate]):
-    """Асинхронно сохраняет датасет в базу данных PostgreSQL."""
-    async with AsyncSessionLocal() as session:
-        for plate in dataset:
-            vehicle = Vehicle(
-                license_plate=f"{plate.number}{plate.region}",
-                vehicle_type=plate.vehicle_type
-            )
-            session.add(vehicle)
-        await session.commit()
- 
\ No newline at end of file
+@dataclass
+class PlateChunk:
+    """Часть набора номерных знаков в виде столбцов NumPy."""
+    numbers: np.ndarray  # Номера (строки)
+    regions: np.ndarray  # Коды регионов (строки)
+    vehicle_types: np.ndarray  # Значения VehicleType (строки)
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def plates(self) -> Iterator[LicensePlate]:
+        """Возвращает номера части как объекты LicensePlate."""
+        for number, region, vehicle_type in zip(
+            self.numbers.tolist(), self.regions.tolist(), self.vehicle_types.tolist()
+        ):
+            yield LicensePlate(number, region, VehicleType(vehicle_type))
+
+    def rows(self) -> Iterator[dict]:
+        """Возвращает номера части как словари (для экспорта и импорта в базу)."""
+        for number, region, vehicle_type in zip(
+            self.numbers.tolist(), self.regions.tolist(), self.vehicle_types.tolist()
+        ):
+            yield {"number": number, "region": region, "vehicle_type": vehicle_type}
+
+
+class PlateSpace:
+    """
+    Пространство номерных знаков одного формата с взаимно однозначной
+    нумерацией: индекс раскладывается в смешанной системе счисления на
+    регион, цифры и буквы.
+
+    Уникальность без хранения выданных номеров обеспечивается случайной
+    перестановкой индексов i -> (a * i + b) mod size, где a взаимно просто
+    с size. Чтобы соседние номера не отличались на постоянный шаг, каждая
+    составляющая (регион, цифры, буквы) дополнительно пропускается через
+    собственную случайную перестановку - композиция остается биекцией.
+    """
+
+    def __init__(self, letters_count: int, digits_count: int, rng: np.random.Generator):
+        """
+        :param letters_count: Число букв в номере.
+        :param digits_count: Число цифр в номере.
+        :param rng: Генератор случайных чисел для выбора перестановки.
+        """
+        self.letters_count = letters_count
+        self.digits_count = digits_count
+        self._region_permutation = rng.permutation(len(_REGIONS))
+        self._digits_permutation = rng.permutation(10 ** digits_count)
+        self._letters_permutation = rng.permutation(len(_LETTER_CODES) ** letters_count)
+        self.size = len(_REGIONS) * len(self._digits_permutation) * len(self._letters_permutation)
+        self.issued = 0
+
+        self.multiplier = int(rng.integers(1, self.size))
+        while math.gcd(self.multiplier, self.size) != 1:
+            self.multiplier = int(rng.integers(1, self.size))
+        self.offset = int(rng.integers(0, self.size))
+
+    def take(self, count: int):
+        """
+        Выдает count новых уникальных номеров.
+
+        :return: Кортеж (коды цифр [count, digits_count], коды букв
+            [count, letters_count], индексы регионов).
+        :raise ValueError: Если пространство номеров исчерпано.
+        """
+        if self.issued + count > self.size:
+            raise ValueError(f"Исчерпано пространство номеров ({self.size})")
+        positions = np.arange(self.issued, self.issued + count, dtype=np.int64)
+        self.issued += count
+        indexes = (positions * self.multiplier + self.offset) % self.size
+
+        regions = self._region_permutation[indexes % len(_REGIONS)]
+        indexes //= len(_REGIONS)
+        number = self._digits_permutation[indexes % len(self._digits_permutation)]
+        indexes //= len(self._digits_permutation)
+        letters_index = self._letters_permutation[indexes]
+
+        digits = np.empty((count, self.digits_count), dtype=np.uint32)
+        for column in range(self.digits_count - 1, -1, -1):
+            digits[:, column] = _DIGIT_BASE + number % 10
+            number //= 10
+        letters = np.empty((count, self.letters_count), dtype=np.uint32)
+        for column in range(self.letters_count):
+            letters[:, column] = _LETTER_CODES[letters_index % len(_LETTER_CODES)]
+            letters_index //= len(_LETTER_CODES)
+        return digits, letters, regions
+
+
+_LETTER_CODES = np.array([ord(letter) for letter in LicensePlateGenerator.ALLOWED_LETTERS], dtype=np.uint32)
+_DIGIT_BASE = ord("0")
+_REGIONS = np.array(LicensePlateGenerator.REGIONS)
+_VEHICLE_TYPES = np.array([vehicle_type.value for vehicle_type in VehicleType])
+
+
+def _as_strings(codes: np.ndarray) -> np.ndarray:
+    """Склеивает матрицу кодов символов [n, длина] в массив строк без цикла Python."""
+    return np.ascontiguousarray(codes).view(f"<U{codes.shape[1]}").ravel()
+
+
+def generate_dataset_chunks(
+    size: int, chunk_size: int = 100_000, seed: Optional[int] = None
+) -> Iterator[PlateChunk]:
+    """
+    Генерирует набор уникальных номерных знаков частями фиксированного размера.
+
+    Типы ТС, буквы, цифры и регионы выбираются векторно из генератора NumPy
+    с заданным seed. Легковые и грузовые автомобили используют общее
+    пространство номеров X000XX, мотоциклы - 0000XX, поэтому номера
+    уникальны во всем наборе и не нарушают ограничение unique в таблице vehicles.
+
+    :param size: Общее число номеров.
+    :param chunk_size: Размер одной части.
+    :param seed: Seed для воспроизводимости (None - случайный).
+    :return: Итератор PlateChunk.
+    """
+    rng = np.random.default_rng(seed)
+    passenger_space = PlateSpace(letters_count=3, digits_count=3, rng=rng)
+    motorcycle_space = PlateSpace(letters_count=2, digits_count=4, rng=rng)
+    motorcycle_type = list(VehicleType).index(VehicleType.MOTORCYCLE)
+
+    for start in range(0, size, chunk_size):
+        count = min(chunk_size, size - start)
+        type_indexes = rng.integers(0, len(_VEHICLE_TYPES), size=count)
+        is_motorcycle = type_indexes == motorcycle_type
+        motorcycles = int(is_motorcycle.sum())
+
+        numbers = np.empty(count, dtype="<U6")
+        regions = np.empty(count, dtype=np.int64)
+
+        # Формат X000XX: буква, три цифры, две буквы
+        digits, letters, passenger_regions = passenger_space.take(count - motorcycles)
+        numbers[~is_motorcycle] = _as_strings(
+            np.concatenate([letters[:, :1], digits, letters[:, 1:]], axis=1)
+        )
+        regions[~is_motorcycle] = passenger_regions
+
+        # Формат 0000XX: четыре цифры, две буквы
+        digits, letters, motorcycle_regions = motorcycle_space.take(motorcycles)
+        numbers[is_motorcycle] = _as_strings(np.concatenate([digits, letters], axis=1))
+        regions[is_motorcycle] = motorcycle_regions
+
+        yield PlateChunk(numbers, _REGIONS[regions], _VEHICLE_TYPES[type_indexes])
+
+
+def iter_dataset(size: int, chunk_size: int = 100_000, seed: Optional[int] = None) -> Iterator[LicensePlate]:
+    """Генерирует уникальные номерные знаки по одному, не храня весь набор в памяти."""
+    for chunk in generate_dataset_chunks(size, chunk_size, seed):
+        yield from chunk.plates()
+
+
+def generate_dataset(size: int, seed: Optional[int] = None) -> List[LicensePlate]:
+    """Генерирует набор данных уникальных номерных знаков."""
+    return list(iter_dataset(size, seed=seed))
+
+async def save_to_json(dataset: Iterable, filename: str):
+    """Асинхронно и потоково сохраняет датасет (LicensePlate или PlateChunk) в JSON файл."""
+    await export_dataset(dataset, filename, "json")
+
+async def save_to_csv(dataset: Iterable, filename: str):
+    """Асинхронно и потоково сохраняет датасет (LicensePlate или PlateChunk) в CSV файл."""
+    await export_dataset(dataset, filename, "csv")
+
+async def save_to_parquet(dataset: Iterable, filename: str):
+    """Асинхронно и потоково сохраняет датасет (LicensePlate или PlateChunk) в Parquet файл."""
+    await export_dataset(dataset, filename, "parquet")
+
+async def save_to_database(dataset: Iterable):
+    """Асинхронно сохраняет датасет в базу данных PostgreSQL (дубликаты номеров пропускаются)."""
+    await bulk_import_vehicles(iter_rows(dataset))
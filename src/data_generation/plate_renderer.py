@@ -0,0 +1,391 @@
+# src.data_generation.plate_renderer
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.data_generation.exporters import write_ndjson
+from src.data_generation.license_plate_generator import generate_dataset_chunks
+from src.database.models import VehicleType
+from src.utils.plate_format import CYRILLIC_TO_LATIN
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+# Высота цифры шрифта FONT при масштабе 1.0, пикселей
+_FONT_HEIGHT = cv2.getTextSize("0", FONT, 1.0, 1)[0][1]
+
+# Размеры табличек в миллиметрах (ГОСТ Р 50577): автомобильная однострочная
+# и мотоциклетная двухстрочная. Шаблоны рисуются в масштабе 1 пиксель = 1 мм.
+CAR_PLATE_SIZE = (520, 112)
+MOTORCYCLE_PLATE_SIZE = (245, 160)
+
+PLATE_COLOR = (240, 240, 240)
+INK_COLOR = (25, 25, 25)
+
+
+@dataclass
+class RenderOptions:
+    """Параметры кадров и вероятности аугментаций."""
+    width: int = 640  # Размер кадра сцены
+    height: int = 480
+    scene: bool = True  # False - только изображение таблички (корпус для OCR)
+    plate_width: Tuple[int, int] = (90, 240)  # Ширина автомобильной таблички в кадре, пикселей
+    perspective: float = 0.12  # Максимальное смещение углов таблички (доля ее ширины и высоты)
+    blur: float = 0.4  # Вероятность размытия по Гауссу
+    motion_blur: float = 0.2  # Вероятность смаза движения
+    noise: float = 0.5  # Вероятность шума сенсора
+    night: float = 0.25  # Вероятность ночного освещения
+    jpeg_quality: Tuple[int, int] = (60, 95)
+
+
+@dataclass
+class RenderReport:
+    """Итоги генерации набора изображений."""
+    rendered: int = 0
+    elapsed: float = 0.0
+    seed: Optional[int] = None
+    output_dir: str = ""
+    labels_path: str = ""
+    by_vehicle_type: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def images_per_hour(self) -> float:
+        return self.rendered / self.elapsed * 3600 if self.elapsed else 0.0
+
+
+def _put_centered(canvas: np.ndarray, text: str, cell: Tuple[int, int, int, int], height: int) -> None:
+    """Рисует текст высотой height пикселей по центру ячейки (x, y, w, h)."""
+    x, y, w, h = cell
+    scale = height / _FONT_HEIGHT
+    thickness = max(1, round(height / 9))
+    (text_width, text_height), _ = cv2.getTextSize(text, FONT, scale, thickness)
+    origin = (x + (w - text_width) // 2, y + (h + text_height) // 2)
+    cv2.putText(canvas, text, origin, FONT, scale, INK_COLOR, thickness, cv2.LINE_AA)
+
+
+def _draw_rus(canvas: np.ndarray, x: int, y: int, w: int, h: int) -> None:
+    """Подпись RUS и флаг в поле региона."""
+    _put_centered(canvas, "RUS", (x, y, w * 2 // 3, h), h * 2 // 3)
+    flag_x, flag_w = x + w * 2 // 3 + 2, w // 3 - 6
+    band = max(1, h // 3)
+    for index, color in enumerate(((255, 255, 255), (170, 60, 0), (30, 30, 200))):
+        cv2.rectangle(canvas, (flag_x, y + index * band), (flag_x + flag_w, y + (index + 1) * band), color, -1)
+    cv2.rectangle(canvas, (flag_x, y), (flag_x + flag_w, y + 3 * band), INK_COLOR, 1)
+
+
+_templates: Dict[str, np.ndarray] = {}
+
+
+def _template(layout: str) -> np.ndarray:
+    """Пустая табличка с рамкой, полем региона и флагом; создается один раз на процесс."""
+    template = _templates.get(layout)
+    if template is None:
+        width, height = CAR_PLATE_SIZE if layout == "car" else MOTORCYCLE_PLATE_SIZE
+        template = np.full((height, width, 3), PLATE_COLOR, dtype=np.uint8)
+        cv2.rectangle(template, (3, 3), (width - 4, height - 4), INK_COLOR, 4)
+        if layout == "car":
+            cv2.line(template, (400, 3), (400, height - 4), INK_COLOR, 3)
+            _draw_rus(template, 410, 78, 100, 20)
+        else:
+            cv2.line(template, (150, 84), (150, height - 4), INK_COLOR, 3)
+            _draw_rus(template, 158, 132, 80, 18)
+        _templates[layout] = template
+    return template
+
+
+def render_plate(number: str, region: str, vehicle_type: str) -> np.ndarray:
+    """
+    Рисует табличку номерного знака (BGR) в масштабе 1 пиксель = 1 мм.
+
+    Буквы российских номеров (АВЕКМНОРСТУХ) совпадают по начертанию с
+    латинскими, поэтому рисуются латинскими двойниками: шрифты OpenCV не
+    содержат кириллицы.
+
+    :param number: Номер ("А123ВС" или "1234АВ" для мотоцикла).
+    :param region: Код региона.
+    :param vehicle_type: Значение VehicleType.
+    :return: Изображение таблички.
+    """
+    glyphs = number.translate(CYRILLIC_TO_LATIN)
+    if vehicle_type == VehicleType.MOTORCYCLE.value:
+        plate = _template("motorcycle").copy()
+        # Верхняя строка - четыре цифры, нижняя - две буквы и регион
+        for index, char in enumerate(glyphs[:4]):
+            _put_centered(plate, char, (18 + index * 52, 10, 52, 72), 58)
+        for index, char in enumerate(glyphs[4:]):
+            _put_centered(plate, char, (14 + index * 64, 86, 64, 66), 50)
+        _put_centered(plate, region, (154, 84, 88, 48), 38)
+        return plate
+
+    plate = _template("car").copy()
+    # Буква, три цифры, две буквы; цифры выше букв
+    x = 22
+    for index, char in enumerate(glyphs):
+        is_digit = char.isdigit()
+        width = 60 if is_digit else 56
+        _put_centered(plate, char, (x, 14 if is_digit else 30, width, 80 if is_digit else 64), 58 if is_digit else 44)
+        x += width + 6
+    _put_centered(plate, region, (404, 8, 112, 66), 42)
+    return plate
+
+
+def _background(rng: np.random.Generator, width: int, height: int) -> np.ndarray:
+    """Сцена: градиент асфальта, кузов автомобиля и несколько линий."""
+    top, bottom = rng.integers(60, 200, size=2)
+    column = np.linspace(top, bottom, height, dtype=np.float32)
+    tint = rng.uniform(0.85, 1.15, size=3).astype(np.float32)
+    frame = np.clip(column[:, None, None] * tint[None, None, :], 0, 255).astype(np.uint8)
+    frame = np.ascontiguousarray(np.broadcast_to(frame, (height, width, 3)))
+    body = tuple(int(c) for c in rng.integers(0, 256, size=3))
+    x1, x2 = sorted(rng.integers(0, width, size=2))
+    y1 = int(rng.integers(0, height // 3))
+    cv2.rectangle(frame, (int(x1) - width // 4, y1), (int(x2) + width // 4, height), body, -1)
+    for _ in range(int(rng.integers(2, 6))):
+        p1 = tuple(int(v) for v in rng.integers(0, (width, height)))
+        p2 = tuple(int(v) for v in rng.integers(0, (width, height)))
+        cv2.line(frame, p1, p2, tuple(int(c) for c in rng.integers(0, 256, size=3)), int(rng.integers(1, 6)))
+    return frame
+
+
+def _gamma_lut(gamma: float, gain: float) -> np.ndarray:
+    values = np.arange(256, dtype=np.float32) / 255.0
+    return np.clip((values ** gamma) * gain * 255.0, 0, 255).astype(np.uint8)
+
+
+def _motion_kernel(length: int, angle: float) -> np.ndarray:
+    kernel = np.zeros((length, length), dtype=np.float32)
+    kernel[length // 2, :] = 1.0
+    rotation = cv2.getRotationMatrix2D((length / 2 - 0.5, length / 2 - 0.5), angle, 1.0)
+    kernel = cv2.warpAffine(kernel, rotation, (length, length))
+    return kernel / max(kernel.sum(), 1e-6)
+
+
+def render_sample(
+    number: str, region: str, vehicle_type: str, rng: np.random.Generator, options: RenderOptions = None
+) -> Tuple[np.ndarray, dict]:
+    """
+    Рисует кадр с номерным знаком и разметку к нему.
+
+    :param number: Номер.
+    :param region: Код региона.
+    :param vehicle_type: Значение VehicleType.
+    :param rng: Генератор случайных чисел (положение, перспектива, аугментации).
+    :param options: Параметры кадра и аугментаций.
+    :return: Изображение (BGR) и разметка: box (x, y, w, h), quad (четыре угла
+        таблички по часовой стрелке от левого верхнего) и примененные аугментации.
+    """
+    options = options or RenderOptions()
+    plate = render_plate(number, region, vehicle_type)
+    plate_height, plate_width = plate.shape[:2]
+
+    # Масштаб общий для всех типов: мотоциклетная табличка в кадре меньше автомобильной
+    scale = rng.integers(*options.plate_width) / CAR_PLATE_SIZE[0]
+    width, height = max(8, round(plate_width * scale)), max(6, round(plate_height * scale))
+    corners = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float32)
+    # Смещение углов по каждой оси пропорционально стороне, чтобы четырехугольник не вырождался
+    quad = corners + rng.uniform(-1, 1, size=(4, 2)).astype(np.float32) * options.perspective * np.float32(
+        [width, height]
+    )
+    quad -= quad.min(axis=0)
+    box_width, box_height = (np.ceil(quad.max(axis=0)).astype(int) + 1).tolist()
+
+    night = rng.random() < options.night
+    if options.scene:
+        frame_width, frame_height = options.width, options.height
+        frame = _background(rng, frame_width, frame_height)
+        if night:
+            frame = cv2.LUT(frame, _gamma_lut(rng.uniform(1.8, 2.8), rng.uniform(0.4, 0.7)))
+        box_width, box_height = min(box_width, frame_width), min(box_height, frame_height)
+        offset_x = int(rng.integers(0, frame_width - box_width + 1))
+        # Табличка - в нижних двух третях кадра, как у подъезжающего автомобиля
+        offset_y = int(rng.integers(min(frame_height // 3, frame_height - box_height), frame_height - box_height + 1))
+    else:
+        frame = np.full((box_height + 8, box_width + 8, 3), PLATE_COLOR, dtype=np.uint8)
+        offset_x = offset_y = 4
+
+    # Перспектива применяется только к области таблички, а не ко всему кадру
+    source = np.array(
+        [[0, 0], [plate_width, 0], [plate_width, plate_height], [0, plate_height]], dtype=np.float32
+    )
+    transform = cv2.getPerspectiveTransform(source, quad)
+    warped = cv2.warpPerspective(plate, transform, (box_width, box_height), flags=cv2.INTER_AREA)
+    mask = cv2.warpPerspective(
+        np.full((plate_height, plate_width), 255, dtype=np.uint8), transform, (box_width, box_height)
+    )
+    if night:
+        # Световозвращающая табличка под ИК-подсветкой темнеет меньше сцены
+        warped = cv2.LUT(warped, _gamma_lut(rng.uniform(1.0, 1.4), rng.uniform(0.7, 0.95)))
+    roi = frame[offset_y : offset_y + box_height, offset_x : offset_x + box_width]
+    cv2.copyTo(warped, mask, roi)
+
+    augmentations = {"night": bool(night)}
+    if rng.random() < options.blur:
+        sigma = float(rng.uniform(0.5, 1.8))
+        frame = cv2.GaussianBlur(frame, (0, 0), sigma)
+        augmentations["blur_sigma"] = round(sigma, 2)
+    if rng.random() < options.motion_blur:
+        length = int(rng.integers(3, 10))
+        frame = cv2.filter2D(frame, -1, _motion_kernel(length, float(rng.uniform(0, 180))))
+        augmentations["motion_blur"] = length
+    if rng.random() < options.noise:
+        sigma = float(rng.uniform(3, 14))
+        noise = np.empty(frame.shape, dtype=np.int16)
+        cv2.randn(noise, 0, sigma)
+        frame = cv2.add(frame, noise, dtype=cv2.CV_8U)
+        augmentations["noise_sigma"] = round(sigma, 1)
+
+    quad += (offset_x, offset_y)
+    x, y = np.floor(quad.min(axis=0)).astype(int).tolist()
+    label = {
+        "license_plate": f"{number}{region}",
+        "number": number,
+        "region": region,
+        "vehicle_type": vehicle_type,
+        "box": [x, y, box_width - 1, box_height - 1],
+        "quad": np.round(quad.astype(np.float64), 1).tolist(),
+        "augmentations": augmentations,
+    }
+    return frame, label
+
+
+def _yolo_line(label: dict, frame_width: int, frame_height: int) -> str:
+    """Строка разметки YOLO: класс и центр/размер бокса в долях кадра."""
+    x, y, w, h = label["box"]
+    return f"0 {(x + w / 2) / frame_width:.6f} {(y + h / 2) / frame_height:.6f} {w / frame_width:.6f} {h / frame_height:.6f}\n"
+
+
+def _init_worker() -> None:
+    # Параллельность дают процессы; внутренние потоки OpenCV только мешали бы им
+    cv2.setNumThreads(1)
+
+
+def _render_chunk(task: tuple) -> List[dict]:
+    """Рисует и записывает часть набора; выполняется в процессе пула."""
+    chunk_index, start, plates, output_dir, options, seed, quality_range, yolo_labels = task
+    rng = np.random.default_rng([seed, chunk_index])
+    # Шум рисуется генератором OpenCV, его зерно тоже задается на часть
+    cv2.setRNGSeed(seed * 1_000_003 + chunk_index)
+    labels = []
+    for offset, (number, region, vehicle_type) in enumerate(plates):
+        frame, label = render_sample(number, region, vehicle_type, rng, options)
+        name = f"{start + offset:08d}"
+        quality = int(rng.integers(quality_range[0], quality_range[1] + 1))
+        cv2.imwrite(os.path.join(output_dir, "images", f"{name}.jpg"), frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if yolo_labels:
+            with open(os.path.join(output_dir, "labels", f"{name}.txt"), "w", encoding="utf-8") as f:
+                f.write(_yolo_line(label, frame.shape[1], frame.shape[0]))
+        labels.append({"image": f"images/{name}.jpg", "width": frame.shape[1], "height": frame.shape[0], **label})
+    return labels
+
+
+def _iter_tasks(count: int, output_dir: str, options: RenderOptions, seed: int, chunk_size: int, yolo_labels: bool):
+    start = 0
+    chunk_index = 0
+    for chunk in generate_dataset_chunks(count, chunk_size=chunk_size, seed=seed):
+        plates = list(zip(chunk.numbers.tolist(), chunk.regions.tolist(), chunk.vehicle_types.tolist()))
+        yield chunk_index, start, plates, output_dir, options, seed, options.jpeg_quality, yolo_labels
+        start += len(plates)
+        chunk_index += 1
+
+
+def render_dataset(
+    count: int,
+    output_dir: str,
+    workers: int = None,
+    seed: Optional[int] = None,
+    options: RenderOptions = None,
+    chunk_size: int = 256,
+    yolo_labels: bool = False,
+    progress: Optional[Callable[[RenderReport], None]] = None,
+) -> RenderReport:
+    """
+    Генерирует набор изображений номерных знаков с разметкой пулом процессов.
+
+    Номера берутся из generate_dataset_chunks (уникальные, форматы X000XX
+    и 0000XX), части по chunk_size номеров рисуются параллельно. Каждая
+    часть использует свое зерно, производное от seed и номера части,
+    поэтому набор воспроизводим при любом числе процессов. Изображения
+    пишутся в output_dir/images, разметка - в output_dir/labels.jsonl
+    (по строке на изображение, в порядке номеров), с yolo_labels -
+    также файлы разметки YOLO в output_dir/labels.
+
+    :param count: Число изображений.
+    :param output_dir: Каталог набора.
+    :param workers: Число процессов, по умолчанию - число ядер (1 - без пула).
+    :param seed: Зерно набора (None - случайное, сохраняется в отчете).
+    :param options: Параметры кадров и аугментаций.
+    :param chunk_size: Число изображений в одной задаче пула.
+    :param yolo_labels: Записывать разметку YOLO для обучения детектора.
+    :param progress: Вызывается с отчетом после каждой части.
+    :return: RenderReport.
+    """
+    options = options or RenderOptions()
+    workers = workers or os.cpu_count() or 1
+    seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+    os.makedirs(os.path.join(output_dir, "images"), exist_ok=True)
+    if yolo_labels:
+        os.makedirs(os.path.join(output_dir, "labels"), exist_ok=True)
+
+    report = RenderReport(seed=seed, output_dir=output_dir, labels_path=os.path.join(output_dir, "labels.jsonl"))
+    started_at = time.perf_counter()
+    tasks = _iter_tasks(count, output_dir, options, seed, chunk_size, yolo_labels)
+
+    def counted(results) -> Iterator[dict]:
+        for chunk_labels in results:
+            report.rendered += len(chunk_labels)
+            for label in chunk_labels:
+                report.by_vehicle_type[label["vehicle_type"]] = report.by_vehicle_type.get(label["vehicle_type"], 0) + 1
+            report.elapsed = time.perf_counter() - started_at
+            if progress is not None:
+                progress(report)
+            yield from chunk_labels
+
+    def labels() -> Iterator[dict]:
+        if workers == 1:
+            _init_worker()
+            results = map(_render_chunk, tasks)
+            yield from counted(results)
+            return
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            # map сохраняет порядок частей; задачи выдаются пулу с опережением
+            yield from counted(executor.map(_render_chunk, tasks))
+
+    write_ndjson(labels(), report.labels_path)
+    report.elapsed = time.perf_counter() - started_at
+    return report
+
+
+def _print_progress(report: RenderReport) -> None:
+    print(f"Нарисовано: {report.rendered} ({report.images_per_hour:,.0f} изображений/ч)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерация изображений номерных знаков с разметкой")
+    parser.add_argument("output_dir", help="Каталог набора")
+    parser.add_argument("--count", type=int, default=10_000, help="Число изображений")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов (по умолчанию - число ядер)")
+    parser.add_argument("--seed", type=int, default=None, help="Зерно для воспроизводимости")
+    parser.add_argument("--size", default="640x480", help="Размер кадра сцены, ШИРИНАxВЫСОТА")
+    parser.add_argument("--crops", action="store_true", help="Только изображения табличек (корпус для OCR)")
+    parser.add_argument("--yolo", action="store_true", help="Записывать разметку YOLO")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Изображений в одной задаче пула")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.lower().split("x"))
+    options = RenderOptions(width=width, height=height, scene=not args.crops)
+    report = render_dataset(
+        args.count, args.output_dir, workers=args.workers, seed=args.seed, options=options,
+        chunk_size=args.chunk_size, yolo_labels=args.yolo, progress=_print_progress,
+    )
+    print(f"Готово: {report.rendered} изображений за {report.elapsed:.1f} с, seed={report.seed}")
+    print(f"По типам ТС: {report.by_vehicle_type}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+# src/database/bulk_import.py
+
+import argparse
+import asyncio
+import csv
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.database.database import AsyncSessionLocal
+from src.database.models import Vehicle, VehicleType
+from src.utils.logger import configure_logging, database_logger
+from src.utils.plate_format import plate_key, split_plate
+
+# Названия типов ТС, встречающиеся в выгрузках (в том числе в src/data/license_plates.*)
+VEHICLE_TYPE_ALIASES = {
+    "легковой автомобиль": VehicleType.CAR,
+    "грузовой автомобиль": VehicleType.TRUCK,
+    "мотоцикл": VehicleType.MOTORCYCLE,
+}
+for _vehicle_type in VehicleType:
+    VEHICLE_TYPE_ALIASES[_vehicle_type.value] = _vehicle_type
+    VEHICLE_TYPE_ALIASES[_vehicle_type.name.lower()] = _vehicle_type
+
+_JSON_SEPARATORS = re.compile(r"[\s,]*")
+
+# Сколько отклоненных строк хранить в отчете (остальные только считаются)
+MAX_REPORTED_REJECTS = 100
+
+# Лимит параметров одного запроса (SQLite - 32766, PostgreSQL - больше) и
+# число параметров на строку (license_plate, plate_key, plate_number, plate_region, vehicle_type)
+MAX_BIND_PARAMETERS = 32766
+IMPORT_COLUMNS = 5
+MAX_CHUNK_SIZE = MAX_BIND_PARAMETERS // IMPORT_COLUMNS
+
+
+@dataclass
+class ImportReport:
+    """Итоги массового импорта."""
+    processed: int = 0  # Прочитано строк
+    written: int = 0  # Вставлено или обновлено записей
+    skipped: int = 0  # Пропущено как дубликаты
+    rejected: int = 0  # Отклонено как некорректные
+    rejected_rows: List[dict] = field(default_factory=list)  # Первые отклоненные строки с причиной
+    elapsed: float = 0.0
+
+    def reject(self, row, reason: str) -> None:
+        self.rejected += 1
+        if len(self.rejected_rows) < MAX_REPORTED_REJECTS:
+            self.rejected_rows.append({"row": row, "reason": reason})
+
+
+def iter_csv_rows(path: str) -> Iterator[dict]:
+    """
+    Построчно читает CSV файл с заголовком.
+
+    :param path: Путь к файлу.
+    :return: Итератор словарей.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def iter_json_rows(path: str, buffer_size: int = 1 << 16) -> Iterator[dict]:
+    """
+    Потоково читает JSON-массив объектов или NDJSON, не загружая файл целиком.
+
+    :param path: Путь к файлу.
+    :param buffer_size: Размер блока чтения в символах.
+    :return: Итератор словарей.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buffer = f.read(buffer_size)
+        position = _JSON_SEPARATORS.match(buffer).end()
+        if buffer[position : position + 1] == "[":
+            position += 1
+
+        while True:
+            position = _JSON_SEPARATORS.match(buffer, position).end()
+            if buffer[position : position + 1] == "]":
+                return
+            try:
+                row, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Объект обрезан границей блока - дочитываем файл
+                chunk = f.read(buffer_size)
+                if not chunk:
+                    if buffer[position:].strip():
+                        raise
+                    return
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield row
+
+
+def iter_file_rows(path: str) -> Iterator[dict]:
+    """Выбирает потоковый читатель по расширению файла (.csv, .json, .ndjson, .parquet)."""
+    if path.lower().endswith(".parquet"):
+        from src.data_generation.exporters import read_parquet
+
+        return read_parquet(path)
+    if path.lower().endswith(".csv"):
+        return iter_csv_rows(path)
+    return iter_json_rows(path)
+
+
+def parse_vehicle_row(row):
+    """
+    Преобразует строку импорта в значения для таблицы vehicles.
+
+    :param row: Словарь с полями license_plate или number/region и vehicle_type,
+        либо объект LicensePlate.
+    :return: Словарь значений (license_plate, plate_key, plate_number, plate_region, vehicle_type).
+    :raise ValueError: Если строка некорректна.
+    """
+    if isinstance(row, dict):
+        license_plate = row.get("license_plate")
+        number, region, vehicle_type = row.get("number"), row.get("region"), row.get("vehicle_type")
+    else:
+        license_plate = None
+        number, region, vehicle_type = row.number, row.region, row.vehicle_type
+
+    if not license_plate:
+        if not number or not region:
+            raise ValueError("не указан номер или регион")
+        license_plate = f"{str(number).strip()}{str(region).strip()}"
+
+    if not isinstance(vehicle_type, VehicleType):
+        vehicle_type = VEHICLE_TYPE_ALIASES.get(str(vehicle_type or "").strip().lower())
+        if vehicle_type is None:
+            raise ValueError("неизвестный тип транспортного средства")
+
+    license_plate = str(license_plate).strip().upper()
+    plate_number, plate_region = split_plate(license_plate)
+    return {
+        "license_plate": license_plate,
+        "plate_key": plate_key(license_plate),
+        "plate_number": plate_number,
+        "plate_region": plate_region,
+        "vehicle_type": vehicle_type,
+    }
+
+
+def _build_upsert(dialect_name: str, values: List[dict], update: bool):
+    """Строит многострочный INSERT ... ON CONFLICT для PostgreSQL или SQLite."""
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = insert(Vehicle).values(values)
+    # Конфликт - по каноническому ключу: написания номера латиницей и кириллицей совпадают
+    if update:
+        return statement.on_conflict_do_update(
+            index_elements=[Vehicle.plate_key],
+            set_={"vehicle_type": statement.excluded.vehicle_type},
+        )
+    return statement.on_conflict_do_nothing(index_elements=[Vehicle.plate_key])
+
+
+async def bulk_import_vehicles(
+    rows: Iterable,
+    chunk_size: int = 5000,
+    update: bool = False,
+    progress: Optional[Callable[[ImportReport], None]] = None,
+    session_factory=AsyncSessionLocal,
+) -> ImportReport:
+    """
+    Массово загружает транспортные средства в таблицу vehicles.
+
+    Строки читаются из итератора частями по chunk_size и записываются
+    многострочными INSERT ... ON CONFLICT, по одной транзакции на часть,
+    поэтому потребление памяти не зависит от размера источника, а
+    дубликат номера не прерывает импорт.
+
+    :param rows: Итератор словарей или объектов LicensePlate.
+    :param chunk_size: Число строк в одном INSERT (не больше MAX_CHUNK_SIZE из-за лимита параметров).
+    :param update: Обновлять тип ТС у существующих номеров (иначе дубликаты пропускаются).
+    :param progress: Функция, вызываемая после каждой записанной части.
+    :param session_factory: Фабрика асинхронных сессий.
+    :return: ImportReport с итогами.
+    :raise ValueError: Если chunk_size вне допустимого диапазона.
+    """
+    if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size должен быть от 1 до {MAX_CHUNK_SIZE}, получено {chunk_size}")
+    report = ImportReport()
+    started_at = time.monotonic()
+    iterator = iter(rows)
+
+    async with session_factory() as session:
+        dialect_name = session.bind.dialect.name
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+
+            values = {}
+            for row in chunk:
+                report.processed += 1
+                try:
+                    parsed = parse_vehicle_row(row)
+                except (ValueError, AttributeError) as e:
+                    report.reject(row if isinstance(row, dict) else repr(row), str(e))
+                    continue
+                # Повтор номера внутри одного INSERT ... ON CONFLICT недопустим
+                if parsed["plate_key"] in values:
+                    report.skipped += 1
+                values[parsed["plate_key"]] = parsed
+
+            if values:
+                result = await session.execute(
+                    _build_upsert(dialect_name, list(values.values()), update)
+                )
+                await session.commit()
+                written = max(result.rowcount, 0)
+                report.written += written
+                report.skipped += len(values) - written
+
+            report.elapsed = time.monotonic() - started_at
+            if progress is not None:
+                progress(report)
+
+    report.elapsed = time.monotonic() - started_at
+    database_logger.info(
+        "Импорт завершен: прочитано %s, записано %s, пропущено %s, отклонено %s за %.1f с",
+        report.processed, report.written, report.skipped, report.rejected, report.elapsed,
+    )
+    return report
+
+
+def _print_progress(report: ImportReport) -> None:
+    rate = report.processed / report.elapsed if report.elapsed else 0.0
+    print(
+        f"Прочитано: {report.processed}, записано: {report.written}, "
+        f"отклонено: {report.rejected} ({rate:.0f} строк/с)"
+    )
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description="Массовый импорт транспортных средств из CSV/JSON/NDJSON/Parquet")
+    parser.add_argument("path", help="Путь к файлу .csv, .json, .ndjson или .parquet")
+    parser.add_argument(
+        "--chunk-size", type=int, default=5000, help=f"Число строк в одном INSERT (не больше {MAX_CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        "--update", action="store_true", help="Обновлять тип ТС у уже существующих номеров"
+    )
+    args = parser.parse_args()
+    if not 1 <= args.chunk_size <= MAX_CHUNK_SIZE:
+        parser.error(f"--chunk-size должен быть от 1 до {MAX_CHUNK_SIZE}")
+
+    report = asyncio.run(
+        bulk_import_vehicles(
+            iter_file_rows(args.path),
+            chunk_size=args.chunk_size,
+            update=args.update,
+            progress=_print_progress,
+        )
+    )
+    for rejected in report.rejected_rows:
+        print(f"Отклонено: {rejected['row']} - {rejected['reason']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,79 @@
 # src/database/database.py
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import os
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.future import select
-from sqlalchemy.ext.declarative import declarative_base
 
 from src.config.config import Config
-from src.database.models import Vehicle, Base
+from src.database.engine import engines
+from src.database.models import Vehicle
 from src.utils.logger import database_logger
+from src.utils.plate_format import plate_key
 
 # Получение конфигурации
 config = Config()
 
-# Создание асинхронного движка базы данных
-engine = create_async_engine(config.DATABASE_URL, echo=True)
+# Фабрика сессий создается при первом обращении, а не при импорте
+_session_factory = None
+
+# Миграции Alembic (каталог alembic/ в корне проекта)
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic")
+
+def get_engine():
+    """
+    Возвращает общий асинхронный движок базы данных (Config.DATABASE_URL)
+    из реестра src.database.engine, создавая его при первом обращении.
+    """
+    return engines.get(config.DATABASE_URL)
+
+def get_session_factory():
+    """
+    Возвращает фабрику асинхронных сессий, создавая ее при первом обращении.
+    """
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(
+            bind=get_engine(), class_=AsyncSession, expire_on_commit=False
+        )
+    return _session_factory
+
+async def dispose_engines():
+    """
+    Закрывает соединения всех движков. Вызывается при остановке приложения.
+    """
+    global _session_factory
+    _session_factory = None
+    await engines.dispose()
 
-# Создание фабрики сессий
-AsyncSessionLocal = sessionmaker(
-    bind=engine, class_=AsyncSession, expire_on_commit=False
-)
+def AsyncSessionLocal(**kwargs) -> AsyncSession:
+    """
+    Создает асинхронную сессию базы данных.
+
+    Используется как фабрика сессий по умолчанию; движок создается
+    при первой сессии, поэтому импорт модуля не подключает драйвер базы.
+    """
+    return get_session_factory()(**kwargs)
+
+def _upgrade_to_head(connection) -> None:
+    """Применяет все миграции на переданном соединении (alembic upgrade head)."""
+    # Импорт внутри функции: alembic нужен только при создании базы, а не при импорте модуля
+    from alembic import command
+    from alembic.config import Config as AlembicConfig
+
+    alembic_config = AlembicConfig()
+    alembic_config.set_main_option("script_location", ALEMBIC_DIR)
+    alembic_config.attributes["connection"] = connection
+    command.upgrade(alembic_config, "head")
 
 async def create_database():
     """
-    Создает все таблицы в базе данных.
+    Создает или обновляет таблицы базы данных цепочкой миграций Alembic,
+    поэтому последующий `alembic upgrade head` с ней согласован.
     """
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    async with get_engine().begin() as conn:
+        await conn.run_sync(_upgrade_to_head)
     database_logger.info("База данных создана.")
 
 async def get_db():
@@ -39,17 +87,14 @@ async def save_to_database(dataset):
     """
     Сохраняет датасет в базу данных.
 
-    :param dataset: Список объектов LicensePlate для сохранения.
+    :param dataset: Итерируемый набор объектов LicensePlate для сохранения.
+        Уже существующие номера пропускаются.
     """
-    async with AsyncSessionLocal() as session:
-        for plate in dataset:
-            vehicle = Vehicle(
-                license_plate=f"{plate.number} {plate.region}",
-                vehicle_type=plate.vehicle_type.value
-            )
-            session.add(vehicle)
-        await session.commit()
-    database_logger.info(f"Сохранено {len(dataset)} записей в базу данных.")
+    # Импорт внутри функции, чтобы избежать циклического импорта
+    from src.database.bulk_import import bulk_import_vehicles
+
+    report = await bulk_import_vehicles(dataset)
+    database_logger.info("Сохранено %s записей в базу данных.", report.written)
 
 async def get_vehicle_by_plate(plate_number: str):
     """
@@ -58,18 +103,17 @@ async def get_vehicle_by_plate(plate_number: str):
     :param plate_number: Номерной знак транспортного средства.
     :return: Объект Vehicle или None, если не найден.
     """
-    database_logger.info(f"Запрос к базе данных для номера: {plate_number}")
+    database_logger.info("Запрос к базе данных для номера: %s", plate_number)
 
     async with AsyncSessionLocal() as session:
-        query = select(Vehicle).where(Vehicle.license_plate == plate_number)
+        # Поиск по каноническому ключу: "а123вс 77" и "A123BC77" находят одну запись
+        query = select(Vehicle).where(Vehicle.plate_key == plate_key(plate_number)).limit(1)
         result = await session.execute(query)
         vehicle = result.scalars().first()
 
         if vehicle:
-            database_logger.info(f"Транспортное средство найдено: {vehicle}")
+            database_logger.info("Транспортное средство найдено: %s", vehicle.license_plate)
         else:
-            database_logger.warning(
-                f"Транспортное средство не найдено для номера: {plate_number}"
-            )
+            database_logger.warning("Транспортное средство не найдено для номера: %s", plate_number)
 
         return vehicle
@@ -0,0 +1,175 @@
+# src/database/engine.py
+
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+from src.config.config import Config
+from src.utils.logger import database_logger
+
+
+class PoolMetrics:
+    """Счетчики использования пула соединений одного движка."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0  # Выдано соединений
+        self.connects = 0  # Открыто новых соединений с базой
+        self.timeouts = 0  # Не дождались соединения за pool_timeout
+        self.waits = 0  # Выдач, которым пришлось ждать свободное соединение
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            # Меньше миллисекунды - соединение было свободно, это не ожидание
+            if seconds >= 0.001:
+                self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "timeouts": self.timeouts,
+            "waits": self.waits,
+            "wait_seconds_avg": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, измеряющий время ожидания свободного соединения.
+
+    Запросы сверх pool_size + max_overflow ждут в очереди пула до
+    pool_timeout секунд вместо открытия новых соединений.
+    """
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_wait(time.perf_counter() - started_at)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _engine_options(url: str, config: Config) -> dict:
+    """Параметры create_async_engine для URL с учетом настроек пула из Config."""
+    parsed = make_url(url)
+    options = {"echo": config.DATABASE_ECHO}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # База в памяти существует только внутри одного соединения
+        options["poolclass"] = StaticPool
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+    )
+    if parsed.get_driver_name() == "asyncpg":
+        # Кэш подготовленных выражений asyncpg (0 - отключен, нужно за pgbouncer)
+        options["connect_args"] = {"statement_cache_size": config.DB_STATEMENT_CACHE_SIZE}
+    return options
+
+
+class EngineRegistry:
+    """
+    Реестр асинхронных движков: один движок (и один пул соединений) на URL
+    базы данных на весь процесс.
+    """
+
+    def __init__(self):
+        self._engines: Dict[str, AsyncEngine] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str = None) -> AsyncEngine:
+        """
+        Возвращает движок для URL, создавая его при первом обращении.
+
+        :param url: URL базы данных, по умолчанию Config.DATABASE_URL.
+        :return: AsyncEngine.
+        """
+        config = Config()
+        url = url or config.DATABASE_URL
+        engine = self._engines.get(url)
+        if engine is not None:
+            return engine
+        with self._lock:
+            if url not in self._engines:
+                engine = create_async_engine(url, **_engine_options(url, config))
+                pool = engine.sync_engine.pool
+                if isinstance(pool, InstrumentedQueuePool):
+                    pool.metrics = PoolMetrics()
+                    event.listen(engine.sync_engine, "connect", lambda *args: pool.metrics.record_connect())
+                self._engines[url] = engine
+                database_logger.info("Создан движок базы данных: %s", engine.url.render_as_string(hide_password=True))
+        return self._engines[url]
+
+    def stats(self) -> Dict[str, dict]:
+        """Загрузка пулов всех движков: размер, выданные соединения, переполнение, ожидание."""
+        result = {}
+        for url, engine in list(self._engines.items()):
+            pool = engine.sync_engine.pool
+            entry = {"pool": type(pool).__name__}
+            if isinstance(pool, InstrumentedQueuePool):
+                entry.update(
+                    size=pool.size(),
+                    checked_out=pool.checkedout(),
+                    checked_in=pool.checkedin(),
+                    overflow=max(pool.overflow(), 0),
+                    max_overflow=pool._max_overflow,
+                    **pool.metrics.as_dict(),
+                )
+            result[engine.url.render_as_string(hide_password=True)] = entry
+        return result
+
+    async def dispose(self, url: Optional[str] = None) -> None:
+        """
+        Закрывает соединения и удаляет движок (или все движки) из реестра.
+
+        :param url: URL движка; None - все движки.
+        """
+        with self._lock:
+            if url is None:
+                engines, self._engines = list(self._engines.values()), {}
+            else:
+                engine = self._engines.pop(url, None)
+                engines = [engine] if engine is not None else []
+        for engine in engines:
+            await engine.dispose()
+            database_logger.info("Движок базы данных закрыт: %s", engine.url.render_as_string(hide_password=True))
+
+
+# Общий реестр движков процесса
+engines = EngineRegistry()
@@ -1,9 +1,11 @@
 # src/database/models.py
 
-from sqlalchemy import Column, Integer, String, Enum
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Enum, Float, Index, Integer, String
 from sqlalchemy.ext.declarative import declarative_base
 from enum import Enum as PyEnum  # Используем псевдоним, чтобы избежать конфликта с SQLAlchemy Enum
 
+from src.utils.plate_format import plate_key, split_plate
+
 Base = declarative_base()
 
 class VehicleType(PyEnum):
@@ -12,9 +14,52 @@ class VehicleType(PyEnum):
     TRUCK = "truck"
     MOTORCYCLE = "motorcycle"
 
+def _default_plate_key(context):
+    """Заполняет plate_key по license_plate, если ключ не передан явно."""
+    return plate_key(context.get_current_parameters()["license_plate"])
+
+def _default_plate_number(context):
+    """Заполняет plate_number (номер без региона) по license_plate."""
+    return split_plate(context.get_current_parameters()["license_plate"])[0]
+
+def _default_plate_region(context):
+    """Заполняет plate_region (код региона) по license_plate."""
+    return split_plate(context.get_current_parameters()["license_plate"])[1]
+
 class Vehicle(Base):
     __tablename__ = 'vehicles'
+    __table_args__ = (
+        # Номера одного региона и поиск номера внутри региона
+        Index('ix_vehicles_plate_region_plate_number', 'plate_region', 'plate_number'),
+    )
 
     id = Column(Integer, primary_key=True)
     license_plate = Column(String, unique=True, nullable=False)
+    # Канонический ключ номера (plate_key): по нему выполняется поиск, и он же
+    # не дает записать один номер дважды в разном написании (латиница/кириллица)
+    plate_key = Column(String, nullable=False, unique=True, index=True, default=_default_plate_key)
+    # Части ключа (split_plate): номер без региона и код региона (None, если не выделен)
+    plate_number = Column(String, nullable=False, default=_default_plate_number)
+    plate_region = Column(String, default=_default_plate_region)
     vehicle_type = Column(Enum(VehicleType), nullable=False)
+
+class AccessEvent(Base):
+    """Журнал решений о доступе: одна запись на каждую проверку номера."""
+    __tablename__ = 'access_events'
+    __table_args__ = (
+        # История по номеру и выборки за интервал времени
+        Index('ix_access_events_plate_key_created_at', 'plate_key', 'created_at'),
+        Index('ix_access_events_created_at', 'created_at'),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    license_plate = Column(String, nullable=False)  # Номер в том виде, в каком он распознан или передан
+    plate_key = Column(String, nullable=False)  # Нормализованный номер (normalize_plate)
+    access_granted = Column(Boolean, nullable=False)
+    lane = Column(String)  # Полоса (камера), если проверка пришла из видеоконвейера
+    source = Column(String, nullable=False)  # Откуда пришла проверка: web, batch, video
+    matched_plate = Column(String)  # Разрешенный номер при нечетком совпадении
+    match_distance = Column(Float)
+    ocr_confidence = Column(Float)
+    decision_ms = Column(Float, nullable=False)  # Время принятия решения в миллисекундах
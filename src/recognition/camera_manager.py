@@ -0,0 +1,181 @@
+import threading
+import time
+from typing import Callable, List
+
+import cv2
+
+from src.config.config import Config
+from src.recognition.frame_queue import DropPolicy
+from src.recognition.pipeline import FramePacket, VideoPipeline, display_available
+from src.recognition.plate_recognition import detect_plates
+from src.utils.logger import recognition_logger
+
+config = Config()
+
+
+def parse_camera_source(value):
+    """
+    Преобразует строковое описание источника в аргумент cv2.VideoCapture.
+
+    :param value: Индекс камеры ("0"), RTSP URL или путь к видеофайлу.
+    :return: int для индекса камеры, иначе исходная строка.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if value.isdigit():
+            return int(value)
+    return value
+
+
+def parse_camera_sources(value: str) -> list:
+    """
+    Разбирает список источников, разделенных запятыми.
+
+    :param value: Строка вида "0,rtsp://camera-1/stream,video.mp4".
+    :return: Список источников для cv2.VideoCapture.
+    """
+    return [parse_camera_source(item) for item in value.split(",") if item.strip()]
+
+
+class CameraManager:
+    """
+    Обработка нескольких видеопотоков (полос въезда/выезда) в одном процессе.
+
+    Для каждого источника запускается собственный конвейер VideoPipeline
+    (захват, OCR, решение), а детекция выполняется одним общим потоком,
+    который собирает кадры всех полос в пачку и вызывает YOLO один раз.
+    Из каждой полосы в пачку попадает не больше одного кадра, а обход
+    полос начинается каждый раз с новой позиции, поэтому загруженная
+    полоса не может вытеснить остальные.
+    """
+
+    def __init__(
+        self,
+        sources: list = None,
+        queue_size: int = None,
+        drop_policy: DropPolicy = None,
+        max_batch: int = None,
+        on_plate: Callable[[FramePacket], None] = None,
+        display: bool = None,
+    ):
+        """
+        :param sources: Список источников (по умолчанию Config.CAMERA_SOURCES).
+        :param queue_size: Размер очередей между стадиями (для DropPolicy.LATEST - только 1).
+        :param drop_policy: Политика отбрасывания кадров при переполнении.
+        :param max_batch: Максимальный размер пачки кадров для YOLO.
+        :param on_plate: Обработчик распознанного номера.
+        :param display: Показывать ли кадры в окнах OpenCV, по умолчанию - если
+            есть дисплей (Config.HEADLESS). Без окон кадры доступны в /live/{полоса}.
+        """
+        if sources is None:
+            sources = parse_camera_sources(config.CAMERA_SOURCES)
+        if not sources:
+            raise ValueError("Не задан ни один источник видео")
+
+        self.max_batch = max_batch or config.DETECTION_BATCH_SIZE
+        self.display = display if display is not None else display_available()
+        self._frames_ready = threading.Event()
+        self._stop_event = threading.Event()
+        self._detector_thread = None
+        self._next_lane = 0
+
+        self.lanes: List[VideoPipeline] = [
+            VideoPipeline(
+                source=parse_camera_source(source),
+                queue_size=queue_size,
+                drop_policy=drop_policy,
+                on_plate=on_plate,
+                display=self.display,
+                camera_id=f"lane-{index}",
+                detection_ready=self._frames_ready,
+                own_detector=False,
+            )
+            for index, source in enumerate(sources)
+        ]
+        self.batches = 0
+        self.batched_frames = 0
+
+    def start(self) -> None:
+        """Запускает конвейеры всех полос и общий детектор."""
+        for lane in self.lanes:
+            lane.start()
+        self._detector_thread = threading.Thread(
+            target=self._detector_worker, name="batch-detector", daemon=True
+        )
+        self._detector_thread.start()
+        recognition_logger.info(
+            "Запущена обработка %s видеопотоков, размер пачки: %s", len(self.lanes), self.max_batch
+        )
+
+    def stop(self) -> None:
+        """Останавливает все полосы и общий детектор."""
+        self._stop_event.set()
+        self._frames_ready.set()
+        for lane in self.lanes:
+            lane.stop()
+
+    def join(self, timeout: float = None) -> None:
+        for lane in self.lanes:
+            lane.join(timeout)
+        if self._detector_thread is not None:
+            self._detector_thread.join(timeout)
+
+    def run(self) -> None:
+        """Запускает обработку и блокирует вызывающий поток, пока работает хотя бы одна полоса."""
+        self.start()
+        try:
+            while not self._stop_event.wait(0.5):
+                if all(lane.stopped for lane in self.lanes):
+                    break
+        finally:
+            self.stop()
+            self.join()
+            if self.display:
+                cv2.destroyAllWindows()
+
+    def stats(self) -> dict:
+        """Возвращает статистику всех полос и общего детектора."""
+        return {
+            "lanes": [lane.stats() for lane in self.lanes],
+            "detector": {
+                "batches": self.batches,
+                "avg_batch_size": self.batched_frames / self.batches if self.batches else 0.0,
+            },
+        }
+
+    def _collect_batch(self) -> list:
+        """
+        Забирает не больше одного кадра из каждой полосы, начиная со следующей
+        по кругу полосы, пока пачка не заполнится.
+        """
+        batch = []
+        lanes_count = len(self.lanes)
+        start = self._next_lane
+        for offset in range(lanes_count):
+            if len(batch) >= self.max_batch:
+                break
+            lane = self.lanes[(start + offset) % lanes_count]
+            if lane.stopped:
+                continue
+            packet = lane.detection_queue.get(timeout=0)
+            if packet is not None:
+                batch.append((lane, packet))
+        self._next_lane = (start + 1) % lanes_count
+        return batch
+
+    def _detector_worker(self) -> None:
+        while not self._stop_event.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                # Ждем появления новых кадров в любой из полос
+                self._frames_ready.wait(0.5)
+                self._frames_ready.clear()
+                continue
+
+            started_at = time.perf_counter()
+            boxes = detect_plates([packet.frame for _, packet in batch])
+            self.batches += 1
+            self.batched_frames += len(batch)
+
+            for (lane, packet), box in zip(batch, boxes):
+                lane.dispatch_detection(packet, box, started_at)
@@ -0,0 +1,440 @@
+import argparse
+import glob
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.config.config import Config
+from src.utils.logger import recognition_logger
+
+# Порог уверенности кандидатов до подавления немаксимумов (как predict() ultralytics)
+CANDIDATE_THRESHOLD = 0.25
+NMS_IOU_THRESHOLD = 0.7
+# Цвет полей при вписывании кадра в квадрат (как в ultralytics)
+LETTERBOX_COLOR = 114
+
+
+@dataclass
+class Boxes:
+    """Боксы одного кадра в формате ultralytics."""
+    xyxy: np.ndarray  # (N, 4) float32, координаты исходного кадра
+    conf: np.ndarray  # (N,) float32
+
+
+@dataclass
+class Detection:
+    """Результат детекции одного кадра."""
+    boxes: Boxes
+
+
+def letterbox(frame: np.ndarray, size: int, out: np.ndarray = None) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Вписывает кадр в квадрат size x size с сохранением пропорций.
+
+    :param frame: Кадр BGR или в оттенках серого.
+    :param size: Сторона входа модели.
+    :param out: Массив (size, size, 3) uint8 для результата; по умолчанию выделяется новый.
+    :return: Изображение, масштаб и смещение (x, y) полей.
+    """
+    if frame.ndim == 2:
+        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+    new_width, new_height = round(width * scale), round(height * scale)
+    pad_x, pad_y = (size - new_width) // 2, (size - new_height) // 2
+    if out is None:
+        out = np.empty((size, size, 3), dtype=np.uint8)
+    out[:] = LETTERBOX_COLOR
+    cv2.resize(
+        frame, (new_width, new_height),
+        dst=out[pad_y : pad_y + new_height, pad_x : pad_x + new_width],
+        interpolation=cv2.INTER_LINEAR,
+    )
+    return out, scale, (pad_x, pad_y)
+
+
+def to_input_tensor(images: List[np.ndarray]) -> np.ndarray:
+    """Пачка изображений BGR uint8 (HWC) -> тензор RGB float32 NCHW в диапазоне 0..1."""
+    tensor = np.ascontiguousarray(np.stack(images)[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32)
+    tensor *= 1 / 255.0
+    return tensor
+
+
+def decode_yolov8(
+    output: np.ndarray,
+    scale: float,
+    pad: Tuple[int, int],
+    frame_shape,
+    threshold: float = CANDIDATE_THRESHOLD,
+    iou_threshold: float = NMS_IOU_THRESHOLD,
+) -> Boxes:
+    """
+    Декодирует выход YOLOv8 для одного кадра.
+
+    :param output: Массив (4 + число классов, число якорей): cx, cy, w, h и оценки классов.
+    :param scale: Масштаб letterbox().
+    :param pad: Смещение полей letterbox().
+    :param frame_shape: Размер исходного кадра.
+    :param threshold: Минимальная уверенность кандидата.
+    :param iou_threshold: Порог IoU подавления немаксимумов.
+    :return: Boxes в координатах исходного кадра.
+    """
+    scores = output[4:].max(axis=0)
+    keep = np.flatnonzero(scores > threshold)
+    if keep.size == 0:
+        return Boxes(np.empty((0, 4), np.float32), np.empty(0, np.float32))
+    cx, cy, w, h = output[:4, keep]
+    scores = scores[keep]
+    xywh = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+    selected = np.asarray(
+        cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), threshold, iou_threshold), dtype=int
+    ).reshape(-1)
+    xyxy = xywh[selected].copy()
+    xyxy[:, 2:] += xyxy[:, :2]
+    xyxy -= (pad[0], pad[1], pad[0], pad[1])
+    xyxy /= scale
+    height, width = frame_shape[:2]
+    np.clip(xyxy, 0, (width, height, width, height), out=xyxy)
+    return Boxes(xyxy.astype(np.float32), scores[selected].astype(np.float32))
+
+
+class Detector:
+    """
+    Базовый класс детектора номерных знаков.
+
+    Детектор вызывается как модель ultralytics: detector(frames, verbose=False)
+    возвращает для каждого кадра результат с атрибутом boxes (массивы xyxy
+    и conf в координатах исходного кадра), поэтому выбор бокса в
+    plate_recognition не зависит от бэкенда. Бэкенды - DETECTOR_BACKENDS:
+    исходные веса через PyTorch (эталон), ONNX Runtime и OpenVINO; модели
+    для двух последних (в том числе int8) создает export_model().
+    """
+
+    name = "detector"
+
+    def __init__(self, imgsz: int = 640, threads: int = 0):
+        """
+        :param imgsz: Сторона квадратного входа модели.
+        :param threads: Число потоков вычислений (0 - по умолчанию библиотеки).
+        """
+        self.imgsz = imgsz
+        self.threads = threads
+        self.calls = 0
+        self.frames = 0
+        self.seconds = 0.0
+
+    def _detect(self, frames: List[np.ndarray]) -> List[Detection]:
+        raise NotImplementedError
+
+    def __call__(self, frames, verbose: bool = False) -> List[Detection]:
+        """
+        Ищет номера на кадрах.
+
+        :param frames: Кадр или список кадров (BGR или оттенки серого).
+        :param verbose: Не используется, для совместимости с ultralytics.
+        :return: Список Detection той же длины.
+        """
+        if isinstance(frames, np.ndarray):
+            frames = [frames]
+        started_at = time.perf_counter()
+        results = self._detect(list(frames))
+        self.seconds += time.perf_counter() - started_at
+        self.calls += 1
+        self.frames += len(frames)
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "imgsz": self.imgsz,
+            "threads": self.threads,
+            "calls": self.calls,
+            "frames": self.frames,
+            "avg_frame_ms": self.seconds / self.frames * 1000 if self.frames else 0.0,
+        }
+
+
+class UltralyticsDetector(Detector):
+    """Исходная модель YOLOv8 через ultralytics и PyTorch (эталон для сравнения бэкендов)."""
+
+    name = "ultralytics"
+
+    def __init__(self, path: str, imgsz: int = 640, threads: int = 0, device: str = None):
+        """
+        :param path: Путь к весам .pt.
+        :param imgsz: Сторона входа модели.
+        :param threads: Число потоков вычислений PyTorch (0 - по умолчанию).
+        :param device: Устройство PyTorch, по умолчанию Config.DETECTOR_DEVICE.
+        """
+        super().__init__(imgsz, threads)
+        self.device = device or Config().DETECTOR_DEVICE
+        # ultralytics (и torch) импортируются только при создании детектора
+        from ultralytics import YOLO
+
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        self.model = YOLO(path)
+
+    def _detect(self, frames):
+        frames = [cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR) if frame.ndim == 2 else frame for frame in frames]
+        results = self.model(frames, imgsz=self.imgsz, device=self.device, verbose=False)
+        return [
+            Detection(Boxes(result.boxes.xyxy.cpu().numpy(), result.boxes.conf.cpu().numpy()))
+            for result in results
+        ]
+
+
+class TensorDetector(Detector):
+    """
+    Детектор на экспортированной модели: letterbox, вывод пачкой и
+    декодирование выхода YOLOv8 выполняются без ultralytics и torch.
+    Модели со статическим размером пачки 1 вызываются по кадру.
+    """
+
+    max_batch: Optional[int] = None
+
+    def _infer(self, batch: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def _detect(self, frames):
+        results = []
+        step = self.max_batch or len(frames)
+        for start in range(0, len(frames), step):
+            chunk = frames[start : start + step]
+            boxed = [letterbox(frame, self.imgsz) for frame in chunk]
+            output = self._infer(to_input_tensor([image for image, _, _ in boxed]))
+            for frame, (_, scale, pad), prediction in zip(chunk, boxed, output):
+                results.append(Detection(decode_yolov8(prediction, scale, pad, frame.shape)))
+        return results
+
+
+def _static_dim(value) -> Optional[int]:
+    return value if isinstance(value, int) and value > 0 else None
+
+
+class OnnxRuntimeDetector(TensorDetector):
+    """Модель ONNX через ONNX Runtime на CPU (fp32 или квантованная int8)."""
+
+    name = "onnxruntime"
+
+    def __init__(self, path: str, imgsz: int = 640, threads: int = 0):
+        super().__init__(imgsz, threads)
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise RuntimeError("Для DETECTOR_BACKEND=onnxruntime необходимо установить пакет onnxruntime") from e
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, _ = model_input.shape
+        self.max_batch = _static_dim(batch)
+        if _static_dim(height) and height != imgsz:
+            recognition_logger.warning("Модель %s экспортирована для входа %s, а не %s", path, height, imgsz)
+            self.imgsz = height
+
+    def _infer(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVinoDetector(TensorDetector):
+    """Модель OpenVINO IR на CPU (fp32 или квантованная int8)."""
+
+    name = "openvino"
+
+    def __init__(self, path: str, imgsz: int = 640, threads: int = 0):
+        super().__init__(imgsz, threads)
+        try:
+            import openvino
+        except ImportError as e:
+            raise RuntimeError("Для DETECTOR_BACKEND=openvino необходимо установить пакет openvino") from e
+        if os.path.isdir(path):
+            # Каталог экспорта ultralytics (*_openvino_model) содержит один файл .xml
+            path = glob.glob(os.path.join(path, "*.xml"))[0]
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if threads:
+            config["INFERENCE_NUM_THREADS"] = threads
+        core = openvino.Core()
+        self.model = core.compile_model(core.read_model(path), "CPU", config)
+        shape = self.model.input(0).get_partial_shape()
+        self.max_batch = shape[0].get_length() if shape[0].is_static else None
+        if shape[2].is_static and shape[2].get_length() != imgsz:
+            recognition_logger.warning(
+                "Модель %s экспортирована для входа %s, а не %s", path, shape[2].get_length(), imgsz
+            )
+            self.imgsz = shape[2].get_length()
+        # Запрос вывода нельзя использовать из нескольких потоков одновременно
+        self._local = threading.local()
+
+    def _infer(self, batch):
+        request = getattr(self._local, "request", None)
+        if request is None:
+            request = self._local.request = self.model.create_infer_request()
+        return request.infer({0: batch})[self.model.output(0)]
+
+
+DETECTOR_BACKENDS = {
+    "ultralytics": UltralyticsDetector,
+    "onnxruntime": OnnxRuntimeDetector,
+    "openvino": OpenVinoDetector,
+}
+
+
+def create_detector(backend: str = None, path: str = None, imgsz: int = None, threads: int = None) -> Detector:
+    """
+    Создает детектор по имени бэкенда.
+
+    :param backend: "ultralytics", "onnxruntime" или "openvino", по умолчанию Config.DETECTOR_BACKEND.
+    :param path: Путь к модели, по умолчанию Config.YOLO_MODEL_PATH.
+    :param imgsz: Сторона входа модели, по умолчанию Config.DETECTOR_IMGSZ.
+    :param threads: Число потоков вычислений, по умолчанию Config.DETECTOR_THREADS.
+    :return: Экземпляр Detector.
+    """
+    config = Config()
+    backend = backend or config.DETECTOR_BACKEND
+    if backend not in DETECTOR_BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд детектора: {backend}")
+    return DETECTOR_BACKENDS[backend](
+        path or config.YOLO_MODEL_PATH,
+        imgsz=imgsz or config.DETECTOR_IMGSZ,
+        threads=config.DETECTOR_THREADS if threads is None else threads,
+    )
+
+
+def calibration_frames(
+    count: int, imgsz: int, directory: str = None, seed: int = 23, preprocess=None
+) -> List[np.ndarray]:
+    """
+    Кадры для калибровки int8: изображения из каталога или синтетические кадры с номерами.
+
+    Кадры проходят ту же предобработку, что и вход детектора во время работы:
+    диапазоны квантования подбираются по тому распределению, которое модель
+    действительно получает.
+
+    :param preprocess: Конвейер предобработки; по умолчанию - конвейер детектора
+        (Config.DETECTOR_PREPROCESS).
+    :return: Список входных изображений модели (letterbox, BGR).
+    """
+    from src.recognition.image_processing import get_preprocess_pipeline
+
+    if preprocess is None:
+        preprocess = get_preprocess_pipeline("detector")
+    if directory:
+        paths = sorted(
+            path for path in glob.glob(os.path.join(directory, "*"))
+            if path.lower().endswith((".jpg", ".jpeg", ".png", ".bmp"))
+        )[:count]
+        frames = [cv2.imread(path) for path in paths]
+    else:
+        from src.data_generation.license_plate_generator import generate_dataset_chunks
+        from src.data_generation.plate_renderer import render_sample
+
+        rng = np.random.default_rng(seed)
+        chunk = next(iter(generate_dataset_chunks(count, chunk_size=count, seed=seed)))
+        frames = [
+            render_sample(number, region, vehicle_type, rng)[0]
+            for number, region, vehicle_type in zip(
+                chunk.numbers.tolist(), chunk.regions.tolist(), chunk.vehicle_types.tolist()
+            )
+        ]
+    frames = [frame for frame in frames if frame is not None]
+    if preprocess:
+        # Конвейер пишет в свой буфер, поэтому letterbox выполняется сразу, до следующего кадра
+        return [letterbox(preprocess(frame), imgsz)[0] for frame in frames]
+    return [letterbox(frame, imgsz)[0] for frame in frames]
+
+
+def export_model(
+    weights: str,
+    model_format: str,
+    imgsz: int = 640,
+    int8: bool = False,
+    calibration_dir: str = None,
+    calibration: int = 300,
+) -> str:
+    """
+    Экспортирует веса YOLOv8 в ONNX или OpenVINO IR и при необходимости квантует их в int8.
+
+    Выполняется один раз командой python -m src.recognition.detector; совпадение
+    боксов с исходной моделью и FPS проверяются бенчмарком benchmarks.detector_parity.
+
+    :param weights: Исходные веса (.pt).
+    :param model_format: "onnx" или "openvino".
+    :param imgsz: Сторона входа модели.
+    :param int8: Квантовать веса и активации в int8 по калибровочным кадрам.
+    :param calibration_dir: Каталог кадров для калибровки (по умолчанию - синтетические кадры).
+    :param calibration: Число калибровочных кадров.
+    :return: Путь к модели для YOLO_MODEL_PATH.
+    """
+    from ultralytics import YOLO
+
+    # Динамический размер пачки нужен, чтобы детектор обрабатывал кадры всех полос одним вызовом
+    path = YOLO(weights).export(format=model_format, imgsz=imgsz, dynamic=True, simplify=model_format == "onnx")
+    if not int8:
+        return path
+    frames = calibration_frames(calibration, imgsz, calibration_dir)
+
+    if model_format == "onnx":
+        from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+        class FrameReader(CalibrationDataReader):
+            def __init__(self, input_name: str):
+                self._batches = iter([{input_name: to_input_tensor([frame])} for frame in frames])
+
+            def get_next(self):
+                return next(self._batches, None)
+
+        import onnxruntime
+
+        input_name = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+        quantized_path = path.replace(".onnx", "_int8.onnx")
+        quantize_static(
+            path, quantized_path, FrameReader(input_name),
+            quant_format=QuantFormat.QDQ, activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+            per_channel=True,
+        )
+        return quantized_path
+
+    import nncf
+    import openvino
+
+    xml_path = glob.glob(os.path.join(path, "*.xml"))[0]
+    model = openvino.Core().read_model(xml_path)
+    dataset = nncf.Dataset(frames, lambda frame: to_input_tensor([frame]))
+    quantized = nncf.quantize(model, dataset, subset_size=len(frames))
+    quantized_dir = path.rstrip("/\\").replace("_openvino_model", "_int8_openvino_model")
+    os.makedirs(quantized_dir, exist_ok=True)
+    openvino.save_model(quantized, os.path.join(quantized_dir, os.path.basename(xml_path)))
+    return quantized_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Экспорт и квантование модели детектора номеров")
+    parser.add_argument("--weights", default=Config().YOLO_MODEL_PATH, help="Исходные веса YOLOv8 (.pt)")
+    parser.add_argument("--format", choices=("onnx", "openvino"), default="onnx", help="Формат экспорта")
+    parser.add_argument("--imgsz", type=int, default=Config().DETECTOR_IMGSZ, help="Сторона входа модели")
+    parser.add_argument("--int8", action="store_true", help="Квантовать в int8")
+    parser.add_argument("--calibration-dir", default=None, help="Каталог кадров для калибровки int8")
+    parser.add_argument("--calibration", type=int, default=300, help="Число калибровочных кадров")
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    path = export_model(args.weights, args.format, args.imgsz, args.int8, args.calibration_dir, args.calibration)
+    backend = "onnxruntime" if args.format == "onnx" else "openvino"
+    print(f"Модель экспортирована за {time.perf_counter() - started_at:.1f} с: {path}")
+    print(f"DETECTOR_BACKEND={backend} YOLO_MODEL_PATH={path} DETECTOR_IMGSZ={args.imgsz}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import threading
+from collections import deque
+from enum import Enum
+
+
+class DropPolicy(Enum):
+    """Политика отбрасывания элементов при переполнении очереди."""
+    LATEST = "latest"  # latest-frame-wins: очередь на один кадр, новый вытесняет ожидающий
+    OLDEST = "oldest"  # drop-oldest: при переполнении выбрасывается самый старый кадр
+
+
+class FrameQueue:
+    """
+    Ограниченная неблокирующая очередь между стадиями обработки видео.
+
+    Запись в очередь никогда не блокирует производителя: при переполнении
+    лишние элементы отбрасываются согласно политике, а счетчик отброшенных
+    элементов увеличивается.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1,
+        drop_policy: DropPolicy = DropPolicy.LATEST,
+        ready_event: threading.Event = None,
+    ):
+        """
+        :param name: Имя очереди (используется в статистике).
+        :param maxsize: Максимальное число ожидающих элементов. Для
+            DropPolicy.LATEST - только 1: ожидает всегда один самый свежий кадр.
+        :param drop_policy: Политика отбрасывания при переполнении.
+        :param ready_event: Общее событие, устанавливаемое при каждой записи.
+            Позволяет одному потребителю ждать сразу несколько очередей.
+        """
+        if maxsize < 1:
+            raise ValueError("Размер очереди должен быть не меньше 1")
+        if drop_policy == DropPolicy.LATEST and maxsize != 1:
+            # Очередь на несколько кадров, из которой выбрасывается старый, - это DropPolicy.OLDEST
+            raise ValueError("Очередь с политикой latest хранит один кадр (maxsize=1)")
+        self.name = name
+        self.maxsize = maxsize
+        self.drop_policy = drop_policy
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._ready_event = ready_event
+        self.put_count = 0
+        self.dropped_count = 0
+
+    def put(self, item) -> None:
+        """
+        Добавляет элемент в очередь, не блокируя вызывающий поток.
+
+        :param item: Элемент для передачи следующей стадии.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped_count += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._condition.notify()
+        if self._ready_event is not None:
+            self._ready_event.set()
+
+    def get(self, timeout: float = None):
+        """
+        Извлекает элемент из очереди.
+
+        :param timeout: Максимальное время ожидания в секундах (None - без ограничения).
+        :return: Элемент или None, если истек таймаут или очередь закрыта.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self) -> None:
+        """Закрывает очередь и будит все ожидающие потоки."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._items)
+
+    def stats(self) -> dict:
+        """Возвращает текущую глубину очереди и счетчики."""
+        with self._condition:
+            return {
+                "name": self.name,
+                "depth": len(self._items),
+                "maxsize": self.maxsize,
+                "drop_policy": self.drop_policy.value,
+                "put": self.put_count,
+                "dropped": self.dropped_count,
+            }
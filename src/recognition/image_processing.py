@@ -1,4 +1,13 @@
+import json
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
 import cv2
+import numpy as np
+
+from src.config.config import Config
 
 
 def preprocess_image(image):
@@ -12,3 +21,485 @@ def preprocess_image(image):
     edged = cv2.Canny(blurred, 30, 200)
 
     return edged, gray
+
+
+class PreprocessStep:
+    """
+    Шаг конвейера предобработки.
+
+    Результат шага записывается в буфер, выделенный один раз на поток,
+    слот и размер изображения, поэтому при постоянном разрешении камеры
+    шаги не выделяют память на каждый кадр. Результат действителен до
+    следующего вызова шага с тем же слотом в том же потоке.
+    """
+
+    name = "step"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def buffer(self, slot: int, shape: Tuple[int, ...], dtype=np.uint8, index: int = 0) -> np.ndarray:
+        """Буфер результата для слота; выделяется заново только при смене размера."""
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        key = (slot, index)
+        buffer = buffers.get(key)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = buffers[key] = np.empty(shape, dtype=dtype)
+        return buffer
+
+    def __call__(self, image: np.ndarray, slot: int) -> np.ndarray:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return self.name
+
+
+def _as_gray(step: PreprocessStep, image: np.ndarray, slot: int) -> np.ndarray:
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=step.buffer(slot, image.shape[:2], index=1))
+
+
+class Resize(PreprocessStep):
+    """Уменьшение кадра до max_width по ширине (вход детектора); меньшие кадры не изменяются."""
+
+    name = "resize"
+
+    def __init__(self, max_width: int = 640):
+        super().__init__()
+        self.max_width = int(max_width)
+
+    def __call__(self, image, slot):
+        height, width = image.shape[:2]
+        if width <= self.max_width:
+            return image
+        size = (self.max_width, max(1, round(height * self.max_width / width)))
+        buffer = self.buffer(slot, (size[1], size[0]) + image.shape[2:])
+        return cv2.resize(image, size, dst=buffer, interpolation=cv2.INTER_AREA)
+
+    def describe(self):
+        return f"resize:{self.max_width}"
+
+
+class ScaleToHeight(PreprocessStep):
+    """Масштабирование изображения номера до заданной высоты с сохранением пропорций (вход OCR)."""
+
+    name = "height"
+
+    def __init__(self, height: int = 64):
+        super().__init__()
+        self.height = int(height)
+
+    def __call__(self, image, slot):
+        height, width = image.shape[:2]
+        if height == self.height:
+            return image
+        size = (max(1, round(width * self.height / height)), self.height)
+        buffer = self.buffer(slot, (size[1], size[0]) + image.shape[2:])
+        interpolation = cv2.INTER_AREA if height > self.height else cv2.INTER_CUBIC
+        return cv2.resize(image, size, dst=buffer, interpolation=interpolation)
+
+    def describe(self):
+        return f"height:{self.height}"
+
+
+class Gray(PreprocessStep):
+    """Перевод в оттенки серого."""
+
+    name = "gray"
+
+    def __call__(self, image, slot):
+        if image.ndim == 2:
+            return image
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=self.buffer(slot, image.shape[:2]))
+
+
+class Bilateral(PreprocessStep):
+    """Билатеральный фильтр: сглаживает шум, сохраняя границы символов. Дорогой на полном кадре."""
+
+    name = "bilateral"
+
+    def __init__(self, diameter: int = 11, sigma_color: float = 17, sigma_space: float = 17):
+        super().__init__()
+        self.diameter, self.sigma_color, self.sigma_space = int(diameter), float(sigma_color), float(sigma_space)
+
+    def __call__(self, image, slot):
+        return cv2.bilateralFilter(
+            image, self.diameter, self.sigma_color, self.sigma_space, dst=self.buffer(slot, image.shape)
+        )
+
+    def describe(self):
+        return f"bilateral:{self.diameter}:{self.sigma_color:g}:{self.sigma_space:g}"
+
+
+class GaussianBlur(PreprocessStep):
+    """Размытие по Гауссу с ядром ksize."""
+
+    name = "blur"
+
+    def __init__(self, ksize: int = 5):
+        super().__init__()
+        self.ksize = int(ksize) | 1
+
+    def __call__(self, image, slot):
+        return cv2.GaussianBlur(image, (self.ksize, self.ksize), 0, dst=self.buffer(slot, image.shape))
+
+    def describe(self):
+        return f"blur:{self.ksize}"
+
+
+class Median(PreprocessStep):
+    """Медианный фильтр: убирает импульсный шум на изображении номера."""
+
+    name = "median"
+
+    def __init__(self, ksize: int = 3):
+        super().__init__()
+        self.ksize = int(ksize) | 1
+
+    def __call__(self, image, slot):
+        return cv2.medianBlur(image, self.ksize, dst=self.buffer(slot, image.shape))
+
+    def describe(self):
+        return f"median:{self.ksize}"
+
+
+class Canny(PreprocessStep):
+    """Границы Canny (одноканальное изображение)."""
+
+    name = "canny"
+
+    def __init__(self, low: float = 30, high: float = 200):
+        super().__init__()
+        self.low, self.high = float(low), float(high)
+
+    def __call__(self, image, slot):
+        gray = _as_gray(self, image, slot)
+        return cv2.Canny(gray, self.low, self.high, edges=self.buffer(slot, gray.shape))
+
+    def describe(self):
+        return f"canny:{self.low:g}:{self.high:g}"
+
+
+class Binarize(PreprocessStep):
+    """Бинаризация: otsu (глобальный порог) или adaptive (локальный, для неравномерного освещения)."""
+
+    name = "binarize"
+
+    def __init__(self, method: str = "otsu", block_size: int = 31, c: float = 10):
+        super().__init__()
+        if method not in ("otsu", "adaptive"):
+            raise ValueError(f"Неизвестный метод бинаризации: {method}")
+        self.method, self.block_size, self.c = method, int(block_size) | 1, float(c)
+
+    def __call__(self, image, slot):
+        gray = _as_gray(self, image, slot)
+        buffer = self.buffer(slot, gray.shape)
+        if self.method == "otsu":
+            cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=buffer)
+            return buffer
+        return cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, self.block_size, self.c, dst=buffer
+        )
+
+    def describe(self):
+        return f"binarize:{self.method}" if self.method == "otsu" else f"binarize:adaptive:{self.block_size}:{self.c:g}"
+
+
+class Deskew(PreprocessStep):
+    """
+    Выравнивание наклона строки номера.
+
+    Угол оценивается по центральным моментам темных пикселей (символов):
+    главная ось распределения символов совпадает с направлением строки.
+    Наклон меньше min_angle и больше max_angle градусов не исправляется.
+    """
+
+    name = "deskew"
+
+    def __init__(self, max_angle: float = 15, min_angle: float = 0.5):
+        super().__init__()
+        self.max_angle, self.min_angle = float(max_angle), float(min_angle)
+        self.last_angle = 0.0
+
+    def estimate_angle(self, image: np.ndarray, slot: int) -> float:
+        gray = _as_gray(self, image, slot)
+        ink = cv2.threshold(
+            gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU, dst=self.buffer(slot, gray.shape, index=2)
+        )[1]
+        moments = cv2.moments(ink, binaryImage=True)
+        if moments["m00"] == 0:
+            return 0.0
+        return math.degrees(0.5 * math.atan2(2 * moments["mu11"], moments["mu20"] - moments["mu02"]))
+
+    def __call__(self, image, slot):
+        angle = self.estimate_angle(image, slot)
+        self.last_angle = angle
+        if not self.min_angle <= abs(angle) <= self.max_angle:
+            return image
+        height, width = image.shape[:2]
+        rotation = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        return cv2.warpAffine(
+            image, rotation, (width, height), dst=self.buffer(slot, image.shape),
+            flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE,
+        )
+
+    def describe(self):
+        return f"deskew:{self.max_angle:g}"
+
+
+# Шаги, доступные в описании конвейера: "имя:параметр:параметр"
+PREPROCESS_STEPS = {
+    step.name: step
+    for step in (Resize, ScaleToHeight, Gray, Bilateral, GaussianBlur, Median, Canny, Binarize, Deskew)
+}
+
+
+class PreprocessPipeline:
+    """
+    Декларативный конвейер предобработки: последовательность шагов,
+    заданная строкой вида "resize:960,gray,blur:5,canny:30:200".
+
+    Вход детектора (полный кадр) и вход OCR (только вырезанный номер)
+    описываются отдельными конвейерами (Config.DETECTOR_PREPROCESS и
+    Config.OCR_PREPROCESS), поэтому дорогое шумоподавление можно
+    применять только к маленькому изображению номера. Время каждого
+    шага накапливается и возвращается stats().
+    """
+
+    def __init__(self, steps: List[PreprocessStep], timing: bool = True):
+        """
+        :param steps: Шаги конвейера.
+        :param timing: Измерять время каждого шага.
+        """
+        self.steps = steps
+        self.timing = timing
+        self.calls = 0
+        self._step_seconds = [0.0] * len(steps)
+
+    @classmethod
+    def from_spec(cls, spec: str, timing: bool = True) -> "PreprocessPipeline":
+        """
+        Создает конвейер из строкового описания.
+
+        :param spec: Шаги через запятую, параметры шага - через двоеточие
+            ("resize:640,gray,canny:30:200"). Пустая строка или "none" - без обработки.
+        :param timing: Измерять время каждого шага.
+        :return: PreprocessPipeline.
+        """
+        steps = []
+        for item in (spec or "").split(","):
+            item = item.strip()
+            if not item or item == "none":
+                continue
+            name, *args = item.split(":")
+            if name not in PREPROCESS_STEPS:
+                raise ValueError(f"Неизвестный шаг предобработки: {name}")
+            step_class = PREPROCESS_STEPS[name]
+            steps.append(step_class(*args) if step_class is Binarize else step_class(*map(float, args)))
+        return cls(steps, timing)
+
+    @property
+    def spec(self) -> str:
+        return ",".join(step.describe() for step in self.steps) or "none"
+
+    def __bool__(self) -> bool:
+        return bool(self.steps)
+
+    def __call__(self, image: np.ndarray, slot: int = 0) -> np.ndarray:
+        """
+        Применяет шаги к изображению.
+
+        :param image: Изображение BGR или в оттенках серого; не изменяется.
+        :param slot: Номер слота буферов. Изображения, результаты которых
+            нужны одновременно (кадры одной пачки), должны использовать разные слоты.
+        :return: Результат последнего шага (буфер конвейера) или исходное изображение.
+        """
+        self.calls += 1
+        if not self.timing:
+            for step in self.steps:
+                image = step(image, slot)
+            return image
+        for index, step in enumerate(self.steps):
+            started_at = time.perf_counter()
+            image = step(image, slot)
+            self._step_seconds[index] += time.perf_counter() - started_at
+        return image
+
+    def reset_stats(self) -> None:
+        self.calls = 0
+        self._step_seconds = [0.0] * len(self.steps)
+
+    def stats(self) -> dict:
+        """Число вызовов и среднее время каждого шага в миллисекундах."""
+        calls = self.calls or 1
+        steps = {}
+        for step, seconds in zip(self.steps, self._step_seconds):
+            steps[step.describe()] = seconds / calls * 1000
+        return {"spec": self.spec, "calls": self.calls, "avg_step_ms": steps, "avg_total_ms": sum(steps.values())}
+
+
+_pipelines: Dict[str, PreprocessPipeline] = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_preprocess_pipeline(purpose: str) -> Optional[PreprocessPipeline]:
+    """
+    Возвращает общий конвейер предобработки по настройкам Config.
+
+    :param purpose: "detector" (Config.DETECTOR_PREPROCESS) или "ocr" (Config.OCR_PREPROCESS).
+    :return: PreprocessPipeline или None, если шагов нет.
+    """
+    pipeline = _pipelines.get(purpose)
+    if pipeline is None:
+        config = Config()
+        spec = {"detector": config.DETECTOR_PREPROCESS, "ocr": config.OCR_PREPROCESS}[purpose]
+        with _pipelines_lock:
+            pipeline = _pipelines.setdefault(purpose, PreprocessPipeline.from_spec(spec))
+    return pipeline or None
+
+
+def preprocess_stats() -> list:
+    """Среднее время шагов общих конвейеров для /metrics: пары (метки, значения)."""
+    return [
+        ({"purpose": purpose, "step": step}, {"avg_ms": avg_ms, "calls": pipeline.calls})
+        for purpose, pipeline in list(_pipelines.items())
+        for step, avg_ms in pipeline.stats()["avg_step_ms"].items()
+    ]
+
+
+class MotionGate:
+    """
+    Дешевый фильтр движения перед детекцией.
+
+    Кадр уменьшается, переводится в оттенки серого и сравнивается с
+    медленно обновляемой моделью фона. Учитываются только пиксели внутри
+    области интереса (многоугольника зоны подъезда к шлагбауму). Детекция
+    и OCR запускаются, только если доля изменившихся пикселей превышает
+    порог, и еще hold_frames кадров после последнего движения.
+    """
+
+    def __init__(
+        self,
+        roi=None,
+        downscale_width: int = 160,
+        threshold: int = 25,
+        min_area: float = 0.01,
+        hold_frames: int = 15,
+        learning_rate: float = 0.05,
+    ):
+        """
+        :param roi: Многоугольник области интереса в относительных координатах
+            [[x, y], ...] (0..1 от ширины и высоты кадра). None - весь кадр.
+        :param downscale_width: Ширина уменьшенного кадра для сравнения.
+        :param threshold: Порог яркостной разницы пикселя с фоном (0..255).
+        :param min_area: Минимальная доля изменившихся пикселей ROI для пробуждения.
+        :param hold_frames: Сколько кадров держать детекцию включенной после движения.
+        :param learning_rate: Скорость обновления модели фона.
+        """
+        self.roi = roi
+        self.downscale_width = downscale_width
+        self.threshold = threshold
+        self.min_area = min_area
+        self.hold_frames = hold_frames
+        self.learning_rate = learning_rate
+
+        self._background = None
+        self._mask = None
+        self._mask_area = 0
+        self._small_size = None
+        # Первые кадры всегда проходят дальше, чтобы не пропустить уже стоящий автомобиль
+        self._hold = hold_frames
+
+        self.frames = 0
+        self.skipped = 0
+        self.wakeups = 0
+        self.last_motion = 0.0
+
+    def _prepare(self, frame_shape) -> None:
+        """Вычисляет размер уменьшенного кадра и маску ROI один раз для разрешения камеры."""
+        height, width = frame_shape[:2]
+        scale = min(1.0, self.downscale_width / width)
+        small_width, small_height = max(1, int(width * scale)), max(1, int(height * scale))
+        self._small_size = (small_width, small_height)
+
+        if self.roi:
+            self._mask = np.zeros((small_height, small_width), dtype=np.uint8)
+            polygon = np.array(
+                [[x * small_width, y * small_height] for x, y in self.roi], dtype=np.int32
+            )
+            cv2.fillPoly(self._mask, [polygon], 255)
+            self._mask_area = max(1, cv2.countNonZero(self._mask))
+        else:
+            self._mask = None
+            self._mask_area = small_width * small_height
+
+    def check(self, frame) -> bool:
+        """
+        Проверяет, есть ли движение в области интереса.
+
+        :param frame: Кадр в формате BGR.
+        :return: True, если кадр нужно передать на детекцию.
+        """
+        self.frames += 1
+        if self._small_size is None:
+            self._prepare(frame.shape)
+
+        small = cv2.resize(frame, self._small_size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+        if self._background is None:
+            self._background = gray.astype(np.float32)
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._background))
+        _, changed = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        if self._mask is not None:
+            changed = cv2.bitwise_and(changed, self._mask)
+        self.last_motion = cv2.countNonZero(changed) / self._mask_area
+
+        cv2.accumulateWeighted(gray, self._background, self.learning_rate)
+
+        if self.last_motion >= self.min_area:
+            if self._hold == 0:
+                self.wakeups += 1
+            self._hold = self.hold_frames
+            return True
+
+        if self._hold > 0:
+            self._hold -= 1
+            return True
+
+        self.skipped += 1
+        return False
+
+    def stats(self) -> dict:
+        """Возвращает число обработанных и пропущенных кадров и число пробуждений."""
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "wakeups": self.wakeups,
+            "active": self._hold > 0,
+            "last_motion": self.last_motion,
+        }
+
+
+def create_motion_gate(camera_id: str):
+    """
+    Создает MotionGate по настройкам Config для указанной камеры.
+
+    :param camera_id: Идентификатор полосы (ключ в Config.CAMERA_ROIS).
+    :return: MotionGate или None, если фильтр движения отключен.
+    """
+    config = Config()
+    if not config.MOTION_GATE_ENABLED:
+        return None
+    rois = json.loads(config.CAMERA_ROIS) if config.CAMERA_ROIS else {}
+    return MotionGate(
+        roi=rois.get(camera_id),
+        threshold=config.MOTION_THRESHOLD,
+        min_area=config.MOTION_MIN_AREA,
+        hold_frames=config.MOTION_HOLD_FRAMES,
+    )
@@ -0,0 +1,243 @@
+import asyncio
+import threading
+import time
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from src.config.config import Config
+from src.utils.logger import recognition_logger
+
+# Граница частей потока multipart/x-mixed-replace (MJPEG)
+BOUNDARY = "frame"
+MEDIA_TYPE = f"multipart/x-mixed-replace; boundary={BOUNDARY}"
+
+# Сколько секунд показывать последнее решение поверх кадров
+CAPTION_SECONDS = 3.0
+
+
+class LiveView:
+    """
+    Предпросмотр одной камеры для операторов (MJPEG).
+
+    Конвейер передает в publish() ссылку на кадр и разметку - это не
+    требует копирования и кодирования. Отдельный поток кодирует только
+    последний опубликованный кадр не чаще fps раз в секунду и только
+    пока есть хотя бы один зритель. Готовая часть потока (заголовки и
+    JPEG) одна на всех зрителей, поэтому число зрителей не влияет на
+    объем кодирования. Разметка рисуется в потоке кодирования на
+    уменьшенной копии кадра, исходный кадр не изменяется.
+    """
+
+    def __init__(self, camera_id: str, fps: float = None, quality: int = None, max_width: int = None):
+        """
+        :param camera_id: Идентификатор камеры (полосы).
+        :param fps: Максимальная частота кадров предпросмотра, по умолчанию Config.LIVE_VIEW_FPS.
+        :param quality: Качество JPEG (1..100), по умолчанию Config.LIVE_VIEW_QUALITY.
+        :param max_width: Максимальная ширина кадра предпросмотра, по умолчанию Config.LIVE_VIEW_MAX_WIDTH.
+        """
+        config = Config()
+        self.camera_id = camera_id
+        self.fps = fps or config.LIVE_VIEW_FPS
+        self.quality = quality or config.LIVE_VIEW_QUALITY
+        self.max_width = max_width or config.LIVE_VIEW_MAX_WIDTH
+
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._frame = None
+        self._box: Optional[Tuple] = None
+        self._caption: Optional[Tuple[str, float]] = None
+        self._waiters = set()
+
+        self.viewers = 0
+        self.seq = 0  # Номер последнего закодированного кадра
+        self.chunk: Optional[bytes] = None  # Часть MJPEG-потока с последним кадром
+        self.jpeg: Optional[bytes] = None
+        self.published = 0
+        self.encoded = 0
+        self.encode_seconds = 0.0
+
+    @property
+    def active(self) -> bool:
+        """Есть ли зрители: без них кадры не публикуются и не кодируются."""
+        return self.viewers > 0
+
+    def publish(self, frame, box=None, text: Optional[str] = None) -> None:
+        """
+        Публикует кадр для предпросмотра. Вызывается из потоков конвейера.
+
+        :param frame: Кадр BGR; не должен изменяться после публикации.
+        :param box: Бокс номера (x, y, w, h, ...) или None.
+        :param text: Распознанный номер (решение) - показывается CAPTION_SECONDS секунд.
+        """
+        if not self.viewers:
+            return
+        with self._lock:
+            self._frame = frame
+            self._box = box
+            if text:
+                self._caption = (text, time.monotonic())
+            self.published += 1
+        self._pending.set()
+
+    def _annotate(self, frame, box, caption):
+        import cv2
+
+        scale = 1.0
+        if frame.shape[1] > self.max_width:
+            scale = self.max_width / frame.shape[1]
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            frame = frame.copy()
+        if box is not None:
+            x, y, w, h = (int(value * scale) for value in box[:4])
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        if caption is not None:
+            cv2.putText(frame, caption, (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        return frame
+
+    def _encoder(self) -> None:
+        import cv2
+
+        interval = 1.0 / self.fps
+        last_encoded_at = 0.0
+        while not self._stopped.is_set():
+            if not self._pending.wait(timeout=1.0):
+                continue
+            # Ограничение частоты: промежуточные кадры просто заменяются более свежими
+            delay = last_encoded_at + interval - time.monotonic()
+            if delay > 0 and self._stopped.wait(delay):
+                break
+            with self._lock:
+                self._pending.clear()
+                frame, box, caption = self._frame, self._box, self._caption
+                self._frame = None
+            if frame is None:
+                continue
+            if caption is not None and time.monotonic() - caption[1] > CAPTION_SECONDS:
+                caption = None
+
+            started_at = time.perf_counter()
+            image = self._annotate(frame, box, caption[0] if caption is not None else None)
+            ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if not ok:
+                continue
+            jpeg = buffer.tobytes()
+            chunk = (
+                f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode()
+                + jpeg
+                + b"\r\n"
+            )
+            last_encoded_at = time.monotonic()
+            with self._lock:
+                self.jpeg, self.chunk = jpeg, chunk
+                self.seq += 1
+                self.encoded += 1
+                self.encode_seconds += time.perf_counter() - started_at
+                waiters = list(self._waiters)
+            for loop, event in waiters:
+                loop.call_soon_threadsafe(event.set)
+
+    def _ensure_encoder(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._encoder, name=f"live-view-{self.camera_id}", daemon=True
+            )
+            self._thread.start()
+
+    async def wait_frame(self, after_seq: int, timeout: float) -> bool:
+        """
+        Ждет кадр с номером больше after_seq.
+
+        :return: True, если кадр появился, False по таймауту.
+        """
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            if self.seq > after_seq:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    async def stream(self, timeout: float = 5.0) -> AsyncIterator[bytes]:
+        """
+        Части MJPEG-потока для одного зрителя; кадры пропускаются, если зритель не успевает.
+
+        :param timeout: Сколько ждать кадр, прежде чем повторить последний
+            (чтобы соединение не закрывалось прокси, пока камера стоит).
+        """
+        with self._lock:
+            self.viewers += 1
+        self._ensure_encoder()
+        try:
+            seq = 0
+            while True:
+                await self.wait_frame(seq, timeout)
+                with self._lock:
+                    chunk, seq = self.chunk, self.seq
+                if chunk is not None:
+                    yield chunk
+        finally:
+            with self._lock:
+                self.viewers -= 1
+
+    async def snapshot(self, timeout: float = 2.0) -> Optional[bytes]:
+        """Один свежий кадр JPEG или None, если камера не прислала кадр за timeout секунд."""
+        with self._lock:
+            self.viewers += 1
+            seq = self.seq
+        self._ensure_encoder()
+        try:
+            if await self.wait_frame(seq, timeout):
+                return self.jpeg
+            return None
+        finally:
+            with self._lock:
+                self.viewers -= 1
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._pending.set()
+
+    def stats(self) -> dict:
+        return {
+            "viewers": self.viewers,
+            "published": self.published,
+            "encoded": self.encoded,
+            "avg_encode_ms": self.encode_seconds / self.encoded * 1000 if self.encoded else 0.0,
+            "fps_limit": self.fps,
+        }
+
+
+class LiveViewRegistry:
+    """Предпросмотры камер процесса: конвейеры публикуют кадры, веб-приложение раздает их."""
+
+    def __init__(self):
+        self._views: Dict[str, LiveView] = {}
+        self._lock = threading.Lock()
+
+    def get(self, camera_id: str) -> LiveView:
+        with self._lock:
+            view = self._views.get(camera_id)
+            if view is None:
+                view = self._views[camera_id] = LiveView(camera_id)
+                recognition_logger.info("Создан предпросмотр камеры %s", camera_id)
+            return view
+
+    def find(self, camera_id: str) -> Optional[LiveView]:
+        return self._views.get(camera_id)
+
+    def stats(self) -> Dict[str, dict]:
+        return {camera_id: view.stats() for camera_id, view in list(self._views.items())}
+
+
+# Общий реестр предпросмотров процесса
+live_views = LiveViewRegistry()
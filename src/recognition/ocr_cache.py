@@ -0,0 +1,268 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from src.config.config import Config
+from src.recognition.ocr_engine import OcrResult
+from src.utils.logger import recognition_logger
+
+# Сторона нормализованного изображения и блока низких частот DCT для хэша
+_HASH_IMAGE_SIZE = 32
+_HASH_BLOCK_SIZE = 8
+# Уменьшенная копия номера для проверки совпадения: размер, размытие
+# (устойчивость к шуму) и число вертикальных полос (примерно по символу на полосу)
+THUMBNAIL_SIZE = (96, 24)
+_THUMBNAIL_SIGMA = 0.8
+_THUMBNAIL_STRIPS = 12
+_THUMBNAIL_MARGIN = 3
+# Оценка памяти записи без копии номера и текста: ключ, OrderedDict, CacheEntry и OcrResult
+_ENTRY_OVERHEAD_BYTES = 360
+
+
+def perceptual_hash(gray: np.ndarray) -> int:
+    """
+    Перцептивный хэш (pHash) изображения номера: 63 бита.
+
+    Изображение приводится к размеру 32x32, от него берется DCT, и каждый
+    бит хэша показывает, выше ли медианы коэффициент из блока 8x8 низких
+    частот (без постоянной составляющей). Хэш не меняется от шума сжатия и
+    равномерного изменения яркости, поэтому почти одинаковые кадры стоящего
+    автомобиля дают хэши, отличающиеся на несколько бит. Номера, отличающиеся
+    одним символом, тоже дают близкие хэши, поэтому хэш используется только
+    для поиска кандидатов.
+
+    :param gray: Изображение номерного знака в оттенках серого.
+    :return: Хэш как целое число.
+    """
+    small = cv2.resize(gray, (_HASH_IMAGE_SIZE, _HASH_IMAGE_SIZE), interpolation=cv2.INTER_AREA)
+    block = cv2.dct(np.float32(small))[:_HASH_BLOCK_SIZE, :_HASH_BLOCK_SIZE].reshape(-1)[1:]
+    return int.from_bytes(np.packbits(block > np.median(block)).tobytes(), "big")
+
+
+def hamming_distance(first: int, second: int) -> int:
+    return (first ^ second).bit_count()
+
+
+def thumbnail(gray: np.ndarray) -> np.ndarray:
+    """Уменьшенная размытая копия номера с нулевым средним и единичной дисперсией яркости."""
+    image = cv2.resize(gray, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+    image = cv2.GaussianBlur(image, (0, 0), _THUMBNAIL_SIGMA)
+    image -= image.mean()
+    image /= image.std() + 1e-6
+    return image
+
+
+def thumbnail_difference(first: np.ndarray, second: np.ndarray) -> float:
+    """
+    Различие двух копий thumbnail(): вторая совмещается с первой по сдвигу
+    (фазовая корреляция), затем считается средняя разница яркости в каждой
+    вертикальной полосе. Результат - наибольшая разница по полосам: замена
+    одного символа меняет одну полосу и не растворяется в среднем по номеру.
+    """
+    (dx, dy), _ = cv2.phaseCorrelate(first, second)
+    aligned = cv2.warpAffine(
+        second, np.float32([[1, 0, dx], [0, 1, dy]]), THUMBNAIL_SIZE,
+        flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REPLICATE,
+    )
+    difference = np.abs(first - aligned)[_THUMBNAIL_MARGIN:-_THUMBNAIL_MARGIN]
+    strips = difference.reshape(difference.shape[0], _THUMBNAIL_STRIPS, -1)
+    return float(strips.mean(axis=(0, 2)).max())
+
+
+@dataclass
+class CropSignature:
+    """Хэш и уменьшенная копия изображения номера - ключ кэша OCR."""
+    key: int
+    thumbnail: np.ndarray = field(repr=False)
+
+
+def crop_signature(crop: np.ndarray) -> CropSignature:
+    """
+    Вычисляет ключ кэша для изображения номера.
+
+    :param crop: Изображение номерного знака (BGR или оттенки серого).
+    :return: CropSignature.
+    """
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    return CropSignature(perceptual_hash(gray), thumbnail(gray))
+
+
+@dataclass
+class CacheEntry:
+    result: OcrResult
+    thumbnail: np.ndarray = field(repr=False)
+    stored_at: float
+    size: int
+    hits: int = 0
+
+
+class OcrCache:
+    """
+    Кэш результатов OCR одной камеры с ключом - перцептивным хэшем номера.
+
+    Стоящий или медленно движущийся автомобиль дает почти одинаковые
+    изображения номера кадр за кадром. Кандидаты ищутся по хэшу с
+    допустимым расстоянием Хэмминга max_distance, затем уменьшенная копия
+    нового изображения сравнивается с сохраненной (thumbnail_difference):
+    результат берется из кэша без вызова OCR, только если различие не
+    больше max_difference. Порог по умолчанию подобран так, чтобы номера,
+    отличающиеся одним символом, не совпадали, а повторные кадры с шумом
+    камеры совпадали.
+
+    Записи (в основном уменьшенные копии, около 9 КБ) вытесняются по
+    давности использования (LRU), когда объем кэша превышает max_bytes, и
+    устаревают через ttl секунд после сохранения: стоящий автомобиль
+    периодически перечитывается. Пустые результаты (ошибка или таймаут
+    OCR) не сохраняются.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = None,
+        ttl: float = None,
+        max_distance: int = None,
+        max_difference: float = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param max_bytes: Предельный объем записей в байтах, по умолчанию Config.OCR_CACHE_MAX_BYTES.
+        :param ttl: Время жизни записи в секундах, по умолчанию Config.OCR_CACHE_TTL.
+        :param max_distance: Допустимое расстояние Хэмминга между хэшами кандидатов,
+            по умолчанию Config.OCR_CACHE_MAX_DISTANCE.
+        :param max_difference: Допустимое различие уменьшенных копий,
+            по умолчанию Config.OCR_CACHE_MAX_DIFFERENCE.
+        :param clock: Источник времени (подменяется в тестах).
+        """
+        config = Config()
+        self.max_bytes = max_bytes if max_bytes is not None else config.OCR_CACHE_MAX_BYTES
+        self.ttl = ttl if ttl is not None else config.OCR_CACHE_TTL
+        self.max_distance = max_distance if max_distance is not None else config.OCR_CACHE_MAX_DISTANCE
+        self.max_difference = max_difference if max_difference is not None else config.OCR_CACHE_MAX_DIFFERENCE
+        self._clock = clock
+        self._entries: "OrderedDict[int, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0  # Кандидаты с близким хэшем, не прошедшие сравнение копий
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: int) -> None:
+        self.bytes -= self._entries.pop(key).size
+
+    def _expire(self, now: float) -> None:
+        # Записи упорядочены по использованию, а не по времени сохранения, поэтому проверяются все
+        for key, entry in list(self._entries.items()):
+            if now - entry.stored_at <= self.ttl:
+                continue
+            self._remove(key)
+            self.expirations += 1
+
+    def get(self, signature: CropSignature) -> Optional[OcrResult]:
+        """
+        Ищет сохраненный результат для изображения номера.
+
+        :param signature: crop_signature() изображения.
+        :return: Сохраненный OcrResult или None.
+        """
+        with self._lock:
+            self._expire(self._clock())
+            candidates = sorted(
+                (hamming_distance(key, signature.key), key)
+                for key in self._entries
+                if hamming_distance(key, signature.key) <= self.max_distance
+            )
+            for _, key in candidates:
+                entry = self._entries[key]
+                if thumbnail_difference(entry.thumbnail, signature.thumbnail) > self.max_difference:
+                    self.rejected += 1
+                    continue
+                self._entries.move_to_end(key)
+                entry.hits += 1
+                self.hits += 1
+                return entry.result
+            self.misses += 1
+            return None
+
+    def put(self, signature: CropSignature, result: OcrResult) -> None:
+        """Сохраняет непустой результат OCR и вытесняет давно не использованные записи сверх max_bytes."""
+        if not result.text or not result.text.strip():
+            return
+        size = _ENTRY_OVERHEAD_BYTES + signature.thumbnail.nbytes + sys.getsizeof(result.text)
+        with self._lock:
+            if signature.key in self._entries:
+                self._remove(signature.key)
+            self._entries[signature.key] = CacheEntry(result, signature.thumbnail, self._clock(), size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def read_batch(self, crops, read_batch: Callable[[list], List[OcrResult]]) -> List[OcrResult]:
+        """
+        Распознает пачку изображений, вызывая OCR только для отсутствующих в кэше.
+
+        :param crops: Изображения номерных знаков.
+        :param read_batch: Функция OCR для пачки (OcrEngine.read_batch).
+        :return: Список OcrResult той же длины.
+        """
+        signatures = [crop_signature(crop) for crop in crops]
+        results = [self.get(signature) for signature in signatures]
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            for index, result in zip(missing, read_batch([crops[index] for index in missing])):
+                results[index] = result
+                self.put(signatures[index], result)
+        return results
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class OcrCacheRegistry:
+    """Кэши OCR процесса по камерам: номера разных полос не смешиваются."""
+
+    def __init__(self):
+        self._caches: Dict[str, OcrCache] = {}
+        self._lock = threading.Lock()
+
+    def get(self, camera_id: str) -> OcrCache:
+        with self._lock:
+            cache = self._caches.get(camera_id)
+            if cache is None:
+                cache = self._caches[camera_id] = OcrCache()
+                recognition_logger.info("Создан кэш OCR камеры %s", camera_id)
+            return cache
+
+    def stats(self) -> Dict[str, dict]:
+        return {camera_id: cache.stats() for camera_id, cache in list(self._caches.items())}
+
+
+# Общий реестр кэшей OCR процесса
+ocr_caches = OcrCacheRegistry()
@@ -0,0 +1,267 @@
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import List, Optional
+
+import cv2
+
+from src.config.config import Config
+from src.recognition.image_processing import PreprocessPipeline, get_preprocess_pipeline
+from src.utils.logger import recognition_logger
+from src.utils.metrics import count_ocr_calls, stage_timer
+
+
+@dataclass
+class OcrResult:
+    """Результат OCR одного изображения номерного знака."""
+    text: str
+    confidence: Optional[float] = None  # Уверенность 0..1, если движок ее сообщает
+
+
+class OcrEngine:
+    """
+    Базовый класс движка OCR.
+
+    Движок принимает пачки изображений номеров и распознает их пулом
+    воркеров с общим ограничением времени на пачку. Распознавание, не
+    завершившееся к сроку, остановить нельзя: такой воркер считается
+    зависшим, пока распознавание не закончится, и если зависли все
+    воркеры, новые пачки сразу возвращают пустой текст, а не ждут в
+    очереди за зависшими. Перед OCR к изображению номера применяется
+    конвейер предобработки (если задан) - в потоке воркера, поэтому
+    буферы конвейера у каждого воркера свои.
+    """
+
+    def __init__(self, workers: int = 1, timeout: float = None, preprocess: PreprocessPipeline = None):
+        """
+        :param workers: Число параллельных воркеров.
+        :param timeout: Максимальное время распознавания пачки в секундах.
+        :param preprocess: Конвейер предобработки изображения номера.
+        """
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.preprocess = preprocess or None
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+        self._stuck = set()  # Распознавания, продолжающиеся после срока пачки
+        self._lock = threading.Lock()
+        self.timeouts = 0
+        self.errors = 0
+        self.skipped = 0
+
+    def _read_one(self, crop) -> OcrResult:
+        raise NotImplementedError
+
+    def _timed_read_one(self, crop) -> OcrResult:
+        if self.preprocess is not None:
+            with stage_timer("ocr_preprocess"):
+                crop = self.preprocess(crop)
+        with stage_timer("ocr"):
+            return self._read_one(crop)
+
+    def read(self, crop) -> OcrResult:
+        """
+        Распознает одно изображение номера.
+
+        :param crop: Изображение номерного знака (BGR или оттенки серого).
+        :return: OcrResult.
+        """
+        return self.read_batch([crop])[0]
+
+    def read_batch(self, crops) -> List[OcrResult]:
+        """
+        Распознает пачку изображений номеров параллельно.
+
+        :param crops: Список изображений номерных знаков.
+        :return: Список OcrResult той же длины. Для изображений, которые не
+            удалось распознать до истечения timeout с начала пачки или при
+            ошибке, возвращается пустой текст.
+        """
+        count_ocr_calls(type(self).__name__, len(crops))
+        with self._lock:
+            stuck = len(self._stuck)
+        if stuck >= self.workers:
+            recognition_logger.warning("Все воркеры OCR заняты зависшими распознаваниями, пачка пропущена")
+            self.skipped += len(crops)
+            return [OcrResult("") for _ in crops]
+
+        futures = [self._executor.submit(self._timed_read_one, crop) for crop in crops]
+        _, not_done = wait(futures, timeout=self.timeout)
+        for future in not_done:
+            # Еще не начатые распознавания отменяются, выполняющиеся - учитываются до завершения
+            if not future.cancel():
+                with self._lock:
+                    self._stuck.add(future)
+                future.add_done_callback(self._release)
+        if not_done:
+            self.timeouts += len(not_done)
+            recognition_logger.warning(
+                "Превышено время распознавания пачки: %d из %d номеров", len(not_done), len(crops)
+            )
+
+        results = []
+        for future in futures:
+            if future in not_done:
+                results.append(OcrResult(""))
+                continue
+            try:
+                results.append(future.result())
+            except Exception as e:
+                self.errors += 1
+                recognition_logger.error("Ошибка распознавания номера: %s", e)
+                results.append(OcrResult(""))
+        return results
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._stuck.discard(future)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "stuck_workers": len(self._stuck),
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "skipped": self.skipped,
+        }
+
+    def close(self) -> None:
+        """Останавливает воркеры движка."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PytesseractEngine(OcrEngine):
+    """
+    Движок на основе pytesseract: для каждого изображения запускается
+    отдельный процесс tesseract. Используется по умолчанию и как эталон
+    для сравнения с другими движками.
+    """
+
+    def __init__(self, workers: int = 1, timeout: float = None, lang: str = "eng", preprocess=None):
+        super().__init__(workers, timeout, preprocess)
+        self.lang = lang
+        import pytesseract
+
+        self._pytesseract = pytesseract
+
+    def _read_one(self, crop) -> OcrResult:
+        text = self._pytesseract.image_to_string(
+            crop, lang=self.lang, config="--psm 8", timeout=self.timeout or 0
+        )
+        return OcrResult(text)
+
+
+class TesserocrEngine(OcrEngine):
+    """
+    Движок на основе tesserocr: пул долгоживущих экземпляров Tesseract API
+    внутри процесса. Языковые данные загружаются один раз при создании
+    пула, а изображения передаются в память без временных файлов.
+    """
+
+    def __init__(self, workers: int = 1, timeout: float = None, lang: str = "eng", preprocess=None):
+        super().__init__(workers, timeout, preprocess)
+        try:
+            import tesserocr
+        except ImportError as e:
+            raise RuntimeError(
+                "Для OCR_BACKEND=tesserocr необходимо установить пакет tesserocr"
+            ) from e
+        from PIL import Image
+
+        self._image = Image
+        self._closed = False
+        self._apis = queue.Queue()
+        for _ in range(self.workers):
+            self._apis.put(tesserocr.PyTessBaseAPI(lang=lang, psm=tesserocr.PSM.SINGLE_WORD))
+
+    def _read_one(self, crop) -> OcrResult:
+        if crop.ndim == 3:
+            crop = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        api = self._apis.get()
+        try:
+            api.SetImage(self._image.fromarray(crop))
+            text = api.GetUTF8Text()
+            confidence = api.MeanTextConf()
+        finally:
+            with self._lock:
+                closed = self._closed
+                if not closed:
+                    self._apis.put(api)
+            if closed:
+                # Распознавание, зависшее до закрытия движка, закрывает свой экземпляр само
+                api.End()
+        return OcrResult(text, confidence / 100.0 if confidence >= 0 else None)
+
+    def close(self) -> None:
+        super().close()
+        with self._lock:
+            self._closed = True
+        while not self._apis.empty():
+            self._apis.get_nowait().End()
+
+
+OCR_BACKENDS = {
+    "pytesseract": PytesseractEngine,
+    "tesserocr": TesserocrEngine,
+}
+
+_engine: Optional[OcrEngine] = None
+_engine_lock = threading.Lock()
+
+
+def create_ocr_engine(
+    backend: str = None, workers: int = None, timeout: float = None, preprocess: str = None
+) -> OcrEngine:
+    """
+    Создает движок OCR по имени бэкенда.
+
+    :param backend: Имя бэкенда ("pytesseract" или "tesserocr"), по умолчанию Config.OCR_BACKEND.
+    :param workers: Число воркеров, по умолчанию Config.OCR_WORKERS.
+    :param timeout: Таймаут на изображение, по умолчанию Config.OCR_TIMEOUT.
+    :param preprocess: Описание предобработки номера, по умолчанию Config.OCR_PREPROCESS.
+    :return: Экземпляр OcrEngine.
+    """
+    config = Config()
+    backend = backend or config.OCR_BACKEND
+    if backend not in OCR_BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд OCR: {backend}")
+    return OCR_BACKENDS[backend](
+        workers=workers or config.OCR_WORKERS,
+        timeout=timeout if timeout is not None else config.OCR_TIMEOUT or None,
+        lang=config.OCR_LANG,
+        # Общий конвейер из Config безопасен для воркеров: буферы шагов у каждого потока свои
+        preprocess=get_preprocess_pipeline("ocr") if preprocess is None else PreprocessPipeline.from_spec(preprocess),
+    )
+
+
+def get_ocr_engine() -> OcrEngine:
+    """Возвращает общий для процесса движок OCR, создавая его при первом обращении."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_ocr_engine()
+                recognition_logger.info(
+                    "Создан движок OCR: %s, воркеров: %s", type(_engine).__name__, _engine.workers
+                )
+    return _engine
+
+
+def close_ocr_engine() -> None:
+    """Останавливает общий движок OCR, если он был создан (при остановке приложения)."""
+    global _engine
+    with _engine_lock:
+        engine, _engine = _engine, None
+    if engine is not None:
+        engine.close()
+
+
+def set_ocr_engine(engine: Optional[OcrEngine]) -> None:
+    """
+    Подменяет общий движок OCR (заглушка в тестах и бенчмарках).
+
+    :param engine: Экземпляр OcrEngine; None - создать движок из Config при следующем обращении.
+    """
+    global _engine
+    with _engine_lock:
+        _engine = engine
@@ -0,0 +1,361 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Optional, Tuple
+
+import cv2
+
+from src.config.config import Config
+from src.recognition.frame_queue import DropPolicy, FrameQueue
+from src.recognition.image_processing import MotionGate, create_motion_gate
+from src.recognition.live_view import LiveView, live_views
+from src.recognition.ocr_cache import OcrCache, ocr_caches
+from src.recognition.ocr_engine import get_ocr_engine
+from src.recognition.plate_recognition import detect_plate
+from src.recognition.tracking import PlateTracker
+from src.utils.logger import recognition_logger
+
+config = Config()
+
+
+def display_available() -> bool:
+    """Можно ли показывать окна OpenCV (Config.HEADLESS: "1", "0" или "auto")."""
+    if config.HEADLESS == "auto":
+        return os.name == "nt" or bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    return config.HEADLESS != "1"
+
+
+@dataclass
+class FramePacket:
+    """Кадр и результаты его обработки, передаваемые между стадиями конвейера."""
+    frame_id: int
+    camera_id: str
+    frame: object  # np.ndarray в формате BGR
+    captured_at: float
+    box: Optional[Tuple[int, int, int, int, float]] = None
+    text: Optional[str] = None
+    track_id: Optional[int] = None
+    confidence: Optional[float] = None  # Уверенность OCR итогового текста трека
+
+
+class StageStats:
+    """Счетчики одной стадии конвейера."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.last_latency = 0.0
+        self.total_time = 0.0
+
+    def record(self, started_at: float) -> None:
+        elapsed = time.perf_counter() - started_at
+        self.processed += 1
+        self.last_latency = elapsed
+        self.total_time += elapsed
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "last_latency": self.last_latency,
+            "avg_latency": self.total_time / self.processed if self.processed else 0.0,
+        }
+
+
+class VideoPipeline:
+    """
+    Конвейер обработки видеопотока: захват -> детекция -> OCR -> решение.
+
+    Каждая стадия работает в собственном потоке, стадии связаны ограниченными
+    очередями FrameQueue. Захват никогда не ждет медленную стадию: при
+    переполнении очереди кадры отбрасываются согласно политике, поэтому
+    задержка решения определяется самой медленной стадией, а не суммой всех.
+
+    На стадии OCR номера отслеживаются трекером PlateTracker: OCR
+    запускается лишь на нескольких лучших изображениях каждого номера,
+    а на стадию решения попадает ровно одно решение на трек. Изображения,
+    почти совпадающие с уже прочитанными (стоящий автомобиль), берутся
+    из кэша OCR камеры без вызова движка.
+    """
+
+    def __init__(
+        self,
+        source=0,
+        queue_size: int = None,
+        drop_policy: DropPolicy = None,
+        on_plate: Callable[[FramePacket], None] = None,
+        display: bool = None,
+        camera_id: str = None,
+        detection_ready: threading.Event = None,
+        own_detector: bool = True,
+        motion_gate: MotionGate = None,
+        tracker: PlateTracker = None,
+        live_view: LiveView = None,
+        ocr_cache: OcrCache = None,
+    ):
+        """
+        :param source: Индекс камеры, RTSP URL или путь к видеофайлу.
+        :param queue_size: Размер очередей между стадиями (для DropPolicy.LATEST - только 1).
+        :param drop_policy: Политика отбрасывания кадров при переполнении.
+        :param on_plate: Обработчик распознанного номера (вызывается на стадии решения).
+        :param display: Показывать ли кадры в окне OpenCV, по умолчанию - если
+            есть дисплей (Config.HEADLESS).
+        :param camera_id: Идентификатор полосы (по умолчанию - строковое представление источника).
+        :param detection_ready: Общее событие появления кадров для внешнего детектора.
+        :param own_detector: Запускать ли собственный поток детекции. Если False,
+            кадры из detection_queue забирает внешний (общий для всех полос) детектор,
+            который возвращает результат через dispatch_detection().
+        :param motion_gate: Фильтр движения перед детекцией. По умолчанию создается
+            по настройкам Config (MOTION_GATE_ENABLED, CAMERA_ROIS).
+        :param tracker: Трекер номеров полосы (по умолчанию - с настройками Config).
+        :param live_view: Предпросмотр для веб-интерфейса. По умолчанию берется из
+            общего реестра live_views, если включен Config.LIVE_VIEW_ENABLED.
+        :param ocr_cache: Кэш результатов OCR полосы. По умолчанию берется из
+            общего реестра ocr_caches, если включен Config.OCR_CACHE_ENABLED.
+        """
+        self.source = source
+        self.camera_id = camera_id if camera_id is not None else str(source)
+        self.own_detector = own_detector
+        drop_policy = drop_policy or DropPolicy(config.FRAME_DROP_POLICY)
+        # Очередь с политикой latest всегда на один кадр; FRAME_QUEUE_SIZE - для oldest
+        queue_size = queue_size or (1 if drop_policy == DropPolicy.LATEST else config.FRAME_QUEUE_SIZE)
+        self.on_plate = on_plate
+        self.display = display if display is not None else display_available()
+        if live_view is None and config.LIVE_VIEW_ENABLED:
+            live_view = live_views.get(self.camera_id)
+        self.live_view = live_view
+        if ocr_cache is None and config.OCR_CACHE_ENABLED:
+            ocr_cache = ocr_caches.get(self.camera_id)
+        self.ocr_cache = ocr_cache
+        self.motion_gate = motion_gate if motion_gate is not None else create_motion_gate(self.camera_id)
+        self.tracker = tracker or PlateTracker()
+
+        self.detection_queue = FrameQueue(
+            "detection", queue_size, drop_policy, ready_event=detection_ready
+        )
+        self.ocr_queue = FrameQueue("ocr", queue_size, drop_policy)
+        # Решения по трекам нельзя терять: в их очередь не попадают кадры для
+        # отображения, а размер рассчитан на задержку обработчика, а не на поток кадров
+        self.decision_queue = FrameQueue("decision", config.DECISION_QUEUE_SIZE, DropPolicy.OLDEST)
+        # Окну OpenCV нужен только самый свежий кадр
+        self.display_queue = FrameQueue("display", 1, DropPolicy.LATEST)
+
+        self.stage_stats = {
+            name: StageStats(name) for name in ("capture", "detection", "ocr", "decision")
+        }
+        self.reconnects = 0
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self) -> None:
+        """Запускает потоки всех стадий."""
+        stages = [
+            ("capture", self._capture_worker),
+            ("detection", self._detection_worker),
+            ("ocr", self._ocr_worker),
+            ("decision", self._decision_worker),
+            ("display", self._display_worker),
+        ]
+        for name, target in stages:
+            if name == "detection" and not self.own_detector:
+                continue
+            if name == "display" and not self.display:
+                continue
+            thread = threading.Thread(
+                target=target, name=f"pipeline-{self.camera_id}-{name}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        recognition_logger.info("Конвейер обработки видео запущен для источника: %s", self.source)
+
+    def stop(self) -> None:
+        """Останавливает все стадии."""
+        self._stop_event.set()
+        for queue in self._queues():
+            queue.close()
+
+    def join(self, timeout: float = None) -> None:
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run(self) -> None:
+        """Запускает конвейер и блокирует вызывающий поток до его остановки."""
+        self.start()
+        try:
+            while not self._stop_event.wait(0.5):
+                pass
+        finally:
+            self.stop()
+            self.join()
+            if self.display:
+                cv2.destroyAllWindows()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def _queues(self):
+        return self.detection_queue, self.ocr_queue, self.decision_queue, self.display_queue
+
+    def stats(self) -> dict:
+        """Возвращает глубину очередей, число отброшенных кадров и счетчики стадий."""
+        return {
+            "camera_id": self.camera_id,
+            "reconnects": self.reconnects,
+            "queues": {
+                queue.name: queue.stats()
+                for queue in self._queues()
+            },
+            "stages": {name: stats.as_dict() for name, stats in self.stage_stats.items()},
+            "motion_gate": self.motion_gate.stats() if self.motion_gate is not None else None,
+            "tracker": self.tracker.stats(),
+            "ocr_cache": self.ocr_cache.stats() if self.ocr_cache is not None else None,
+        }
+
+    @property
+    def reconnectable(self) -> bool:
+        """Сетевой поток (RTSP/HTTP): после сбоя чтения его стоит открыть заново."""
+        return isinstance(self.source, str) and "://" in self.source
+
+    def _reopen(self, cap, delay: float):
+        """Закрывает поток и открывает его заново после паузы; None - если конвейер остановлен."""
+        cap.release()
+        recognition_logger.warning(
+            "Видеопоток %s прерван, повторное подключение через %.1f с", self.source, delay
+        )
+        if self._stop_event.wait(delay):
+            return None
+        self.reconnects += 1
+        return cv2.VideoCapture(self.source)
+
+    def _capture_worker(self) -> None:
+        cap = cv2.VideoCapture(self.source)
+        frame_id = 0
+        delay = config.CAMERA_RECONNECT_DELAY
+        try:
+            while not self.stopped:
+                started_at = time.perf_counter()
+                ret, frame = cap.read()
+                if not ret:
+                    if not self.reconnectable:
+                        # Видеофайл закончился или локальная камера недоступна
+                        recognition_logger.warning("Видеопоток %s завершен", self.source)
+                        break
+                    cap = self._reopen(cap, delay)
+                    if cap is None:
+                        break
+                    # Пауза растет, пока поток не начнет отдавать кадры
+                    delay = min(delay * 2, config.CAMERA_RECONNECT_MAX_DELAY)
+                    continue
+                delay = config.CAMERA_RECONNECT_DELAY
+                frame_id += 1
+                # Пока в зоне подъезда нет движения, детекция и OCR не запускаются
+                if self.motion_gate is not None and not self.motion_gate.check(frame):
+                    if self.live_view is not None:
+                        # Предпросмотр не замирает, пока в зоне подъезда нет движения
+                        self.live_view.publish(frame)
+                    self.stage_stats["capture"].record(started_at)
+                    continue
+                self.detection_queue.put(
+                    FramePacket(frame_id, self.camera_id, frame, time.time())
+                )
+                self.stage_stats["capture"].record(started_at)
+        finally:
+            if cap is not None:
+                cap.release()
+            self.stop()
+
+    def _detection_worker(self) -> None:
+        while not self.stopped:
+            packet = self.detection_queue.get(timeout=0.5)
+            if packet is None:
+                continue
+            started_at = time.perf_counter()
+            self.dispatch_detection(packet, detect_plate(packet.frame), started_at)
+
+    def dispatch_detection(self, packet: FramePacket, box, started_at: float) -> None:
+        """
+        Передает результат детекции следующей стадии конвейера.
+
+        :param packet: Обработанный кадр.
+        :param box: Результат detect_plate для кадра.
+        :param started_at: Момент начала детекции (time.perf_counter()).
+        """
+        packet.box = box
+        self.stage_stats["detection"].record(started_at)
+        if self.live_view is not None:
+            # Только ссылка на кадр; кодирование - в потоке предпросмотра и только при зрителях
+            self.live_view.publish(packet.frame, box)
+        if packet.box is not None:
+            self.ocr_queue.put(packet)
+        elif self.display:
+            # Кадры без номера идут сразу на отображение
+            self.display_queue.put(packet)
+
+    def _ocr_worker(self) -> None:
+        while not self.stopped:
+            # Короткий таймаут нужен, чтобы вовремя выдавать решения по ушедшим трекам
+            packet = self.ocr_queue.get(timeout=0.1)
+            if packet is not None:
+                started_at = time.perf_counter()
+                x, y, w, h, confidence = packet.box
+                crop = packet.frame[y : y + h, x : x + w]
+                track = self.tracker.update(packet.box, time.time(), packet)
+                packet.track_id = track.track_id
+                if self.tracker.should_read(track, crop):
+                    engine = get_ocr_engine()
+                    if self.ocr_cache is not None:
+                        result = self.ocr_cache.read_batch([crop], engine.read_batch)[0]
+                    else:
+                        result = engine.read(crop)
+                    # Вес голоса: уверенность детектора, умноженная на уверенность OCR
+                    if result.confidence is not None:
+                        confidence *= result.confidence
+                    self.tracker.add_read(track, result.text, confidence, time.time(), result.confidence)
+                self.stage_stats["ocr"].record(started_at)
+                if self.display:
+                    self.display_queue.put(packet)
+
+            for track in self.tracker.pop_decisions(time.time()):
+                # Решение передается отдельным пакетом, чтобы не изменять кадр,
+                # уже отправленный на отображение
+                self.decision_queue.put(
+                    replace(
+                        track.last_packet,
+                        text=track.text,
+                        track_id=track.track_id,
+                        confidence=track.ocr_confidence,
+                    )
+                )
+
+    def _decision_worker(self) -> None:
+        while not self.stopped:
+            packet = self.decision_queue.get(timeout=0.5)
+            if packet is None:
+                continue
+            started_at = time.perf_counter()
+            if self.on_plate is not None:
+                self.on_plate(packet)
+            if self.live_view is not None:
+                self.live_view.publish(packet.frame, packet.box, packet.text)
+            self.stage_stats["decision"].record(started_at)
+            if self.display:
+                self.display_queue.put(packet)
+
+    def _display_worker(self) -> None:
+        while not self.stopped:
+            packet = self.display_queue.get(timeout=0.5)
+            if packet is None:
+                continue
+            frame = packet.frame
+            if packet.text:
+                # Надпись рисуется на копии: кадр уже опубликован в предпросмотр
+                # и передан обработчику решения и не должен меняться
+                frame = frame.copy()
+                cv2.putText(
+                    frame, packet.text, (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2
+                )
+            cv2.imshow(f"Video {self.camera_id}", frame)
+            # Выход из цикла по нажатию 'q'
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                self.stop()
@@ -0,0 +1,204 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.plate_format import LATIN_TO_CYRILLIC
+
+_NOISE_RE = re.compile(r"[\W_]+")
+# Надпись под кодом региона, которую OCR часто читает вместе с номером
+_COUNTRY_SUFFIX = "RUS"
+
+# Исправления символов в зависимости от позиции: на месте цифры - цифры,
+# похожие на прочитанную букву, на месте буквы - наоборот. Применяются
+# после замены латинских двойников кириллицей (см. CONFUSION_COSTS в fuzzy_match).
+TO_DIGIT = {
+    "О": "0", "D": "0", "Q": "0", "U": "0",
+    "В": "8",
+    "З": "3",
+    "Т": "7",
+    "I": "1", "L": "1", "J": "1",
+    "S": "5",
+    "Б": "6", "G": "6",
+    "Z": "2",
+    "А": "4", "Ч": "4",
+}
+TO_LETTER = {
+    "0": "О", "D": "О", "Q": "О", "U": "О",
+    "8": "В",
+    "4": "А",
+    "7": "Т",
+}
+
+_LETTER_SLOT = "X"
+_DIGIT_SLOT = "0"
+
+
+class PlateGrammar:
+    """
+    Проверка и нормализация прочитанного OCR номера по форматам номерных знаков.
+
+    Форматы ("X000XX": X - буква, 0 - цифра) и коды регионов при создании
+    компилируются в регулярные выражения и таблицы исправлений для каждого
+    участка формата. Прочитанный текст очищается от пробелов, переводов
+    строк и знаков препинания, латинские двойники заменяются кириллицей;
+    если текст не подходит ни под один формат как есть, путаемые символы
+    исправляются по позиции (О -> 0 на месте цифры, 8 -> В на месте буквы).
+    Результат - канонический номер (как plate_key) или None для мусора,
+    который не нужно искать в базе.
+
+    Повторные чтения одного номера приходят постоянно, поэтому результаты
+    запоминаются (не больше memo_size строк).
+    """
+
+    def __init__(
+        self,
+        formats: Iterable[str],
+        letters: str,
+        regions: Iterable[str],
+        max_corrections: int = 1,
+        memo_size: int = 65536,
+    ):
+        """
+        :param formats: Форматы номера без региона в порядке предпочтения
+            (при неоднозначном исправлении выбирается первый подходящий).
+        :param letters: Допустимые буквы (кириллица).
+        :param regions: Допустимые коды регионов.
+        :param max_corrections: Сколько символов можно исправить во всем номере; текст,
+            требующий больше исправлений (например, по одному в разных участках
+            формата), скорее мусор, чем номер.
+        :param memo_size: Сколько последних прочитанных строк запоминать.
+        """
+        self.formats = list(dict.fromkeys(formats))
+        self.letters = letters
+        self.regions = frozenset(regions)
+        self.max_corrections = max_corrections
+        self.memo_size = memo_size
+
+        region_lengths = sorted({len(region) for region in self.regions})
+        region_pattern = "|".join(rf"\d{{{length}}}" for length in region_lengths)
+        letter_pattern = "[" + re.escape(letters) + "]"
+        self.lengths = frozenset(len(fmt) + length for fmt in self.formats for length in region_lengths)
+
+        to_digit = str.maketrans(TO_DIGIT)
+        to_letter = str.maketrans({char: letter for char, letter in TO_LETTER.items() if letter in letters})
+        self._rules: List[Tuple[re.Pattern, int, List[Tuple[int, int, dict]]]] = []
+        for fmt in self.formats:
+            body = "".join(letter_pattern if slot == _LETTER_SLOT else r"\d" for slot in fmt)
+            pattern = re.compile(f"{body}(?:{region_pattern})")
+            # Участки одинаковых позиций формата и регион исправляются одной заменой каждый
+            runs = []
+            for slot, start, end in _slot_runs(fmt + _DIGIT_SLOT):
+                runs.append((start, end if end <= len(fmt) else None, to_letter if slot == _LETTER_SLOT else to_digit))
+            self._rules.append((pattern, len(fmt), runs))
+
+        # Верхний регистр и замена латиницы кириллицей - одной таблицей
+        fold = {char: char.upper() for char in map(chr, range(ord("a"), ord("z") + 1))}
+        fold.update({char: char.upper() for char in map(chr, range(ord("а"), ord("я") + 1))})
+        fold = {char: LATIN_TO_CYRILLIC.get(upper, upper) for char, upper in fold.items()}
+        fold.update(LATIN_TO_CYRILLIC)
+        self._fold = str.maketrans(fold)
+        self._memo: Dict[str, Tuple[Optional[str], bool]] = {}
+        self.checked = 0
+        self.accepted = 0
+        self.corrected = 0
+        self.rejected = 0
+
+    def _clean(self, text: str) -> str:
+        key = _NOISE_RE.sub("", text).translate(self._fold)
+        if key.endswith(_COUNTRY_SUFFIX):
+            key = key[: -len(_COUNTRY_SUFFIX)]
+        return key
+
+    def _match(self, key: str) -> Tuple[Optional[str], bool]:
+        """Номер и признак исправления символов; (None, False), если ни один формат не подошел."""
+        if len(key) not in self.lengths:
+            return None, False
+        for pattern, body_length, _ in self._rules:
+            if pattern.fullmatch(key) and key[body_length:] in self.regions:
+                return key, False
+        for pattern, body_length, runs in self._rules:
+            candidate = "".join([key[start:end].translate(table) for start, end, table in runs])
+            if (
+                pattern.fullmatch(candidate)
+                and candidate[body_length:] in self.regions
+                and sum(a != b for a, b in zip(key, candidate)) <= self.max_corrections
+            ):
+                return candidate, True
+        return None, False
+
+    def normalize(self, text: Optional[str]) -> Optional[str]:
+        """
+        Приводит прочитанный OCR текст к каноническому номеру.
+
+        :param text: Результат OCR ("a123bc 77\\n", "O123BC77", "|--").
+        :return: Номер ("А123ВС77") или None, если текст не является номером.
+        """
+        if not text:
+            return None
+        match = self._memo.get(text)
+        if match is None:
+            match = self._match(self._clean(text))
+            if len(self._memo) >= self.memo_size:
+                self._memo.clear()
+            self._memo[text] = match
+        plate, corrected = match
+        self.checked += 1
+        if plate is None:
+            self.rejected += 1
+        else:
+            self.accepted += 1
+            self.corrected += corrected
+        return plate
+
+    def normalize_batch(self, texts: Iterable[Optional[str]]) -> List[Optional[str]]:
+        normalize = self.normalize
+        return [normalize(text) for text in texts]
+
+    def stats(self) -> dict:
+        return {
+            "checked": self.checked,
+            "accepted": self.accepted,
+            "corrected": self.corrected,
+            "rejected": self.rejected,
+            "reject_ratio": self.rejected / self.checked if self.checked else 0.0,
+        }
+
+
+def _slot_runs(fmt: str):
+    """Участки формата из одинаковых позиций: (позиция, начало, конец)."""
+    start = 0
+    for index in range(1, len(fmt) + 1):
+        if index == len(fmt) or fmt[index] != fmt[start]:
+            yield fmt[start], start, index
+            start = index
+
+
+_grammar: Optional[PlateGrammar] = None
+_grammar_lock = threading.Lock()
+
+
+def get_plate_grammar() -> PlateGrammar:
+    """Возвращает общую грамматику номеров, собранную из форматов LicensePlateGenerator."""
+    global _grammar
+    if _grammar is None:
+        with _grammar_lock:
+            if _grammar is None:
+                # Генератор импортирует модели базы данных, поэтому - только при первом обращении
+                from src.data_generation.license_plate_generator import LicensePlateGenerator
+
+                _grammar = PlateGrammar(
+                    LicensePlateGenerator.FORMATS.values(),
+                    LicensePlateGenerator.ALLOWED_LETTERS,
+                    LicensePlateGenerator.REGIONS,
+                )
+    return _grammar
+
+
+def validate_plate(text: Optional[str]) -> Optional[str]:
+    """
+    Проверяет прочитанный OCR номер по форматам номерных знаков.
+
+    :param text: Результат OCR.
+    :return: Канонический номер или None.
+    """
+    return get_plate_grammar().normalize(text)
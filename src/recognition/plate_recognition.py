@@ -1,78 +1,316 @@
-import cv2
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
 import numpy as np
-import pytesseract
-from ultralytics import YOLO
 
-from .image_processing import preprocess_image
+from .detector import create_detector
+from .image_processing import get_preprocess_pipeline, preprocess_stats
+from .ocr_cache import ocr_caches
+from .ocr_engine import get_ocr_engine
+from .plate_grammar import get_plate_grammar, validate_plate
+from src.config.config import Config
 from src.utils.logger import recognition_logger
+from src.utils.metrics import register_stats, stage_timer
+
+# Модель YOLOv8 загружается бэкендом Config.DETECTOR_BACKEND при первом обращении
+# (get_model) или заранее при старте приложения (load_model), а не при импорте модуля
+_model = None
+_model_lock = threading.Lock()
+# Состояние загрузки модели для проверки готовности (/ready)
+model_status = {
+    "ready": False, "backend": None, "path": None, "load_seconds": None, "warmup_seconds": None, "error": None
+}
+
+# Порог уверенности детекции номерного знака
+CONFIDENCE_THRESHOLD = 0.5
+
+
+@dataclass
+class PlateResult:
+    """Результат распознавания номерного знака на одном кадре."""
+    box: Tuple[int, int, int, int]  # x, y, w, h
+    confidence: float  # Уверенность детектора
+    crop: np.ndarray = field(repr=False)  # Вырезанное изображение номерного знака
+    text: Optional[str] = None  # Распознанный номер (None, если текст не похож на номер)
+    raw_text: Optional[str] = None  # Текст, возвращенный OCR
+    ocr_confidence: Optional[float] = None  # Уверенность OCR, если движок ее сообщает
+
+
+def warm_up(model, size: int = None) -> float:
+    """
+    Выполняет пробный вызов модели на пустом кадре, чтобы первый реальный
+    кадр не платил за инициализацию среды выполнения (выделение памяти,
+    выбор ядер, компиляция).
+
+    :param model: Загруженная модель YOLO.
+    :param size: Сторона пробного кадра в пикселях, по умолчанию Config.MODEL_WARMUP_SIZE.
+    :return: Время прогрева в секундах.
+    """
+    size = size or Config().MODEL_WARMUP_SIZE
+    started_at = time.perf_counter()
+    model(np.zeros((size, size, 3), dtype=np.uint8), verbose=False)
+    return time.perf_counter() - started_at
+
+
+def load_model(path: str = None, warmup: bool = None, backend: str = None):
+    """
+    Загружает модель YOLO (если она еще не загружена) и прогревает ее.
+
+    Потокобезопасна: при одновременных вызовах модель загружается один раз.
+
+    :param path: Путь к модели, по умолчанию Config.YOLO_MODEL_PATH.
+    :param warmup: Выполнить прогрев, по умолчанию Config.MODEL_WARMUP.
+    :param backend: Бэкенд детектора, по умолчанию Config.DETECTOR_BACKEND.
+    :return: Детектор (src.recognition.detector.Detector).
+    """
+    global _model
+    if _model is not None:
+        return _model
+    with _model_lock:
+        if _model is not None:
+            return _model
+        config = Config()
+        path = path or config.YOLO_MODEL_PATH
+        backend = backend or config.DETECTOR_BACKEND
+        warmup = config.MODEL_WARMUP if warmup is None else warmup
+        model_status.update(backend=backend, path=path, error=None)
+        try:
+            started_at = time.perf_counter()
+            # Библиотека бэкенда (ultralytics и torch, onnxruntime, openvino)
+            # импортируется только при загрузке модели
+            model = create_detector(backend, path)
+            model_status["load_seconds"] = time.perf_counter() - started_at
+            if warmup:
+                model_status["warmup_seconds"] = warm_up(model)
+        except Exception as e:
+            model_status["error"] = str(e)
+            recognition_logger.error("Не удалось загрузить модель %s (%s): %s", path, backend, e)
+            raise
+        _model = model
+        model_status["ready"] = True
+    recognition_logger.info(
+        "Модель %s (%s) загружена за %.2f с, прогрев %s с",
+        path, backend, model_status["load_seconds"], model_status["warmup_seconds"],
+    )
+    return _model
+
+
+def get_model():
+    """Возвращает общую для процесса модель YOLO, загружая ее при первом обращении."""
+    return _model if _model is not None else load_model()
+
+
+def set_model(model) -> None:
+    """
+    Подменяет модель детекции (заглушка в тестах и бенчмарках).
+
+    :param model: Вызываемый объект с интерфейсом YOLO: model(frames, verbose=False)
+        возвращает список результатов с атрибутом boxes (xyxy, conf). None - сбросить.
+    """
+    global _model
+    with _model_lock:
+        _model = model
+        model_status["ready"] = model is not None
+
+
+def _to_numpy(values) -> np.ndarray:
+    """Преобразует тензор (torch) или массив в np.ndarray."""
+    if hasattr(values, "cpu"):
+        values = values.cpu().numpy()
+    return np.asarray(values)
+
+
+def _select_best_box(boxes, frame_shape, scale=(1.0, 1.0)):
+    """
+    Выбирает наиболее уверенный бокс векторными операциями над всеми боксами кадра.
+
+    :param boxes: Объект boxes результата YOLO (массивы xyxy и conf).
+    :param frame_shape: Размер исходного кадра для ограничения координат.
+    :param scale: Отношение размеров исходного кадра к входу детектора (по x и y),
+        если кадр перед детекцией уменьшался.
+    :return: Кортеж (x, y, w, h, confidence) или None.
+    """
+    confidences = _to_numpy(boxes.conf).reshape(-1)
+    if confidences.size == 0:
+        return None
+
+    candidates = np.flatnonzero(confidences > CONFIDENCE_THRESHOLD)
+    if candidates.size == 0:
+        return None
+
+    best = candidates[np.argmax(confidences[candidates])]
+    height, width = frame_shape[:2]
+    x1, y1, x2, y2 = _to_numpy(boxes.xyxy).reshape(-1, 4)[best] * np.tile(scale, 2)
+    # Координаты ограничиваются размерами кадра, чтобы срез не оказался пустым или смещенным
+    x1, x2 = np.clip([x1, x2], 0, width).astype(int)
+    y1, y2 = np.clip([y1, y2], 0, height).astype(int)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return int(x1), int(y1), int(x2 - x1), int(y2 - y1), float(confidences[best])
+
+
+def detect_plates(frames):
+    """
+    Ищет номерные знаки сразу на нескольких кадрах одним вызовом YOLO.
+
+    :param frames: Список кадров в формате BGR.
+    :return: Список той же длины: для каждого кадра кортеж
+        (x, y, w, h, confidence) наиболее уверенного бокса или None.
+    """
+    if not frames:
+        return []
+
+    # Предварительная обработка кадров по Config.DETECTOR_PREPROCESS; у каждого
+    # кадра пачки свой слот, чтобы результаты не перезаписывали друг друга
+    pipeline = get_preprocess_pipeline("detector")
+    if pipeline is not None:
+        with stage_timer("preprocess"):
+            preprocessed_frames = [pipeline(frame, slot=index) for index, frame in enumerate(frames)]
+    else:
+        preprocessed_frames = list(frames)
+
+    # Применение YOLO для поиска номерного знака на всей пачке кадров
+    model = get_model()
+    with stage_timer("detect"):
+        results = model(preprocessed_frames, verbose=False)
+
+    return [
+        _select_best_box(
+            result.boxes,
+            frame.shape,
+            (frame.shape[1] / preprocessed.shape[1], frame.shape[0] / preprocessed.shape[0]),
+        )
+        for frame, preprocessed, result in zip(frames, preprocessed_frames, results)
+    ]
+
+
+def detect_plate(frame):
+    """
+    Ищет номерной знак на кадре с помощью YOLO.
+
+    :param frame: Кадр в формате BGR.
+    :return: Кортеж (x, y, w, h, confidence) наиболее уверенного бокса или None.
+    """
+    return detect_plates([frame])[0]
+
+
+def read_crop_text(plate_image) -> str:
+    """
+    Распознает текст на изображении номерного знака.
+
+    :param plate_image: Вырезанное изображение номерного знака.
+    :return: Распознанный текст.
+    """
+    # Использование Tesseract для распознавания текста
+    text = get_ocr_engine().read(plate_image).text
+    recognition_logger.info("Распознан номер: %s", text)
+    return text
+
 
-# Загрузка модели YOLOv8 из директории models
-model_path = "models/yolov8s.pt"
-model = YOLO(model_path)
+def read_plate_text(frame, box):
+    """
+    Распознает текст номерного знака внутри бокса.
 
+    :param frame: Кадр в формате BGR.
+    :param box: Кортеж (x, y, w, h, ...) с координатами номерного знака.
+    :return: Распознанный текст.
+    """
+    x, y, w, h = box[:4]
+    return read_crop_text(frame[y : y + h, x : x + w])
 
-def recognize_plate_from_frame(frame):
-    recognition_logger.info("Начало распознавания номерного знака")
-    # Предварительная обработка кадра (если требуется)
-    preprocessed_frame, gray = preprocess_image(frame)
 
-    # Применение YOLO для поиска номерного знака
-    results = model(preprocessed_frame)
+def recognize_plates_from_frames(frames, camera_id: str = None) -> List[Optional[PlateResult]]:
+    """
+    Распознает номерные знаки на пачке кадров: один вызов YOLO на всю пачку,
+    затем OCR для найденных номеров.
 
-    # Анализ результатов детекции
-    class_ids = []
-    confidences = []
-    boxes = []
+    :param frames: Список кадров в формате BGR.
+    :param camera_id: Камера, с которой получены кадры: изображения номеров, почти
+        совпадающие с уже прочитанными на этой камере, берутся из кэша OCR
+        (Config.OCR_CACHE_ENABLED).
+    :return: Список той же длины: PlateResult для кадров с номером, иначе None.
+        При Config.PLATE_GRAMMAR_ENABLED text - канонический номер (plate_grammar)
+        или None, если прочитанный текст не подходит ни под один формат.
+    """
+    recognition_logger.info("Начало распознавания номерных знаков на %d кадрах", len(frames))
 
-    for result in results:
-        for box in result.boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])  # Получаем координаты бокса
-            confidence = box.conf[0]
-            class_id = int(box.cls[0])
+    results = []
+    for frame, detection in zip(frames, detect_plates(frames)):
+        if detection is None:
+            results.append(None)
+            continue
+        x, y, w, h, confidence = detection
+        results.append(PlateResult((x, y, w, h), confidence, frame[y : y + h, x : x + w]))
 
-            if confidence > 0.5:  # Порог уверенности
-                boxes.append([x1, y1, x2 - x1, y2 - y1])
-                confidences.append(float(confidence))
-                class_ids.append(class_id)
+    # Все найденные номера распознаются одной пачкой пулом воркеров OCR
+    found = [result for result in results if result is not None]
+    crops = [r.crop for r in found]
+    config = Config()
+    if config.OCR_CACHE_ENABLED:
+        ocr_results = ocr_caches.get(camera_id or "default").read_batch(crops, get_ocr_engine().read_batch)
+    else:
+        ocr_results = get_ocr_engine().read_batch(crops)
+    for result, ocr_result in zip(found, ocr_results):
+        result.raw_text = ocr_result.text
+        result.text = validate_plate(ocr_result.text) if config.PLATE_GRAMMAR_ENABLED else ocr_result.text
+        result.ocr_confidence = ocr_result.confidence
+        if result.text is None:
+            recognition_logger.info("Текст %r не похож на номер и отброшен", result.raw_text)
+        else:
+            recognition_logger.info("Распознан номер: %s", result.text)
 
-    # Нахождение наибольшего по площади бокса (предполагаем, что это номерной знак)
-    if len(boxes) > 0:
-        max_index = np.argmax(confidences)
-        x, y, w, h = boxes[max_index]
-        plate_image = frame[y : y + h, x : x + w]
+    return results
 
-        # Использование Tesseract для распознавания текста
-        text = pytesseract.image_to_string(plate_image, config="--psm 8")
-        print("Распознанный текст:", text)
-        recognition_logger.info(f"Распознан номер: {text}")
-        return text
 
-    return None
+def recognize_plate_from_frame(frame, camera_id: str = None):
+    """
+    Распознает номерной знак на одном кадре (пачка из одного кадра).
 
+    :param frame: Кадр в формате BGR.
+    :param camera_id: Камера, с которой получен кадр (кэш OCR камеры).
+    :return: Текст первого результата recognize_plates_from_frames или None,
+        если номер не найден.
+    """
+    result = recognize_plates_from_frames([frame], camera_id)[0]
+    return result.text if result is not None else None
 
-def process_video_stream():
-    # Захват видео с камеры (0 - индекс камеры по умолчанию)
-    cap = cv2.VideoCapture(0)
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+def create_camera_manager(sources=None, on_plate=None):
+    """
+    Создает обработку видеопотоков всех полос и подключает ее статистику к /metrics.
 
-        # Распознавание номерного знака на текущем кадре
-        text = recognize_plate_from_frame(frame)
+    :param sources: Список источников (индексы камер, RTSP URL или пути к видеофайлам).
+        По умолчанию берется из Config.CAMERA_SOURCES.
+    :param on_plate: Обработчик решения по треку (FramePacket с текстом номера,
+        полосой camera_id и уверенностью OCR confidence).
+    :return: CameraManager, еще не запущенный.
+    """
+    # Импорт внутри функции, чтобы избежать циклического импорта
+    from .camera_manager import CameraManager
 
-        # Отображение кадра с распознанным текстом (если есть)
-        if text:
-            cv2.putText(
-                frame, text, (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2
-            )
+    manager = CameraManager(sources, on_plate=on_plate)
+    # Очереди, пропущенные кадры и счетчики стадий каждой камеры - в /metrics
+    register_stats("pipeline", lambda: [({"camera": lane["camera_id"]}, lane) for lane in manager.stats()["lanes"]])
+    # Среднее время каждого шага предобработки детектора
+    register_stats("preprocess", preprocess_stats)
+    # Попадания, промахи и вытеснения кэшей OCR по камерам
+    register_stats("ocr_cache", lambda: [({"camera": camera}, entry) for camera, entry in ocr_caches.stats().items()])
+    # Время детекции на кадр выбранного бэкенда
+    register_stats("detector", lambda: _model.stats() if hasattr(_model, "stats") else {})
+    # Таймауты, ошибки и зависшие воркеры OCR
+    register_stats("ocr", lambda: get_ocr_engine().stats())
+    # Принятые, исправленные и отброшенные проверкой формата результаты OCR
+    register_stats("plate_grammar", lambda: get_plate_grammar().stats())
+    return manager
 
-        cv2.imshow("Video", frame)
 
-        # Выход из цикла по нажатию 'q'
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
+def process_video_stream(sources=None, on_plate=None):
+    """
+    Запускает конвейерную обработку видеопотоков и блокирует поток до ее завершения.
 
-    cap.release()
-    cv2.destroyAllWindows()
+    :param sources: Список источников (по умолчанию Config.CAMERA_SOURCES).
+    :param on_plate: Обработчик решения по треку.
+    """
+    create_camera_manager(sources, on_plate).run()
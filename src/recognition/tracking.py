@@ -0,0 +1,259 @@
+import itertools
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+
+from src.config.config import Config
+from src.recognition.plate_grammar import validate_plate
+
+config = Config()
+
+
+def box_iou(box_a, box_b) -> float:
+    """
+    Вычисляет IoU (пересечение над объединением) двух боксов (x, y, w, h).
+    """
+    ax, ay, aw, ah = box_a[:4]
+    bx, by, bw, bh = box_b[:4]
+    inter_w = min(ax + aw, bx + bw) - max(ax, bx)
+    inter_h = min(ay + ah, by + bh) - max(ay, by)
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    intersection = inter_w * inter_h
+    return intersection / float(aw * ah + bw * bh - intersection)
+
+
+def crop_quality(crop) -> float:
+    """
+    Оценивает пригодность изображения номера для OCR: резкость
+    (дисперсия лапласиана), умноженная на площадь.
+    """
+    if crop is None or crop.size == 0:
+        return 0.0
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+    return float(sharpness * gray.shape[0] * gray.shape[1])
+
+
+def normalize_read(text: Optional[str]) -> str:
+    """Убирает пробелы и переводы строк из результата OCR и приводит его к верхнему регистру."""
+    return "".join((text or "").split()).upper()
+
+
+@dataclass
+class PlateTrack:
+    """Номерной знак, отслеживаемый на последовательности кадров."""
+    track_id: int
+    box: Tuple[int, int, int, int]
+    first_seen: float
+    last_seen: float
+    hits: int = 1
+    ocr_count: int = 0
+    best_read_quality: float = 0.0
+    first_read_at: Optional[float] = None
+    votes: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    ocr_confidences: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    decided: bool = False
+    last_packet: object = field(default=None, repr=False)
+
+    @property
+    def text(self) -> Optional[str]:
+        """Итоговый текст номера по взвешенному голосованию или None."""
+        if not self.votes:
+            return None
+        return max(self.votes.items(), key=lambda item: item[1])[0]
+
+    @property
+    def ocr_confidence(self) -> Optional[float]:
+        """Средняя уверенность OCR чтений, проголосовавших за итоговый текст, или None."""
+        confidences = self.ocr_confidences.get(self.text) if self.votes else None
+        if not confidences:
+            return None
+        return sum(confidences) / len(confidences)
+
+
+class PlateTracker:
+    """
+    Легковесный IoU-трекер номерных знаков для одной полосы.
+
+    Каждому номеру присваивается стабильный идентификатор трека. OCR
+    запускается для трека не больше max_reads раз и только на кадрах,
+    где номер резче или крупнее, чем при предыдущем чтении. Итоговый
+    текст выбирается голосованием с весами по уверенности, и для каждого
+    трека ровно один раз выдается решение.
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = None,
+        track_timeout: float = None,
+        max_reads: int = None,
+        decision_timeout: float = None,
+        min_quality_gain: float = 0.2,
+        reset_misses: float = None,
+    ):
+        """
+        :param iou_threshold: Минимальный IoU для сопоставления бокса с треком.
+        :param track_timeout: Через сколько секунд без детекций трек считается потерянным.
+        :param max_reads: Максимальное число вызовов OCR на трек.
+        :param decision_timeout: Через сколько секунд после первого чтения выдается решение.
+        :param min_quality_gain: Во сколько раз (относительно) кадр должен быть лучше
+            предыдущего прочитанного, чтобы прочитать его еще раз.
+        :param reset_misses: Сколько средних интервалов между детекциями трека может
+            пройти без детекций, прежде чем трек с выданным решением перестает
+            сопоставляться: следующий автомобиль, вставший на то же место раньше
+            track_timeout, получает новый трек и свое решение. Порог считается по
+            наблюдаемой частоте детекций полосы, поэтому медленная детекция не
+            дробит стоящий автомобиль на несколько треков.
+        """
+        self.iou_threshold = iou_threshold if iou_threshold is not None else config.TRACK_IOU_THRESHOLD
+        self.track_timeout = track_timeout if track_timeout is not None else config.TRACK_TIMEOUT
+        self.max_reads = max_reads if max_reads is not None else config.TRACK_MAX_OCR_READS
+        self.decision_timeout = (
+            decision_timeout if decision_timeout is not None else config.TRACK_DECISION_TIMEOUT
+        )
+        self.min_quality_gain = min_quality_gain
+        self.reset_misses = reset_misses if reset_misses is not None else config.TRACK_RESET_MISSES
+
+        self.tracks: List[PlateTrack] = []
+        self._ids = itertools.count(1)
+        self.ocr_calls = 0
+        self.ocr_skipped = 0
+        self.rejected_reads = 0
+        self.decisions = 0
+
+    def _reset_gap(self, track: PlateTrack) -> float:
+        """Перерыв в детекциях, после которого трек с решением считается потерянным."""
+        if track.hits < 2:
+            return self.track_timeout
+        interval = (track.last_seen - track.first_seen) / (track.hits - 1)
+        return min(self.track_timeout, self.reset_misses * interval)
+
+    def _match(self, box, now: float) -> Optional[PlateTrack]:
+        # Решенный трек продолжается только детекциями без пропусков с сильным перекрытием
+        candidates = [
+            track for track in self.tracks
+            if not track.decided or now - track.last_seen <= self._reset_gap(track)
+        ]
+        best_track, best_iou = None, self.iou_threshold
+        for track in candidates:
+            iou = box_iou(track.box, box)
+            if iou >= best_iou:
+                best_track, best_iou = track, iou
+        if best_track is not None:
+            return best_track
+
+        # Резкое смещение (быстро движущийся автомобиль): сопоставляем по центру
+        cx, cy = box[0] + box[2] / 2, box[1] + box[3] / 2
+        for track in candidates:
+            if track.decided:
+                continue
+            tx, ty, tw, th = track.box
+            if abs(tx + tw / 2 - cx) <= tw and abs(ty + th / 2 - cy) <= th:
+                return track
+        return None
+
+    def update(self, box, now: float, packet=None) -> PlateTrack:
+        """
+        Сопоставляет детекцию с существующим треком или создает новый.
+
+        :param box: Бокс (x, y, w, h) номерного знака.
+        :param now: Текущее время в секундах.
+        :param packet: Кадр, на котором найден номер (сохраняется для выдачи решения).
+        :return: Трек, к которому отнесена детекция.
+        """
+        track = self._match(box, now)
+        if track is None:
+            track = PlateTrack(next(self._ids), tuple(box[:4]), now, now)
+            self.tracks.append(track)
+        else:
+            track.box = tuple(box[:4])
+            track.last_seen = now
+            track.hits += 1
+        if packet is not None:
+            track.last_packet = packet
+        return track
+
+    def should_read(self, track: PlateTrack, crop) -> bool:
+        """
+        Решает, нужно ли запускать OCR для этого изображения номера.
+
+        :param track: Трек номера.
+        :param crop: Вырезанное изображение номера.
+        :return: True, если изображение стоит прочитать.
+        """
+        if track.decided or track.ocr_count >= self.max_reads:
+            self.ocr_skipped += 1
+            return False
+        quality = crop_quality(crop)
+        if track.ocr_count and quality <= track.best_read_quality * (1 + self.min_quality_gain):
+            self.ocr_skipped += 1
+            return False
+        track.best_read_quality = quality
+        return True
+
+    def add_read(
+        self,
+        track: PlateTrack,
+        text: Optional[str],
+        confidence: float,
+        now: float,
+        ocr_confidence: Optional[float] = None,
+    ) -> None:
+        """
+        Добавляет результат OCR в голосование трека.
+
+        :param track: Трек номера.
+        :param text: Распознанный текст. При Config.PLATE_GRAMMAR_ENABLED текст,
+            не подходящий ни под один формат номера, в голосовании не участвует.
+        :param confidence: Вес голоса (уверенность распознавания).
+        :param now: Текущее время в секундах.
+        :param ocr_confidence: Уверенность OCR (0..1), если движок ее сообщает, -
+            для журнала решений.
+        """
+        self.ocr_calls += 1
+        track.ocr_count += 1
+        text = validate_plate(text) if config.PLATE_GRAMMAR_ENABLED else normalize_read(text)
+        if not text:
+            self.rejected_reads += 1
+            return
+        if track.first_read_at is None:
+            track.first_read_at = now
+        track.votes[text] += max(confidence, 1e-6)
+        if ocr_confidence is not None:
+            track.ocr_confidences[text].append(ocr_confidence)
+
+    def pop_decisions(self, now: float) -> List[PlateTrack]:
+        """
+        Возвращает треки, по которым пора выдать решение, и удаляет потерянные треки.
+
+        Решение выдается, когда исчерпан лимит чтений, истек decision_timeout
+        после первого успешного чтения или трек потерян.
+        """
+        ready = []
+        alive = []
+        for track in self.tracks:
+            lost = now - track.last_seen > self.track_timeout
+            if not track.decided and track.votes and (
+                lost
+                or track.ocr_count >= self.max_reads
+                or now - track.first_read_at >= self.decision_timeout
+            ):
+                track.decided = True
+                self.decisions += 1
+                ready.append(track)
+            if not lost:
+                alive.append(track)
+        self.tracks = alive
+        return ready
+
+    def stats(self) -> dict:
+        return {
+            "active_tracks": len(self.tracks),
+            "ocr_calls": self.ocr_calls,
+            "ocr_skipped": self.ocr_skipped,
+            "rejected_reads": self.rejected_reads,
+            "decisions": self.decisions,
+        }
@@ -1,14 +1,15 @@
 import logging
 
+from src.utils.logger import configure_logging
+
 
 def setup_logging(log_level=logging.INFO):
     """
-    Настройка логирования для всего приложения.
+    Настройка логирования для всего приложения: файлы компонентов и вывод
+    в консоль через фоновую очередь (см. configure_logging).
 
     :param log_level: Уровень логирования, по умолчанию INFO.
     """
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    logging.getLogger().setLevel(log_level)
+    configure_logging(level=log_level, console=True)
     logging.info("Логирование настроено.")
@@ -1,24 +1,227 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
-# import os
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Iterable, Optional
 
+from src.config.config import Config
 
-def setup_logger(name, log_file, level=logging.INFO):
-    formatter = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+# Компоненты системы и их файлы логов (в каталоге Config.LOG_DIR)
+LOG_FILES = {
+    "main": "main.log",
+    "recognition": "recognition.log",
+    "access_control": "access_control.log",
+    "database": "database.log",
+    "web": "web.log",
+}
 
-    handler = RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5)
-    handler.setFormatter(formatter)
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+CONSOLE_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
-    logger.addHandler(handler)
 
-    return logger
+class TextFormatter(logging.Formatter):
+    """Текстовый формат; добавляет число сообщений, пропущенных ограничителем частоты."""
 
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            message += f" (еще {suppressed} похожих сообщений пропущено)"
+        return message
 
-# Создаем логгеры для разных компонентов системы
-main_logger = setup_logger("main", "logs/main.log")
-recognition_logger = setup_logger("recognition", "logs/recognition.log")
-access_control_logger = setup_logger("access_control", "logs/access_control.log")
-database_logger = setup_logger("database", "logs/database.log")
-web_logger = setup_logger("web", "logs/web.log")
+
+class JsonLinesFormatter(logging.Formatter):
+    """Формат JSON lines: одна запись - один JSON-объект в строке."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Ограничивает частоту повторяющихся сообщений (например, покадровых).
+
+    Сообщения различаются по логгеру и шаблону (record.msg), поэтому
+    ограничение работает только для вызовов в стиле
+    logger.info("Распознан номер: %s", text). Для каждого шаблона
+    действует корзина токенов: не больше burst сообщений подряд и rate
+    сообщений в секунду в среднем. Число пропущенных сообщений
+    передается со следующим записанным сообщением (атрибут suppressed).
+    Предупреждения и ошибки не ограничиваются.
+    """
+
+    def __init__(self, rate: float, burst: int = 5, names: Iterable[str] = ("recognition",)):
+        """
+        :param rate: Средняя частота сообщений одного шаблона в секунду.
+        :param burst: Сколько сообщений одного шаблона пропускается подряд.
+        :param names: Логгеры (и их потомки), к которым применяется ограничение.
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.names = tuple(names)
+        self._buckets: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not record.name.startswith(self.names):
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                # [токены, время последнего пополнения, пропущено]
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1.0
+            record.suppressed, bucket[2] = bucket[2], 0
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler без форматирования в вызывающем потоке.
+
+    Стандартный QueueHandler форматирует сообщение перед постановкой в
+    очередь; здесь запись передается как есть, и подстановка аргументов
+    выполняется в потоке слушателя. Аргументы логирования не должны
+    изменяться после вызова (на практике это строки и числа).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _ComponentRouter(logging.Handler):
+    """Направляет запись в файл компонента по имени логгера и, если задано, в консоль."""
+
+    def __init__(self, file_handlers: Dict[str, logging.Handler], console: Optional[logging.Handler]):
+        super().__init__()
+        self.file_handlers = file_handlers
+        self.console = console
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        handler = self.file_handlers.get(record.name.split(".", 1)[0])
+        if handler is not None and record.levelno >= handler.level:
+            handler.handle(record)
+        if self.console is not None and record.levelno >= self.console.level:
+            self.console.handle(record)
+        return True
+
+    def close(self) -> None:
+        for handler in self.file_handlers.values():
+            handler.close()
+        if self.console is not None:
+            self.console.close()
+        super().close()
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging(
+    log_dir: str = None,
+    level: int = None,
+    json_lines: bool = None,
+    console: bool = False,
+    rate_limit: float = None,
+    rate_burst: int = None,
+) -> None:
+    """
+    Настраивает логирование приложения; повторные вызовы ничего не делают.
+
+    Все записи ставятся в неблокирующую очередь обработчиком корневого
+    логгера, а форматирование и запись на диск (RotatingFileHandler по
+    файлу на компонент) выполняет фоновый поток QueueListener. Поэтому
+    задержки диска не попадают во время обработки запроса или кадра.
+    До вызова этой функции логгеры компонентов не пишут в файлы.
+
+    :param log_dir: Каталог файлов логов, по умолчанию Config.LOG_DIR.
+    :param level: Уровень логирования, по умолчанию Config.LOG_LEVEL.
+    :param json_lines: Писать файлы в формате JSON lines, по умолчанию Config.LOG_FORMAT == "json".
+    :param console: Дублировать записи в stderr.
+    :param rate_limit: Сообщений одного шаблона в секунду для покадровых логов (0 - без ограничения).
+    :param rate_burst: Сколько сообщений одного шаблона пропускается подряд.
+    """
+    global _listener, _queue_handler
+    config = Config()
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        log_dir = log_dir or config.LOG_DIR
+        level = level if level is not None else logging.getLevelName(config.LOG_LEVEL.upper())
+        json_lines = json_lines if json_lines is not None else config.LOG_FORMAT == "json"
+        rate_limit = rate_limit if rate_limit is not None else config.LOG_RATE_LIMIT
+        rate_burst = rate_burst if rate_burst is not None else config.LOG_RATE_BURST
+
+        os.makedirs(log_dir, exist_ok=True)
+        formatter = JsonLinesFormatter() if json_lines else TextFormatter(TEXT_FORMAT)
+        file_handlers = {}
+        for name, filename in LOG_FILES.items():
+            handler = RotatingFileHandler(
+                os.path.join(log_dir, filename), maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"
+            )
+            handler.setFormatter(formatter)
+            file_handlers[name] = handler
+            logging.getLogger(name).setLevel(level)
+
+        console_handler = None
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(TextFormatter(CONSOLE_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = LazyQueueHandler(log_queue)
+        if rate_limit > 0:
+            _queue_handler.addFilter(RateLimitFilter(rate_limit, rate_burst))
+        logging.getLogger().addHandler(_queue_handler)
+
+        _listener = QueueListener(log_queue, _ComponentRouter(file_handlers, console_handler))
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Дописывает очередь логов на диск и останавливает фоновый поток."""
+    global _listener, _queue_handler
+    with _configure_lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = _queue_handler = None
+
+
+# Логгеры компонентов системы. Обработчики подключаются в configure_logging(),
+# поэтому импорт модуля не создает файлов.
+main_logger = logging.getLogger("main")
+recognition_logger = logging.getLogger("recognition")
+access_control_logger = logging.getLogger("access_control")
+database_logger = logging.getLogger("database")
+web_logger = logging.getLogger("web")
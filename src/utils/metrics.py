@@ -0,0 +1,205 @@
+import threading
+import time
+from typing import Callable, Dict, List, Tuple, Union
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from src.config.config import Config
+
+# Отдельный реестр приложения: в /metrics попадают только наши метрики
+REGISTRY = CollectorRegistry()
+
+# Границы корзин от 0.5 мс (поиск в индексе) до 5 с (OCR, холодная модель)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+STAGE_SECONDS = Histogram(
+    "parking_stage_seconds",
+    "Длительность стадий распознавания и проверки доступа",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+    registry=REGISTRY,
+)
+REQUEST_SECONDS = Histogram(
+    "parking_http_request_seconds",
+    "Длительность HTTP-запросов по маршрутам",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS,
+    registry=REGISTRY,
+)
+OCR_CALLS = Counter("parking_ocr_calls", "Число распознанных OCR изображений", ["backend"], registry=REGISTRY)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+_enabled = Config().METRICS_ENABLED
+_stage_children: Dict[str, object] = {}
+
+
+def metrics_enabled() -> bool:
+    """Включен ли сбор метрик."""
+    return _enabled
+
+
+def set_metrics_enabled(enabled: bool) -> None:
+    """Включает или выключает сбор метрик во время работы (уже собранные значения сохраняются)."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+class _StageTimer:
+    """Замер длительности стадии: with stage_timer("detect"): ..."""
+
+    __slots__ = ("_histogram", "_started_at")
+
+    def __init__(self, histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe(time.perf_counter() - self._started_at)
+        return False
+
+
+class _NoopTimer:
+    """Замер-заглушка, когда метрики выключены: не обращается к часам и гистограммам."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+def _stage(stage: str):
+    child = _stage_children.get(stage)
+    if child is None:
+        child = _stage_children[stage] = STAGE_SECONDS.labels(stage)
+    return child
+
+
+def stage_timer(stage: str):
+    """
+    Возвращает контекстный менеджер, измеряющий длительность стадии.
+
+    :param stage: Имя стадии (метка stage гистограммы parking_stage_seconds).
+    """
+    if not _enabled:
+        return _NOOP_TIMER
+    return _StageTimer(_stage(stage))
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Записывает уже измеренную длительность стадии."""
+    if _enabled:
+        _stage(stage).observe(seconds)
+
+
+def count_ocr_calls(backend: str, count: int = 1) -> None:
+    """Учитывает вызовы OCR (скорость в секунду - rate() в Prometheus)."""
+    if _enabled:
+        OCR_CALLS.labels(backend).inc(count)
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    """Записывает длительность HTTP-запроса."""
+    if _enabled:
+        REQUEST_SECONDS.labels(method, route, str(status)).observe(seconds)
+
+
+StatsRows = Union[dict, List[Tuple[dict, dict]]]
+
+# Ключи stats(), которые только растут с момента запуска: они публикуются как
+# счетчики (parking_<источник>_<ключ>_total), чтобы rate() и increase() верно
+# учитывали сброс при перезапуске; остальные числа - текущие значения (gauge)
+COUNTER_KEYS = frozenset({
+    "accepted", "batches", "calls", "checked", "checkouts", "connects", "corrected",
+    "decisions", "dropped", "encoded", "errors", "evictions", "expirations",
+    "failed_flushes", "fallbacks", "flushes", "found", "frames", "full_reloads",
+    "fuzzy_matches", "hits", "misses", "not_found", "ocr_calls", "ocr_skipped",
+    "processed", "published", "put", "reconnects", "recorded", "rejected", "rejected_reads",
+    "skipped", "timeouts", "waits", "wakeups", "written",
+})
+
+
+class StatsCollector:
+    """
+    Публикует статистику компонентов (методы stats()) как метрики Prometheus.
+
+    Источник - функция без аргументов, возвращающая словарь или список пар
+    (метки, словарь). Числовые значения, в том числе во вложенных словарях,
+    становятся метриками parking_<источник>_<ключ>; строки и None пропускаются.
+    Ключи из COUNTER_KEYS публикуются как счетчики, остальные - как gauge.
+    Значения читаются только при запросе /metrics, поэтому на обработку
+    кадров и запросов источники не влияют.
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, Callable[[], StatsRows]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, source: Callable[[], StatsRows]) -> None:
+        with self._lock:
+            self._sources[name] = source
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._sources.pop(name, None)
+
+    @staticmethod
+    def _flatten(values: dict, prefix: str = ""):
+        for key, value in values.items():
+            name = f"{prefix}_{key}" if prefix else str(key)
+            if isinstance(value, dict):
+                yield from StatsCollector._flatten(value, name)
+            elif isinstance(value, (bool, int, float)) and value == value and abs(value) != float("inf"):
+                yield name.replace("-", "_").replace(".", "_"), float(value), key in COUNTER_KEYS
+
+    def collect(self):
+        with self._lock:
+            sources = list(self._sources.items())
+        for source_name, source in sources:
+            try:
+                rows = source()
+            except Exception:
+                continue
+            if isinstance(rows, dict):
+                rows = [({}, rows)]
+            families = {}
+            for labels, values in rows:
+                for key, value, is_counter in self._flatten(values):
+                    metric_name = f"parking_{source_name}_{key}"
+                    family = families.get(metric_name)
+                    if family is None:
+                        family_type = CounterMetricFamily if is_counter else GaugeMetricFamily
+                        family = families[metric_name] = family_type(
+                            metric_name, f"{source_name}: {key}", labels=sorted(labels)
+                        )
+                    family.add_metric([str(labels[label]) for label in sorted(labels)], value)
+            yield from families.values()
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+def register_stats(name: str, source: Callable[[], StatsRows]) -> None:
+    """
+    Подключает статистику компонента к /metrics.
+
+    :param name: Имя источника (часть имени метрик).
+    :param source: Функция, возвращающая словарь или список пар (метки, словарь).
+    """
+    stats_collector.register(name, source)
+
+
+def render_metrics() -> bytes:
+    """Все метрики в текстовом формате Prometheus."""
+    return generate_latest(REGISTRY)
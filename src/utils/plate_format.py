@@ -0,0 +1,66 @@
+import re
+
+# Латинские буквы, начертание которых совпадает с буквами российских номеров
+LATIN_TO_CYRILLIC = {
+    "A": "А",
+    "B": "В",
+    "E": "Е",
+    "K": "К",
+    "M": "М",
+    "H": "Н",
+    "O": "О",
+    "P": "Р",
+    "C": "С",
+    "T": "Т",
+    "Y": "У",
+    "X": "Х",
+}
+
+_FOLD_TABLE = str.maketrans(LATIN_TO_CYRILLIC)
+# Обратная замена - для отображения и тестовых данных в латинице
+CYRILLIC_TO_LATIN = str.maketrans({cyrillic: latin for latin, cyrillic in LATIN_TO_CYRILLIC.items()})
+_NOISE_RE = re.compile(r"[\W_]+")
+
+
+def normalize_plate(text: str) -> str:
+    """
+    Приводит номерной знак к единому виду: верхний регистр, без пробелов
+    и знаков препинания, латинские буквы заменены кириллическими двойниками.
+
+    :param text: Номер в произвольном виде ("a123bc 77", "А123ВС77\\n").
+    :return: Нормализованный номер ("А123ВС77").
+    """
+    return _NOISE_RE.sub("", text.upper()).translate(_FOLD_TABLE)
+
+
+_REGION_RE = re.compile(r"^(.*\D)(\d{2,3})$")
+
+
+def plate_key(number: str, region: str = None) -> str:
+    """
+    Канонический ключ номерного знака для хранения и поиска (столбец vehicles.plate_key).
+
+    Ключ - нормализованный номер (normalize_plate), за которым следует код
+    региона, поэтому "а123вс 77", "A123BC77" и ("А123ВС", "77") дают один ключ.
+
+    :param number: Номер целиком или без региона.
+    :param region: Код региона, если он передается отдельно.
+    :return: Ключ ("А123ВС77").
+    """
+    if region is None:
+        return normalize_plate(number)
+    return normalize_plate(number) + normalize_plate(region)
+
+
+def split_plate(text: str):
+    """
+    Делит номер на основную часть и код региона (2-3 последние цифры после буквы).
+
+    :param text: Номер в произвольном виде.
+    :return: Кортеж (номер, регион); регион None, если его не удалось выделить.
+    """
+    key = normalize_plate(text)
+    match = _REGION_RE.match(key)
+    if match is None:
+        return key, None
+    return match.group(1), match.group(2)
@@ -1,18 +1,238 @@
-from fastapi import FastAPI, Depends, Request, Form
-from fastapi.responses import HTMLResponse
+import asyncio
+import hmac
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import FastAPI, Depends, Header, HTTPException, Request, Form, Query
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.access_control.access_manager import AccessManager
-from src.database.database import get_db
-from src.utils.logger import web_logger
+from src.access_control.event_journal import (
+    AccessEventJournal,
+    access_event_to_dict,
+    query_access_events,
+)
+from src.access_control.plate_cache import DatabasePlateSource, PlateIndex
+from src.config.config import Config
+from src.database.engine import engines
+from src.database.database import AsyncSessionLocal, dispose_engines, get_db
+from src.recognition.live_view import MEDIA_TYPE as LIVE_VIEW_MEDIA_TYPE, live_views
+from src.utils.logger import configure_logging, web_logger
+from src.utils.metrics import (
+    CONTENT_TYPE,
+    metrics_enabled,
+    observe_request,
+    register_stats,
+    render_metrics,
+    set_metrics_enabled,
+    stage_timer,
+)
+
+config = Config()
+
+# Индекс разрешенных номеров в памяти (если включен)
+plate_index = PlateIndex(DatabasePlateSource()) if config.PLATE_CACHE_ENABLED else None
+
+# Журнал решений о доступе с фоновой пакетной записью (если включен)
+access_journal = AccessEventJournal() if config.ACCESS_JOURNAL_ENABLED else None
 
 # Создаем экземпляр AccessManager
-access_manager = AccessManager()
+access_manager = AccessManager(plate_index=plate_index, journal=access_journal)
+
+
+class BatchAccessRequest(BaseModel):
+    """Тело запроса пакетной проверки доступа."""
+    plates: List[str]
+
+
+async def stream_batch_decisions(plates: List[str], chunk_size: int):
+    """
+    Проверяет доступ частями и отдает результат как JSON-массив по мере готовности.
+
+    Номера должны быть уже без повторов: каждая часть проверяется отдельно.
+    Сессия открывается внутри генератора: зависимости FastAPI с yield
+    закрываются до начала отправки потокового ответа.
+    """
+    yield "["
+    first = True
+    async with AsyncSessionLocal() as db:
+        for start in range(0, len(plates), chunk_size):
+            decisions = await access_manager.check_access_batch(plates[start : start + chunk_size], db)
+            items = [
+                json.dumps({"license_plate": plate, "access_granted": granted}, ensure_ascii=False)
+                for plate, granted in decisions.items()
+            ]
+            if items:
+                yield ("" if first else ",") + ",".join(items)
+                first = False
+    yield "]"
+
+
+async def preload_model() -> None:
+    """Загружает и прогревает модель детекции в отдельном потоке."""
+    # Импорт внутри функции: модуль распознавания тянет OpenCV, а модель - torch
+    from src.recognition.plate_recognition import load_model
+
+    try:
+        await asyncio.to_thread(load_model)
+    except Exception as e:
+        web_logger.error("Не удалось загрузить модель детекции: %s", e)
+
+
+async def check_video_plate(license_plate: str, lane: str, ocr_confidence: Optional[float] = None) -> bool:
+    """Проверяет доступ по решению видеоконвейера; полоса и уверенность OCR попадают в журнал."""
+    async with AsyncSessionLocal() as db:
+        return await access_manager.check_access(
+            license_plate, db, lane=lane, ocr_confidence=ocr_confidence, source="video"
+        )
+
+
+def _log_video_check_error(future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        web_logger.error("Ошибка проверки доступа по видео: %s", future.exception())
+
+
+def video_access_handler(loop: asyncio.AbstractEventLoop):
+    """
+    Создает обработчик решений видеоконвейера (on_plate).
+
+    Проверка доступа выполняется в цикле событий веб-приложения (там же
+    индекс номеров и журнал), поток стадии решения ее не ждет.
+
+    :param loop: Цикл событий веб-приложения.
+    """
+    def on_plate(packet) -> None:
+        try:
+            future = asyncio.run_coroutine_threadsafe(
+                check_video_plate(packet.text, packet.camera_id, packet.confidence), loop
+            )
+        except RuntimeError:
+            # Цикл событий уже остановлен: приложение завершает работу
+            web_logger.warning("Решение по номеру %s получено после остановки приложения", packet.text)
+            return
+        future.add_done_callback(_log_video_check_error)
+
+    return on_plate
+
+
+def start_video_processing(loop: asyncio.AbstractEventLoop):
+    """
+    Запускает обработку видеопотоков всех полос (Config.CAMERA_SOURCES) в фоновом потоке.
+
+    :return: CameraManager и поток, в котором он работает, или None, если
+        источники видео не заданы.
+    """
+    # Импорт внутри функции: модуль распознавания тянет OpenCV и модель детекции
+    from src.recognition.camera_manager import parse_camera_sources
+    from src.recognition.plate_recognition import create_camera_manager
+
+    sources = parse_camera_sources(config.CAMERA_SOURCES)
+    if not sources:
+        web_logger.error(
+            "Обработка видео включена (VIDEO_PIPELINE_ENABLED=1), но источники не заданы: "
+            "укажите CAMERA_SOURCES (RTSP URL или пути к видеофайлам)"
+        )
+        return None
+    manager = create_camera_manager(sources, on_plate=video_access_handler(loop))
+    thread = threading.Thread(target=manager.run, name="video-processing", daemon=True)
+    thread.start()
+    return manager, thread
+
+
+def readiness() -> dict:
+    """Состояние компонентов, загружаемых в фоне при старте приложения."""
+    checks = {}
+    if plate_index is not None:
+        checks["plate_index"] = plate_index.ready
+    if config.MODEL_PRELOAD:
+        from src.recognition.plate_recognition import model_status
+
+        checks["model"] = model_status["ready"]
+    return {"ready": all(checks.values()), "checks": checks}
 
 
-def create_app() -> FastAPI:
-    new_app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запускает в фоне загрузку индекса номеров (и его периодическое
+    обновление) и загрузку с прогревом модели детекции, не задерживая
+    старт сервера: готовность сообщает /ready. Запускает фоновую запись
+    журнала доступа и при остановке дописывает накопленные события. Если
+    приложение создано с обработкой видео, запускает конвейеры камер, а
+    при остановке закрывает их и движок OCR.
+    """
+    configure_logging()
+    if access_journal is not None:
+        access_journal.start()
+    background = []
+    if plate_index is not None:
+        # Пока индекс не загружен, проверки доступа обращаются к базе данных
+        background.append(asyncio.create_task(plate_index.run_refresher()))
+    if config.MODEL_PRELOAD:
+        background.append(asyncio.create_task(preload_model()))
+    video = None
+    if getattr(app.state, "video", False):
+        video = start_video_processing(asyncio.get_running_loop())
+    yield
+    if video is not None:
+        # Импорт внутри функции: модуль уже загружен обработкой видео
+        from src.recognition.ocr_engine import close_ocr_engine
+
+        manager, thread = video
+        manager.stop()
+        await asyncio.to_thread(thread.join, 5.0)
+        # Движок OCR создается только обработкой видео: освобождаем его воркеры и экземпляры Tesseract
+        close_ocr_engine()
+    for task in background:
+        task.cancel()
+    if access_journal is not None:
+        await access_journal.close()
+    await dispose_engines()
+
+
+def register_metrics_sources() -> None:
+    """Подключает статистику индекса номеров, пулов соединений и журнала к /metrics."""
+    if plate_index is not None:
+        register_stats("plate_index", plate_index.stats)
+    if access_journal is not None:
+        register_stats("access_journal", access_journal.stats)
+    register_stats("db_pool", lambda: [({"database": url}, entry) for url, entry in engines.stats().items()])
+    register_stats("live_view", lambda: [({"camera": camera}, entry) for camera, entry in live_views.stats().items()])
+
+
+def create_app(video: bool = None) -> FastAPI:
+    """
+    Создает веб-приложение.
+
+    :param video: Запускать ли вместе с приложением обработку видеопотоков,
+        по умолчанию Config.VIDEO_PIPELINE_ENABLED.
+    """
+    new_app = FastAPI(lifespan=lifespan)
+    new_app.state.video = video if video is not None else config.VIDEO_PIPELINE_ENABLED
+    register_metrics_sources()
+
+    @new_app.middleware("http")
+    async def measure_request(request: Request, call_next):
+        if not metrics_enabled():
+            return await call_next(request)
+        started_at = time.perf_counter()
+        response = await call_next(request)
+        # Шаблон маршрута, а не путь: иначе каждый номер дал бы отдельную метку
+        route = request.scope.get("route")
+        observe_request(
+            request.method,
+            route.path if route is not None else "unmatched",
+            response.status_code,
+            time.perf_counter() - started_at,
+        )
+        return response
 
     # Настройка Jinja2Templates с указанием директории для шаблонов
     templates = Jinja2Templates(directory="src/web/templates")
@@ -21,37 +241,148 @@ def create_app() -> FastAPI:
     async def check_vehicle_access(
         license_plate: str, request: Request, db: AsyncSession = Depends(get_db)
     ):
-        web_logger.info(
-            f"Получен запрос на проверку доступа для номера: {license_plate}"
-        )
+        web_logger.info("Получен запрос на проверку доступа для номера: %s", license_plate)
 
         # Проверяем доступ с помощью метода check_access из AccessManager
         has_access = await access_manager.check_access(license_plate, db)
 
         # Рендеринг шаблона и передача данных в контекст
-        return templates.TemplateResponse(
-            "access_result.html",
-            {
-                "request": request,
-                "license_plate": license_plate,
-                "access_granted": has_access,
-            },
-        )
+        with stage_timer("template_render"):
+            return templates.TemplateResponse(
+                "access_result.html",
+                {
+                    "request": request,
+                    "license_plate": license_plate,
+                    "access_granted": has_access,
+                },
+            )
 
     @new_app.post("/check_access", response_model=dict)
     async def check_access(
         plate_number: str = Form(...), db: AsyncSession = Depends(get_db)
     ):
-        web_logger.info(
-            f"Получен POST-запрос на проверку доступа для номера: {plate_number}"
-        )
+        web_logger.info("Получен POST-запрос на проверку доступа для номера: %s", plate_number)
 
         # Проверяем доступ с помощью метода check_access из AccessManager
         result = await access_manager.check_access(plate_number, db)
 
         return {"access_granted": result}
 
-    return new_app
+    @new_app.post("/check_access/batch")
+    async def check_access_batch(batch: BatchAccessRequest):
+        web_logger.info("Получен запрос на пакетную проверку доступа для %d номеров", len(batch.plates))
+        # Повторы схлопываются до деления на части, чтобы потоковый ответ
+        # совпадал с обычным и не проверял один номер в нескольких частях
+        plates = list(dict.fromkeys(batch.plates))
 
+        # Большие наборы обрабатываются частями и отдаются потоком; сессия
+        # открывается внутри генератора, поэтому здесь она не берется
+        if len(plates) > config.BATCH_STREAM_THRESHOLD:
+            return StreamingResponse(
+                stream_batch_decisions(plates, max(config.BATCH_STREAM_THRESHOLD, 1)),
+                media_type="application/json",
+            )
 
-app = create_app()
+        async with AsyncSessionLocal() as db:
+            decisions = await access_manager.check_access_batch(plates, db)
+        return [
+            {"license_plate": plate, "access_granted": granted}
+            for plate, granted in decisions.items()
+        ]
+
+    @new_app.get("/plate_cache/stats", response_model=dict)
+    async def plate_cache_stats():
+        # Устаревание индекса номеров и доля проверок без обращения к базе
+        if plate_index is None:
+            return {"enabled": False}
+        return {"enabled": True, **plate_index.stats()}
+
+    @new_app.get("/access_events", response_model=list)
+    async def access_events(
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        lane: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=1000),
+        db: AsyncSession = Depends(get_db),
+    ):
+        # Решения о доступе за интервал времени, новые первыми
+        events = await query_access_events(db, since=since, until=until, lane=lane, limit=limit)
+        return [access_event_to_dict(event) for event in events]
+
+    @new_app.get("/access_events/stats", response_model=dict)
+    async def access_events_stats():
+        # Очередь и счетчики фоновой записи журнала
+        if access_journal is None:
+            return {"enabled": False}
+        return {"enabled": True, **access_journal.stats()}
+
+    @new_app.get("/access_events/{license_plate}", response_model=list)
+    async def access_events_by_plate(
+        license_plate: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = Query(100, ge=1, le=1000),
+        db: AsyncSession = Depends(get_db),
+    ):
+        # История проездов одного номера
+        events = await query_access_events(
+            db, since=since, until=until, license_plate=license_plate, limit=limit
+        )
+        return [access_event_to_dict(event) for event in events]
+
+    @new_app.get("/db_pool/stats", response_model=dict)
+    async def db_pool_stats():
+        # Загрузка пулов соединений: выданные соединения, переполнение, ожидание
+        return engines.stats()
+
+    @new_app.get("/live", response_model=dict)
+    async def live_view_list():
+        # Камеры с предпросмотром, число зрителей и затраты на кодирование
+        return live_views.stats()
+
+    @new_app.get("/live/{camera_id}")
+    async def live_view_stream(camera_id: str):
+        # MJPEG-поток камеры: один JPEG на кадр для всех зрителей, не чаще LIVE_VIEW_FPS
+        view = live_views.find(camera_id)
+        if view is None:
+            raise HTTPException(status_code=404, detail="Камера не найдена")
+        return StreamingResponse(
+            view.stream(), media_type=LIVE_VIEW_MEDIA_TYPE, headers={"Cache-Control": "no-store"}
+        )
+
+    @new_app.get("/live/{camera_id}/snapshot.jpg")
+    async def live_view_snapshot(camera_id: str):
+        view = live_views.find(camera_id)
+        if view is None:
+            raise HTTPException(status_code=404, detail="Камера не найдена")
+        jpeg = await view.snapshot()
+        if jpeg is None:
+            raise HTTPException(status_code=503, detail="Нет кадров с камеры")
+        return Response(jpeg, media_type="image/jpeg", headers={"Cache-Control": "no-store"})
+
+    @new_app.get("/metrics")
+    async def metrics():
+        # Гистограммы стадий и запросов, статистика компонентов в формате Prometheus
+        return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+    @new_app.post("/metrics/toggle", response_model=dict)
+    async def toggle_metrics(enabled: bool, x_metrics_token: Optional[str] = Header(None)):
+        # Замеры можно отключить без перезапуска, если понадобится убрать их накладные расходы.
+        # Без METRICS_TOGGLE_TOKEN маршрут выключен: сбор метрик задается только конфигурацией
+        if not config.METRICS_TOGGLE_TOKEN:
+            raise HTTPException(status_code=404, detail="Not Found")
+        if x_metrics_token is None or not hmac.compare_digest(
+            x_metrics_token.encode(), config.METRICS_TOGGLE_TOKEN.encode()
+        ):
+            raise HTTPException(status_code=403, detail="Неверный токен")
+        set_metrics_enabled(enabled)
+        web_logger.info("Сбор метрик %s", "включен" if enabled else "выключен")
+        return {"enabled": metrics_enabled()}
+
+    @new_app.get("/ready")
+    async def ready():
+        # 503, пока индекс номеров и модель детекции не загружены
+        status = readiness()
+        return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+    return new_app
@@ -1,6 +1,9 @@
+import asyncio
+
 import pytest
 
 from src.access_control.access_manager import AccessManager
+from src.access_control.plate_cache import PlateIndex, StaticPlateSource
 
 
 @pytest.fixture
@@ -24,3 +27,87 @@ def test_deny_access(access_manager):
 
     result = access_manager.grant_access(plate_number)
     assert result is False, f"Expected access to be denied for plate {plate_number}, but it was granted"
+
+
+@pytest.fixture
+def plate_source():
+    # Источник номеров в памяти вместо базы данных
+    return StaticPlateSource(["А123ВС77", "Е456КМ199"])
+
+
+def test_check_access_uses_plate_index(plate_source):
+    plate_index = PlateIndex(plate_source, max_staleness=60)
+    asyncio.run(plate_index.load())
+    manager = AccessManager(plate_index=plate_index)
+
+    # Индекс авторитетен, поэтому сессия базы данных не нужна
+    assert asyncio.run(manager.check_access("А123ВС77", db_session=None)) is True
+    assert asyncio.run(manager.check_access("Х999ХХ01", db_session=None)) is False
+    assert plate_index.stats()["hit_rate"] == 1.0
+
+
+def test_fuzzy_match_does_not_grant_by_default():
+    plate_index = PlateIndex(StaticPlateSource(["А155ВС77", "Е456КМ199"]), max_staleness=60, fuzzy_max_distance=0.5)
+    asyncio.run(plate_index.load())
+    manager = AccessManager(plate_index=plate_index)
+
+    # Другие допустимые номера, отличающиеся одним символом, не совпадают
+    assert asyncio.run(manager.check_access("А156ВС77", db_session=None)) is False
+    assert asyncio.run(manager.check_access("Е456КН199", db_session=None)) is False
+    assert plate_index.closest("А156ВС77") is None
+
+    # Замена В/8 находится, но без FUZZY_MATCH_GRANT доступ не разрешает
+    assert manager.match_plate("А1558С77").plate == "А155ВС77"
+    assert asyncio.run(manager.check_access("А1558С77", db_session=None)) is False
+    granting = AccessManager(plate_index=plate_index, fuzzy_grant=True)
+    assert asyncio.run(granting.check_access("А1558С77", db_session=None)) is True
+
+
+def test_plate_index_incremental_refresh(plate_source):
+    plate_index = PlateIndex(plate_source, max_staleness=60)
+    asyncio.run(plate_index.load())
+
+    plate_source.add("О777ОО77")
+    asyncio.run(plate_index.refresh())
+    assert plate_index.lookup("О777ОО77") is True
+    assert plate_index.full_reloads == 1
+
+    # Удаление невозможно учесть инкрементально - индекс перезагружается целиком
+    plate_source.remove("А123ВС77")
+    asyncio.run(plate_index.refresh())
+    assert plate_index.lookup("А123ВС77") is False
+    assert plate_index.full_reloads == 2
+
+
+def test_stale_index_falls_back_to_database(plate_source):
+    plate_index = PlateIndex(plate_source, max_staleness=0)
+    asyncio.run(plate_index.load())
+    assert plate_index.lookup("А123ВС77") is None
+
+
+def test_check_access_queries_plate_key():
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from src.database.models import Base, Vehicle, VehicleType
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as session:
+            # plate_key заполняется по license_plate автоматически
+            session.add(Vehicle(license_plate="А123ВС 77", vehicle_type=VehicleType.CAR))
+            await session.commit()
+
+            manager = AccessManager()
+            single = await manager.check_access("a123bc77", session)
+            batch = await manager.check_access_batch(["A123BC 77", "Х999ХХ01"], session)
+        await engine.dispose()
+        return single, batch
+
+    single, batch = asyncio.run(scenario())
+    assert single is True
+    assert batch == {"A123BC 77": True, "Х999ХХ01": False}
@@ -0,0 +1,39 @@
+import pytest
+
+from benchmarks.common import compare_to_baseline, summarize
+
+
+def _report(p50_ms, throughput, p99_ms=10.0):
+    return {"scenarios": {"check_access_db": {"p50_ms": p50_ms, "p99_ms": p99_ms, "throughput_per_s": throughput}}}
+
+
+def test_summarize_reports_percentiles_and_throughput():
+    summary = summarize([0.001] * 99 + [0.1], elapsed=2.0)
+    assert summary["throughput_per_s"] == 50.0
+    assert summary["p50_ms"] == 1.0 and summary["p99_ms"] == 100.0
+
+
+def test_compare_to_baseline_flags_only_significant_gated_regressions():
+    baseline = _report(p50_ms=10.0, throughput=100.0)
+
+    slower = {c["metric"]: c for c in compare_to_baseline(_report(20.0, 60.0, p99_ms=50.0), baseline)}
+    assert slower["p50_ms"]["regression"] and slower["throughput_per_s"]["regression"]
+    # Хвост задержек только сравнивается
+    assert not slower["p99_ms"]["regression"]
+
+    # Ухудшение меньше min_delta_ms - шум, а не регрессия
+    noisy = compare_to_baseline(_report(0.02, 100.0), _report(0.01, 100.0))
+    assert not any(c["regression"] for c in noisy)
+
+
+def test_detector_parity_comparison():
+    from benchmarks.detector_parity import compare_detections
+
+    reference = [(10, 10, 100, 20, 0.9), None, (10, 10, 100, 20, 0.8), None]
+    candidate = [(11, 10, 100, 20, 0.85), None, None, (0, 0, 5, 5, 0.6)]
+
+    parity = compare_detections(reference, candidate, iou_threshold=0.9)
+
+    assert parity["agreement"] == 0.5
+    assert parity["missed"] == 1 and parity["extra"] == 1
+    assert parity["max_confidence_delta"] == pytest.approx(0.05)
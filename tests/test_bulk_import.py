@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+
+from src.database.bulk_import import MAX_CHUNK_SIZE, bulk_import_vehicles, iter_json_rows, parse_vehicle_row
+from src.database.models import VehicleType
+
+
+def test_iter_json_rows_streams_array(tmp_path):
+    rows = [{"number": f"А{i:03d}ВС", "region": "77", "vehicle_type": "car"} for i in range(50)]
+    path = tmp_path / "plates.json"
+    path.write_text(json.dumps(rows, ensure_ascii=False, indent=4), encoding="utf-8")
+
+    # Маленький буфер заставляет объекты пересекать границы блоков чтения
+    assert list(iter_json_rows(str(path), buffer_size=16)) == rows
+
+
+def test_iter_json_rows_reads_ndjson(tmp_path):
+    path = tmp_path / "plates.ndjson"
+    path.write_text('{"a": 1}\n{"a": 2}\n', encoding="utf-8")
+    assert list(iter_json_rows(str(path))) == [{"a": 1}, {"a": 2}]
+
+
+def test_parse_vehicle_row_accepts_russian_vehicle_type():
+    row = {"number": "Т623С", "region": "146", "vehicle_type": "Грузовой автомобиль"}
+    assert parse_vehicle_row(row) == {
+        "license_plate": "Т623С146",
+        "plate_key": "Т623С146",
+        "plate_number": "Т623С",
+        "plate_region": "146",
+        "vehicle_type": VehicleType.TRUCK,
+    }
+
+
+def test_bulk_import_deduplicates_by_plate_key():
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from src.database.models import Base, Vehicle
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        # Латиница и кириллица - один номер: и внутри части, и между частями
+        rows = [
+            {"license_plate": "A123BC77", "vehicle_type": "car"},
+            {"license_plate": "А123ВС77", "vehicle_type": "car"},
+            {"license_plate": "Х999ХХ01", "vehicle_type": "truck"},
+            {"license_plate": "a123bc 77", "vehicle_type": "truck"},
+        ]
+        first = await bulk_import_vehicles(rows[:3], chunk_size=3, session_factory=session_factory)
+        second = await bulk_import_vehicles(rows[3:], update=True, session_factory=session_factory)
+        async with session_factory() as session:
+            vehicles = (await session.execute(select(Vehicle).order_by(Vehicle.id))).scalars().all()
+        await engine.dispose()
+        return first, second, vehicles
+
+    first, second, vehicles = asyncio.run(scenario())
+    assert (first.written, first.skipped) == (2, 1)
+    assert second.written == 1
+    assert [(v.plate_key, v.vehicle_type.value) for v in vehicles] == [("А123ВС77", "truck"), ("Х999ХХ01", "truck")]
+
+
+@pytest.mark.parametrize("chunk_size", [0, MAX_CHUNK_SIZE + 1])
+def test_bulk_import_rejects_chunk_size_over_parameter_limit(chunk_size):
+    assert MAX_CHUNK_SIZE == 32766 // 5
+    with pytest.raises(ValueError):
+        asyncio.run(bulk_import_vehicles([], chunk_size=chunk_size, session_factory=None))
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from src.recognition.camera_manager import CameraManager, parse_camera_sources
+from src.recognition.frame_queue import DropPolicy
+from src.recognition.pipeline import FramePacket
+
+
+@pytest.fixture
+def make_manager():
+    managers = []
+
+    def factory(lanes: int, max_batch: int) -> CameraManager:
+        # Источники не открываются: конвейеры полос не запускаются, кадры кладутся в очереди
+        # напрямую и не вытесняют друг друга
+        manager = CameraManager(
+            [f"fake-{index}" for index in range(lanes)],
+            queue_size=16,
+            drop_policy=DropPolicy.OLDEST,
+            max_batch=max_batch,
+            display=False,
+        )
+        managers.append(manager)
+        return manager
+
+    yield factory
+    for manager in managers:
+        manager.stop()
+
+
+def feed(lane, count: int) -> None:
+    for frame_id in range(count):
+        lane.detection_queue.put(FramePacket(frame_id, lane.camera_id, np.zeros((8, 8, 3), np.uint8), 0.0))
+
+
+def lanes_of(batch):
+    return [lane.camera_id for lane, _ in batch]
+
+
+def test_parse_camera_sources():
+    assert parse_camera_sources("0, rtsp://camera-1/stream,,video.mp4") == [0, "rtsp://camera-1/stream", "video.mp4"]
+
+
+def test_every_lane_gets_one_frame_per_batch(make_manager):
+    manager = make_manager(lanes=3, max_batch=8)
+    for lane in manager.lanes:
+        feed(lane, 4)
+
+    batches = [manager._collect_batch() for _ in range(4)]
+
+    for batch in batches:
+        assert sorted(lanes_of(batch)) == ["lane-0", "lane-1", "lane-2"]
+    # Кадры каждой полосы идут по порядку
+    assert [packet.frame_id for batch in batches for lane, packet in batch if lane.camera_id == "lane-1"] == [0, 1, 2, 3]
+    assert manager._collect_batch() == []
+
+
+def test_busy_lane_does_not_starve_slow_lanes(make_manager):
+    # Пачка меньше числа полос: загруженная полоса 0 не должна занимать все места
+    manager = make_manager(lanes=3, max_batch=2)
+    busy, slow_1, slow_2 = manager.lanes
+    feed(busy, 12)
+    feed(slow_1, 1)
+    feed(slow_2, 1)
+
+    first, second = manager._collect_batch(), manager._collect_batch()
+
+    assert len(first) == len(second) == 2
+    assert all(lanes_of(batch).count("lane-0") <= 1 for batch in (first, second))
+    assert {"lane-1", "lane-2"} <= set(lanes_of(first) + lanes_of(second))
+
+    # Редкий кадр медленной полосы попадает уже в следующую пачку
+    feed(slow_2, 1)
+    assert "lane-2" in lanes_of(manager._collect_batch()) + lanes_of(manager._collect_batch())
+
+
+def test_stopped_lane_is_skipped(make_manager):
+    manager = make_manager(lanes=2, max_batch=2)
+    feed(manager.lanes[0], 1)
+    feed(manager.lanes[1], 1)
+    manager.lanes[0].stop()
+
+    assert lanes_of(manager._collect_batch()) == ["lane-1"]
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from src.recognition.detector import TensorDetector, calibration_frames, create_detector, decode_yolov8, letterbox
+from src.recognition.image_processing import PreprocessPipeline
+
+
+def _yolo_output(boxes, size: int, classes: int = 1, anchors: int = 50) -> np.ndarray:
+    """Выход YOLOv8 (4 + classes, anchors): заданные боксы (cx, cy, w, h, score), остальное - фон."""
+    output = np.zeros((4 + classes, anchors), dtype=np.float32)
+    output[:4] = size / 2
+    for index, (cx, cy, w, h, score) in enumerate(boxes):
+        output[:, index] = [cx, cy, w, h, score] + [0.0] * (classes - 1)
+    return output
+
+
+class FakeTensorDetector(TensorDetector):
+    """Модель, всегда находящая номер в центре входа; размер пачки - 1, как у статического экспорта."""
+
+    name = "fake"
+    max_batch = 1
+
+    def __init__(self, imgsz: int = 320):
+        super().__init__(imgsz)
+        self.batches = []
+
+    def _infer(self, batch):
+        self.batches.append(batch.shape)
+        center = self.imgsz / 2
+        return np.stack([_yolo_output([(center, center, 100, 20, 0.9)], self.imgsz) for _ in batch])
+
+
+def test_letterbox_keeps_aspect_ratio():
+    frame = np.full((480, 640), 200, dtype=np.uint8)
+
+    image, scale, (pad_x, pad_y) = letterbox(frame, 320)
+
+    assert image.shape == (320, 320, 3)
+    assert scale == 0.5 and (pad_x, pad_y) == (0, 40)
+    assert image[0, 0, 0] == 114 and image[160, 160, 0] == 200
+
+
+def test_decode_maps_boxes_to_frame_and_suppresses_duplicates():
+    # Два почти одинаковых бокса и один слабый кандидат ниже порога
+    output = _yolo_output([(160, 160, 100, 20, 0.9), (161, 160, 100, 20, 0.8), (50, 50, 10, 10, 0.1)], 320)
+
+    boxes = decode_yolov8(output, scale=0.5, pad=(0, 40), frame_shape=(480, 640))
+
+    assert boxes.conf.tolist() == pytest.approx([0.9])
+    assert boxes.xyxy[0].tolist() == pytest.approx([220, 220, 420, 260])
+
+
+def test_tensor_detector_splits_static_batch():
+    detector = FakeTensorDetector()
+    frames = [np.zeros((480, 640, 3), dtype=np.uint8) for _ in range(3)]
+
+    results = detector(frames)
+
+    assert detector.batches == [(1, 3, 320, 320)] * 3
+    assert len(results) == 3 and results[2].boxes.xyxy[0].tolist() == pytest.approx([220, 220, 420, 260])
+    assert detector.stats()["frames"] == 3
+
+
+def test_create_detector_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        create_detector("tensorrt", "models/yolov8s.engine")
+
+
+def test_calibration_frames_use_detector_preprocessing():
+    frames = calibration_frames(2, 160, preprocess=PreprocessPipeline.from_spec("gray,canny:30:200"))
+
+    assert [frame.shape for frame in frames] == [(160, 160, 3)] * 2
+    # Вход модели - контуры в оттенках серого, как во время работы, а не цветной кадр
+    for frame in frames:
+        assert np.array_equal(frame[..., 0], frame[..., 2])
+    assert not np.array_equal(frames[0], frames[1])
+    raw = calibration_frames(1, 160, preprocess=PreprocessPipeline.from_spec(""))[0]
+    assert not np.array_equal(raw[..., 0], raw[..., 2])
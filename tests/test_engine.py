@@ -0,0 +1,34 @@
+import asyncio
+
+from sqlalchemy import text
+
+from src.config.config import Config
+from src.database.engine import EngineRegistry
+
+
+def test_burst_queues_on_pool_and_reports_metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(Config, "DB_MAX_OVERFLOW", 0)
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+
+    async def scenario():
+        registry = EngineRegistry()
+        engine = registry.get(url)
+        assert registry.get(url) is engine
+
+        async def query():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await asyncio.sleep(0.02)
+
+        # Пять одновременных запросов ждут единственное соединение пула
+        await asyncio.gather(*(query() for _ in range(5)))
+        stats = next(iter(registry.stats().values()))
+        await registry.dispose()
+        return stats, registry.stats()
+
+    stats, after_dispose = asyncio.run(scenario())
+    assert stats["size"] == 1 and stats["checked_out"] == 0
+    assert stats["checkouts"] == 5 and stats["connects"] == 1
+    assert stats["waits"] >= 3 and stats["wait_seconds_max"] > 0.01
+    assert after_dispose == {}
@@ -0,0 +1,73 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.access_control.access_manager import AccessManager
+from src.access_control.event_journal import AccessEventJournal, query_access_events
+from src.access_control.plate_cache import PlateIndex, StaticPlateSource
+from src.database.models import Base
+
+
+async def _session_factory():
+    # Одно соединение на все сессии: иначе каждая получит свою пустую базу в памяти
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def test_check_access_is_journaled_on_close():
+    async def scenario():
+        engine, session_factory = await _session_factory()
+        plate_index = PlateIndex(StaticPlateSource(["А123ВС77"]), max_staleness=60, fuzzy_max_distance=0.5)
+        await plate_index.load()
+        journal = AccessEventJournal(session_factory, batch_size=100, flush_interval=60)
+        journal.start()
+        manager = AccessManager(plate_index=plate_index, journal=journal)
+
+        await manager.check_access("A123BC77", None, lane="lane-0", ocr_confidence=0.9, source="video")
+        await manager.check_access("А1238С77", None)
+        await manager.check_access("Х999ХХ01", None)
+        # Проверка доступа не пишет в базу: события ждут в очереди
+        assert len(journal) == 3
+
+        await journal.close()
+        async with session_factory() as session:
+            history = await query_access_events(session, license_plate="а123вс 77")
+            fuzzy = await query_access_events(session, license_plate="А1238С77")
+            everything = await query_access_events(session)
+        await engine.dispose()
+        return journal, history, fuzzy, everything
+
+    journal, history, fuzzy, everything = asyncio.run(scenario())
+    assert journal.stats()["written"] == 3 and journal.stats()["queued"] == 0
+    assert [(e.lane, e.source, e.access_granted, e.ocr_confidence) for e in history] == [
+        ("lane-0", "video", True, 0.9)
+    ]
+    # Нечеткое совпадение записывается для оператора, но доступ не разрешает
+    assert (fuzzy[0].matched_plate, fuzzy[0].access_granted) == ("А123ВС77", False)
+    assert len(everything) == 3
+
+
+def test_journal_flushes_by_size_and_requeues_on_failure():
+    async def scenario():
+        engine, session_factory = await _session_factory()
+        journal = AccessEventJournal(session_factory, batch_size=2, flush_interval=60)
+        journal.start()
+        for plate in ("А001АА77", "А002АА77"):
+            journal.record(plate, True, decision_ms=0.1)
+        await asyncio.sleep(0.1)
+        flushed_by_size = journal.written
+
+        await engine.dispose()
+        broken = AccessEventJournal(lambda: None, batch_size=2)
+        broken.record("А003АА77", False, decision_ms=0.1)
+        await broken.flush()
+        await journal.close()
+        return flushed_by_size, broken
+
+    flushed_by_size, broken = asyncio.run(scenario())
+    assert flushed_by_size == 2
+    assert len(broken) == 1 and broken.failed_flushes == 1
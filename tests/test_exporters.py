@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import pytest
+
+from src.data_generation.exporters import aread_dataset, export_dataset, read_dataset, write_dataset
+from src.data_generation.license_plate_generator import LicensePlate, generate_dataset_chunks
+from src.database.models import VehicleType
+
+
+@pytest.mark.parametrize("extension", ["ndjson", "json", "csv", "parquet"])
+def test_round_trip_preserves_rows(tmp_path, extension):
+    if extension == "parquet":
+        pytest.importorskip("pyarrow")
+    chunks = list(generate_dataset_chunks(2_500, chunk_size=1_000, seed=4))
+    expected = [row for chunk in chunks for row in chunk.rows()]
+    path = str(tmp_path / f"plates.{extension}")
+
+    assert write_dataset(iter(chunks), path, batch_size=300) == len(expected)
+    assert list(read_dataset(path)) == expected
+
+
+@pytest.mark.parametrize("extension", ["ndjson", "json", "csv", "parquet"])
+def test_failed_write_removes_partial_file(tmp_path, extension):
+    if extension == "parquet":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / f"plates.{extension}"
+
+    def failing_items():
+        yield LicensePlate("А123ВС", "77", VehicleType.CAR)
+        raise RuntimeError("генератор упал")
+
+    with pytest.raises(RuntimeError):
+        write_dataset(failing_items(), str(path), batch_size=1)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_json_export_is_valid_array(tmp_path):
+    path = tmp_path / "plates.json"
+    plates = [LicensePlate("А123ВС", "77", VehicleType.CAR), LicensePlate("1234АВ", "01", VehicleType.MOTORCYCLE)]
+
+    asyncio.run(export_dataset(plates, str(path)))
+
+    assert json.loads(path.read_text(encoding="utf-8")) == [
+        {"number": "А123ВС", "region": "77", "vehicle_type": VehicleType.CAR.value},
+        {"number": "1234АВ", "region": "01", "vehicle_type": VehicleType.MOTORCYCLE.value},
+    ]
+    assert not (tmp_path / "plates.json.part").exists()
+
+
+def test_async_reader_yields_batches(tmp_path):
+    path = str(tmp_path / "plates.ndjson")
+    write_dataset(generate_dataset_chunks(25, seed=5), path)
+
+    async def collect():
+        return [len(batch) async for batch in aread_dataset(path, batch_size=10)]
+
+    assert asyncio.run(collect()) == [10, 10, 5]
@@ -0,0 +1,38 @@
+import pytest
+
+from src.recognition.frame_queue import DropPolicy, FrameQueue
+
+
+@pytest.fixture
+def oldest_queue():
+    return FrameQueue("test", maxsize=2, drop_policy=DropPolicy.OLDEST)
+
+
+def test_drop_oldest_keeps_newest_items(oldest_queue):
+    # При переполнении выбрасывается самый старый кадр
+    for frame_id in range(5):
+        oldest_queue.put(frame_id)
+
+    assert oldest_queue.get(timeout=0) == 3
+    assert oldest_queue.get(timeout=0) == 4
+    assert oldest_queue.stats()["dropped"] == 3
+
+
+def test_latest_frame_wins():
+    queue = FrameQueue("test", drop_policy=DropPolicy.LATEST)
+    for frame_id in range(3):
+        queue.put(frame_id)
+
+    assert len(queue) == 1
+    assert queue.get(timeout=0) == 2
+    assert queue.stats()["dropped"] == 2
+
+
+def test_latest_policy_is_single_slot():
+    with pytest.raises(ValueError):
+        FrameQueue("test", maxsize=4, drop_policy=DropPolicy.LATEST)
+
+
+def test_get_returns_none_when_closed(oldest_queue):
+    oldest_queue.close()
+    assert oldest_queue.get(timeout=1) is None
@@ -0,0 +1,63 @@
+import pytest
+
+from src.access_control.fuzzy_match import CONFUSION_COSTS, MIN_CONFUSION_COST, FuzzyPlateIndex, plate_distance
+from src.config.config import Config
+from src.utils.plate_format import normalize_plate
+
+
+@pytest.fixture
+def fuzzy_index():
+    return FuzzyPlateIndex(["А123ВС77", "Е456КМ199", "1234АВ50"])
+
+
+def test_normalize_plate_folds_latin_letters():
+    # Латинские A, B, C и кириллические А, В, С - один и тот же номер
+    assert normalize_plate(" a123bc 77\n") == "А123ВС77"
+
+
+def test_confusion_is_cheaper_than_edit():
+    assert plate_distance("А123ВС77", "А123ВС77") == 0.0
+    assert plate_distance("А123ВС77", "А123ВС7Т") < 1.0
+    assert plate_distance("А123ВС77", "А123ВС79") == 1.0
+
+
+def test_lookup_tolerates_ocr_confusions(fuzzy_index):
+    match = fuzzy_index.lookup("A123BC7T", max_distance=0.5)
+    assert match.plate == "А123ВС77"
+    assert 0 < match.distance <= 0.5
+
+
+def test_lookup_respects_max_distance(fuzzy_index):
+    assert fuzzy_index.lookup("А123ВС79", max_distance=0.5) is None
+    assert fuzzy_index.lookup("А123ВС79", max_distance=1.0).plate == "А123ВС77"
+
+
+def test_added_plate_is_found(fuzzy_index):
+    fuzzy_index.add("О777ОО77")
+    assert fuzzy_index.lookup("0777OO77", max_distance=1.0).plate == "О777ОО77"
+
+
+def test_every_confusion_is_found_without_spending_edits():
+    # Замена путаемых символов не должна расходовать бюджет правок индекса
+    plates = ["А123ВС77", "О555ТХ50"]
+    index = FuzzyPlateIndex(plates, max_edits=0)
+    for letter, digit in CONFUSION_COSTS:
+        plate = next(plate for plate in plates if letter in plate)
+        query = plate.replace(letter, digit, 1)
+        assert index.lookup(query, max_distance=0.5).plate == plate
+
+
+def test_distinct_plates_are_not_confusions(fuzzy_index):
+    # Похожие буквы и цифры одного класса дают другой существующий номер
+    assert plate_distance("А155ВС77", "А156ВС77") == 1.0
+    assert plate_distance("Е456КН199", "Е456КМ199") == 1.0
+    assert fuzzy_index.lookup("Е456КН199", max_distance=0.5) is None
+
+
+def test_default_threshold_journals_confusions_without_granting():
+    # "О123ВС77" и "0123ВС77" - разные допустимые номера (легковой и мотоциклетный)
+    assert plate_distance("О123ВС77", "0123ВС77") == MIN_CONFUSION_COST
+    # Одна замена находится и попадает в журнал, но доступ по ней не разрешается
+    assert Config().FUZZY_MATCH_MAX_DISTANCE >= max(CONFUSION_COSTS.values())
+    assert Config().FUZZY_MATCH_MAX_DISTANCE < 2 * MIN_CONFUSION_COST
+    assert Config().FUZZY_MATCH_GRANT is False
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from src.recognition.image_processing import MotionGate
+
+
+@pytest.fixture
+def motion_gate():
+    # Область интереса - нижняя половина кадра
+    return MotionGate(roi=[[0, 0.5], [1, 0.5], [1, 1], [0, 1]], hold_frames=0)
+
+
+def test_static_scene_is_skipped(motion_gate):
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    for _ in range(5):
+        motion_gate.check(frame)
+
+    assert motion_gate.check(frame) is False
+    assert motion_gate.stats()["skipped"] >= 5
+
+
+def test_motion_inside_roi_wakes_up(motion_gate):
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    motion_gate.check(frame)
+
+    moved = frame.copy()
+    moved[160:220, 100:200] = 255  # Автомобиль в зоне подъезда
+    assert motion_gate.check(moved) is True
+    assert motion_gate.stats()["wakeups"] == 1
+
+
+def test_motion_outside_roi_is_ignored(motion_gate):
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    motion_gate.check(frame)
+
+    moved = frame.copy()
+    moved[10:80, 100:200] = 255  # Движение выше области интереса
+    assert motion_gate.check(moved) is False
+
+
+def _plate(angle: float = 0.0) -> np.ndarray:
+    """Светлая табличка с темной строкой символов, повернутой на angle градусов."""
+    import cv2
+
+    image = np.full((80, 240, 3), 230, dtype=np.uint8)
+    for x in range(20, 220, 25):
+        cv2.rectangle(image, (x, 30), (x + 15, 50), (20, 20, 20), thickness=-1)
+    rotation = cv2.getRotationMatrix2D((120, 40), angle, 1.0)
+    return cv2.warpAffine(image, rotation, (240, 80), borderMode=cv2.BORDER_REPLICATE)
+
+
+def test_pipeline_from_spec():
+    from src.recognition.image_processing import PreprocessPipeline
+
+    pipeline = PreprocessPipeline.from_spec("resize:320, gray,blur:4,binarize:adaptive:15:5")
+
+    assert pipeline.spec == "resize:320,gray,blur:5,binarize:adaptive:15:5"
+    assert not PreprocessPipeline.from_spec("none")
+    with pytest.raises(ValueError):
+        PreprocessPipeline.from_spec("sharpen")
+
+
+def test_pipeline_reuses_buffers_and_reports_timing():
+    from src.recognition.image_processing import PreprocessPipeline
+
+    pipeline = PreprocessPipeline.from_spec("resize:320,gray,canny:30:200")
+    frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    first = pipeline(frame)
+    assert first.shape == (240, 320)
+    assert pipeline(frame) is first  # Тот же буфер, без выделения памяти
+    assert pipeline(frame, slot=1) is not first
+
+    stats = pipeline.stats()
+    assert stats["calls"] == 3
+    assert list(stats["avg_step_ms"]) == ["resize:320", "gray", "canny:30:200"]
+
+
+def test_binarize_otsu_produces_two_levels():
+    from src.recognition.image_processing import PreprocessPipeline
+
+    binary = PreprocessPipeline.from_spec("gray,binarize:otsu")(_plate())
+
+    assert set(np.unique(binary)) == {0, 255}
+
+
+def test_deskew_straightens_plate():
+    from src.recognition.image_processing import Deskew
+
+    deskew = Deskew(max_angle=15)
+    straightened = deskew(_plate(angle=8), slot=0)
+
+    assert abs(deskew.last_angle) == pytest.approx(8, abs=1.5)
+    assert abs(deskew.estimate_angle(straightened, slot=1)) < 1.5
+
+
+def test_downscaled_detection_maps_box_to_frame(monkeypatch):
+    from benchmarks.stubs import StubDetector, make_frame
+    from src.recognition import image_processing, plate_recognition
+
+    synthetic = make_frame("A123BC77", width=1280, height=960, seed=3)
+    pipeline = image_processing.PreprocessPipeline.from_spec("resize:640,gray,canny:30:200")
+    monkeypatch.setattr(image_processing, "_pipelines", {"detector": pipeline})
+    plate_recognition.set_model(StubDetector())
+    try:
+        box = plate_recognition.detect_plate(synthetic.frame)
+    finally:
+        plate_recognition.set_model(None)
+
+    # Детектор видел кадр 640x480, бокс возвращается в координатах исходного кадра
+    assert np.allclose(box[:4], synthetic.box, atol=4)
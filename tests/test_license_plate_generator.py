@@ -0,0 +1,36 @@
+import re
+
+import numpy as np
+
+from src.data_generation.license_plate_generator import LicensePlateGenerator, generate_dataset_chunks
+from src.database.models import VehicleType
+
+LETTERS = LicensePlateGenerator.ALLOWED_LETTERS
+PASSENGER_RE = re.compile(f"[{LETTERS}]\\d{{3}}[{LETTERS}]{{2}}")
+MOTORCYCLE_RE = re.compile(f"\\d{{4}}[{LETTERS}]{{2}}")
+
+
+def test_chunks_are_unique_across_dataset():
+    chunks = list(generate_dataset_chunks(50_000, chunk_size=7_000, seed=1))
+    assert [len(chunk) for chunk in chunks][-1] == 50_000 - 7 * 7_000
+
+    plates = np.concatenate([np.char.add(chunk.numbers, chunk.regions) for chunk in chunks])
+    assert len(np.unique(plates)) == 50_000
+
+
+def test_plates_match_vehicle_type_format():
+    chunk = next(generate_dataset_chunks(1_000, seed=2))
+    regions = set(LicensePlateGenerator.REGIONS)
+    for plate in chunk.plates():
+        assert plate.region in regions
+        if plate.vehicle_type == VehicleType.MOTORCYCLE:
+            assert MOTORCYCLE_RE.fullmatch(plate.number)
+        else:
+            assert PASSENGER_RE.fullmatch(plate.number)
+
+
+def test_seed_makes_dataset_reproducible():
+    first = next(generate_dataset_chunks(100, seed=3))
+    second = next(generate_dataset_chunks(100, seed=3))
+    assert (first.numbers == second.numbers).all()
+    assert (first.vehicle_types == second.vehicle_types).all()
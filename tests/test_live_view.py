@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from src.recognition.live_view import LiveView
+
+
+def test_frames_are_encoded_once_for_all_viewers_at_capped_fps():
+    view = LiveView("lane-test", fps=10, quality=60, max_width=160)
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+
+    # Без зрителей публикация ничего не делает
+    view.publish(frame)
+    assert view.published == 0
+
+    async def scenario():
+        received = [[] for _ in range(3)]
+
+        async def viewer(index):
+            async for chunk in view.stream():
+                received[index].append(chunk)
+                if len(received[index]) == 3:
+                    break
+
+        stop = threading.Event()
+
+        def camera():
+            while not stop.is_set():
+                view.publish(frame, box=(10, 10, 50, 20, 0.9), text="А123ВС77")
+                time.sleep(0.002)
+
+        thread = threading.Thread(target=camera, daemon=True)
+        viewers = [asyncio.create_task(viewer(index)) for index in range(3)]
+        await asyncio.sleep(0.05)
+        started_at = time.monotonic()
+        thread.start()
+        await asyncio.wait_for(asyncio.gather(*viewers), timeout=5)
+        stop.set()
+        thread.join()
+        return received, time.monotonic() - started_at
+
+    received, elapsed = asyncio.run(scenario())
+    view.close()
+
+    assert view.viewers == 0
+    # Все зрители получают один и тот же объект - кадр кодируется один раз
+    assert all(chunk is other for chunk, other in zip(received[0], received[1]))
+    assert received[0][0].startswith(b"--frame\r\nContent-Type: image/jpeg")
+    assert view.published > view.encoded
+    assert view.encoded <= elapsed * 10 + 2
+
+
+def test_display_annotation_does_not_modify_published_frame(monkeypatch):
+    from src.recognition import pipeline as pipeline_module
+    from src.recognition.pipeline import FramePacket, VideoPipeline
+
+    published, shown = [], []
+
+    class RecordingView:
+        def publish(self, frame, box=None, text=None):
+            published.append((frame, frame.copy()))
+
+    video = VideoPipeline("fake", display=True, live_view=RecordingView())
+
+    def imshow(name, frame):
+        shown.append(frame)
+        video.stop()
+
+    monkeypatch.setattr(pipeline_module.cv2, "imshow", imshow)
+    monkeypatch.setattr(pipeline_module.cv2, "waitKey", lambda delay: -1)
+
+    frame = np.zeros((120, 320, 3), dtype=np.uint8)
+    video.decision_queue.put(FramePacket(0, "fake", frame, 0.0, box=(0, 0, 10, 10, 0.9), text="А123ВС77"))
+    decision = threading.Thread(target=video._decision_worker)
+    decision.start()
+    video._display_worker()
+    decision.join()
+
+    (sent, snapshot), = published
+    assert sent is frame
+    assert np.array_equal(frame, snapshot)
+    # Надпись нарисована на копии, показанной в окне
+    assert shown[0] is not frame and shown[0].any()
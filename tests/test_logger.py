@@ -0,0 +1,36 @@
+import json
+import logging
+
+from src.utils.logger import JsonLinesFormatter, RateLimitFilter
+
+
+def _record(msg, *args, name="recognition", level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 0, msg, args, None)
+
+
+def test_rate_limit_filter_suppresses_repeated_template():
+    rate_filter = RateLimitFilter(rate=0.0001, burst=2)
+    passed = [rate_filter.filter(_record("Распознан номер: %s", i)) for i in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    # Другой шаблон, предупреждения и другие компоненты не ограничиваются
+    assert rate_filter.filter(_record("Начало распознавания на %d кадрах", 1))
+    assert rate_filter.filter(_record("Распознан номер: %s", 6, level=logging.WARNING))
+    assert rate_filter.filter(_record("Распознан номер: %s", 7, name="access_control"))
+
+
+def test_rate_limit_filter_reports_suppressed_count():
+    rate_filter = RateLimitFilter(rate=1000.0, burst=1)
+    rate_filter.filter(_record("Распознан номер: %s", 1))
+    rate_filter.filter(_record("Распознан номер: %s", 2))
+    rate_filter._buckets[("recognition", "Распознан номер: %s")][0] = 1.0
+
+    record = _record("Распознан номер: %s", 3)
+    assert rate_filter.filter(record)
+    assert record.suppressed == 1
+
+
+def test_json_lines_formatter_formats_arguments():
+    entry = json.loads(JsonLinesFormatter().format(_record("Распознан номер: %s", "А123ВС77")))
+    assert entry["message"] == "Распознан номер: А123ВС77"
+    assert entry["logger"] == "recognition" and entry["level"] == "INFO"
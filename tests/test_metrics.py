@@ -0,0 +1,50 @@
+from src.utils.metrics import (
+    REGISTRY,
+    observe_stage,
+    register_stats,
+    render_metrics,
+    set_metrics_enabled,
+    stage_timer,
+    stats_collector,
+)
+
+
+def _stage_count(stage):
+    return REGISTRY.get_sample_value("parking_stage_seconds_count", {"stage": stage}) or 0.0
+
+
+def test_stage_timer_records_and_can_be_disabled():
+    before = _stage_count("test_stage")
+    with stage_timer("test_stage"):
+        pass
+    observe_stage("test_stage", 0.01)
+    assert _stage_count("test_stage") == before + 2
+
+    set_metrics_enabled(False)
+    try:
+        with stage_timer("test_stage"):
+            pass
+        observe_stage("test_stage", 0.01)
+    finally:
+        set_metrics_enabled(True)
+    assert _stage_count("test_stage") == before + 2
+
+
+def test_stats_sources_are_exported_as_gauges_and_counters():
+    register_stats(
+        "test_pipeline",
+        lambda: [({"camera": 0}, {"queues": {"detection": {"dropped": 3, "depth": 2}}, "id": "x"})],
+    )
+    register_stats("test_broken", lambda: 1 / 0)
+    try:
+        text = render_metrics().decode()
+        types = {family.name: family.type for family in stats_collector.collect()}
+    finally:
+        stats_collector.unregister("test_pipeline")
+        stats_collector.unregister("test_broken")
+    # Растущие счетчики - counter с суффиксом _total, текущие значения - gauge
+    assert types["parking_test_pipeline_queues_detection_dropped"] == "counter"
+    assert types["parking_test_pipeline_queues_detection_depth"] == "gauge"
+    assert 'parking_test_pipeline_queues_detection_dropped_total{camera="0"} 3.0' in text
+    assert 'parking_test_pipeline_queues_detection_depth{camera="0"} 2.0' in text
+    assert "parking_test_pipeline_id" not in text
@@ -0,0 +1,60 @@
+import sqlite3
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+
+from src.database.database import _upgrade_to_head
+from src.database.models import Base
+
+
+def upgrade(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        _upgrade_to_head(connection)
+    return engine
+
+
+def test_empty_database_is_migrated_to_models(tmp_path):
+    engine = upgrade(tmp_path / "empty.db")
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        assert context.get_current_revision() == "0004_plate_region"
+        # Схема после миграций совпадает с моделями (кроме таблицы удаленных повторов)
+        diff = [
+            change for change in compare_metadata(context, Base.metadata)
+            if not (change[0] == "remove_table" and change[1].name == "vehicles_plate_key_duplicates")
+        ]
+    assert diff == []
+    engine.dispose()
+
+
+def test_database_created_before_migrations_is_upgraded(tmp_path):
+    # Таблица vehicles в том виде, в каком ее создавал create_all до миграций
+    path = tmp_path / "legacy.db"
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE vehicles (id INTEGER PRIMARY KEY, license_plate VARCHAR NOT NULL UNIQUE, "
+        "vehicle_type VARCHAR(10) NOT NULL)"
+    )
+    connection.executemany(
+        "INSERT INTO vehicles (license_plate, vehicle_type) VALUES (?, 'CAR')",
+        [("А123ВС77",), ("A123BC77",), ("Е456КМ199",), ("ABC1234",)],
+    )
+    connection.commit()
+
+    upgrade(path).dispose()
+
+    rows = connection.execute(
+        "SELECT license_plate, plate_key, plate_number, plate_region FROM vehicles ORDER BY id"
+    ).fetchall()
+    assert rows == [
+        ("А123ВС77", "А123ВС77", "А123ВС", "77"),
+        ("Е456КМ199", "Е456КМ199", "Е456КМ", "199"),
+        ("ABC1234", "АВС1234", "АВС1234", None),
+    ]
+    # Повтор номера в другом написании не потерян
+    assert connection.execute("SELECT license_plate FROM vehicles_plate_key_duplicates").fetchall() == [
+        ("A123BC77",)
+    ]
+    connection.close()
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from src.data_generation.plate_renderer import RenderOptions, render_sample
+from src.recognition.ocr_cache import OcrCache, OcrCacheRegistry, crop_signature
+from src.recognition.ocr_engine import OcrResult
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _plate(number: str, region: str = "77", seed: int = 0) -> np.ndarray:
+    # Одинаковое зерно - одинаковые перспектива и аугментации, различается только текст
+    options = RenderOptions(scene=False, blur=0, motion_blur=0, noise=0, night=0)
+    return render_sample(number, region, "car", np.random.default_rng(seed), options)[0]
+
+
+def _noisy(crop: np.ndarray, seed: int) -> np.ndarray:
+    noise = np.random.default_rng(seed).normal(0, 4, crop.shape)
+    return np.clip(crop + noise, 0, 255).astype(np.uint8)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return OcrCache(max_bytes=1024 * 1024, ttl=10, max_distance=8, max_difference=0.06, clock=clock)
+
+
+def test_repeated_crop_is_served_from_cache(cache):
+    crop = _plate("А123ВС")
+    cache.put(crop_signature(crop), OcrResult("А123ВС77", 0.9))
+
+    result = cache.get(crop_signature(_noisy(crop, seed=1)))
+
+    assert result.text == "А123ВС77"
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("number, region", [("А128ВС", "77"), ("А123ВС", "78")])
+def test_plate_differing_by_one_character_is_not_a_hit(cache, number, region):
+    for seed in range(20):
+        cache.clear()
+        cache.put(crop_signature(_plate("А123ВС", seed=seed)), OcrResult("А123ВС77"))
+        assert cache.get(crop_signature(_plate(number, region, seed=seed))) is None
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    crop = _plate("А123ВС")
+    cache.put(crop_signature(crop), OcrResult("А123ВС77"))
+
+    clock.now = 11
+    assert cache.get(crop_signature(crop)) is None
+    assert cache.stats()["expirations"] == 1 and len(cache) == 0
+
+
+def test_memory_ceiling_evicts_least_recently_used(clock):
+    crops = [_plate(number, seed=index) for index, number in enumerate(["А123ВС", "В456КМ", "Е789ОР"])]
+    signatures = [crop_signature(crop) for crop in crops]
+    # Места хватает ровно на две записи
+    cache = OcrCache(max_bytes=2 * signatures[0].thumbnail.nbytes + 1000, ttl=10, clock=clock)
+    cache.put(signatures[0], OcrResult("А123ВС77"))
+    cache.put(signatures[1], OcrResult("В456КМ77"))
+    cache.get(signatures[0])  # Первая запись использована позже второй
+
+    cache.put(signatures[2], OcrResult("Е789ОР77"))
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert cache.get(signatures[0]) is not None and cache.get(signatures[1]) is None
+
+
+def test_read_batch_reads_only_misses_and_skips_empty_results(cache):
+    calls = []
+
+    def read_batch(crops):
+        calls.append(len(crops))
+        return [OcrResult("А123ВС77"), OcrResult("")] if len(crops) == 2 else [OcrResult("")]
+
+    first, second = _plate("А123ВС"), _plate("В456КМ", seed=5)
+    cache.read_batch([first, second], read_batch)
+    results = cache.read_batch([_noisy(first, seed=2), second], read_batch)
+
+    assert calls == [2, 1]  # Пустой результат не сохраняется и читается заново
+    assert results[0].text == "А123ВС77"
+
+
+def test_registry_scopes_caches_per_camera():
+    registry = OcrCacheRegistry()
+
+    assert registry.get("lane-0") is registry.get("lane-0")
+    assert registry.get("lane-0") is not registry.get("lane-1")
+    assert set(registry.stats()) == {"lane-0", "lane-1"}
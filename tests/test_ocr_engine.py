@@ -0,0 +1,118 @@
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+
+from src.recognition.ocr_engine import OcrEngine, OcrResult, TesserocrEngine, close_ocr_engine, set_ocr_engine
+
+
+class ScriptedEngine(OcrEngine):
+    """Движок, который по тексту "изображения" отвечает, зависает или падает."""
+
+    def __init__(self, workers: int = 2, timeout: float = 0.2):
+        super().__init__(workers, timeout)
+        self.release = threading.Event()
+
+    def _read_one(self, crop) -> OcrResult:
+        text = crop.tobytes().decode()
+        if text == "hang":
+            self.release.wait(5)
+        if text == "fail":
+            raise RuntimeError("tesseract упал")
+        return OcrResult(text.upper(), 0.9)
+
+
+def crop(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode(), dtype=np.uint8)
+
+
+def test_batch_timeout_is_one_deadline_for_the_batch():
+    engine = ScriptedEngine(workers=2, timeout=0.2)
+    try:
+        started_at = time.perf_counter()
+        results = engine.read_batch([crop("hang"), crop("a1"), crop("hang"), crop("b2")])
+        elapsed = time.perf_counter() - started_at
+
+        # Два зависших изображения не удваивают ожидание: срок один на пачку,
+        # а номер, не начатый к сроку, отменяется
+        assert elapsed < 0.4
+        assert [result.text for result in results] == ["", "A1", "", ""]
+        assert engine.stats()["timeouts"] == 3 and engine.stats()["stuck_workers"] == 2
+
+        # Все воркеры заняты: следующая пачка не ждет в очереди за зависшими
+        started_at = time.perf_counter()
+        assert engine.read_batch([crop("c3")])[0].text == ""
+        assert time.perf_counter() - started_at < 0.1
+        assert engine.stats()["skipped"] == 1
+
+        engine.release.set()
+        time.sleep(0.05)
+        assert engine.stats()["stuck_workers"] == 0
+        assert engine.read(crop("c3")).text == "C3"
+    finally:
+        engine.release.set()
+        engine.close()
+
+
+def test_failed_read_returns_empty_text():
+    engine = ScriptedEngine(workers=2, timeout=1.0)
+    try:
+        results = engine.read_batch([crop("a1"), crop("fail"), crop("b2")])
+        assert [result.text for result in results] == ["A1", "", "B2"]
+        assert engine.stats()["errors"] == 1
+    finally:
+        engine.close()
+
+
+def test_close_ocr_engine_stops_shared_engine_once():
+    engine = ScriptedEngine(workers=1)
+    closed = []
+    close = engine.close
+    engine.close = lambda: (closed.append(engine), close())
+    set_ocr_engine(engine)
+
+    close_ocr_engine()
+    close_ocr_engine()
+
+    assert closed == [engine]
+    set_ocr_engine(None)
+
+
+class FakeTessApi:
+    """PyTessBaseAPI, распознавание которого ждет разрешения теста."""
+
+    release = threading.Event()
+
+    def __init__(self, lang, psm):
+        self.ended = threading.Event()
+
+    def SetImage(self, image):
+        pass
+
+    def GetUTF8Text(self):
+        self.release.wait(5)
+        return "A123BC77"
+
+    def MeanTextConf(self):
+        return 90
+
+    def End(self):
+        self.ended.set()
+
+
+def test_tesserocr_api_stuck_at_close_is_ended(monkeypatch):
+    fake = types.SimpleNamespace(PyTessBaseAPI=FakeTessApi, PSM=types.SimpleNamespace(SINGLE_WORD=8))
+    monkeypatch.setitem(sys.modules, "tesserocr", fake)
+    engine = TesserocrEngine(workers=1, timeout=0.1)
+    api = engine._apis.queue[0]
+
+    # Распознавание зависает после срока пачки и продолжается после закрытия движка
+    assert engine.read(np.zeros((8, 8), np.uint8)).text == ""
+    engine.close()
+    assert not api.ended.is_set()
+    FakeTessApi.release.set()
+
+    assert api.ended.wait(5)
+    assert engine._apis.empty()
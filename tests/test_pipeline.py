@@ -0,0 +1,79 @@
+import numpy as np
+
+from src.config.config import Config
+from src.recognition import pipeline
+from src.recognition.frame_queue import DropPolicy
+from src.recognition.pipeline import FramePacket, VideoPipeline
+
+
+def make_packet(frame_id, text=None):
+    return FramePacket(frame_id, "fake", np.zeros((8, 8, 3), np.uint8), 0.0, text=text)
+
+
+def test_display_frames_do_not_evict_decisions():
+    # Источник не открывается: стадии не запускаются, очереди заполняются напрямую
+    video = VideoPipeline("fake", queue_size=1, drop_policy=DropPolicy.LATEST, display=True, live_view=None)
+    decisions = [make_packet(index, text=f"А{index:03d}ВС77") for index in range(5)]
+
+    for index, decision in enumerate(decisions):
+        video.decision_queue.put(decision)
+        # Кадры без номера, пока окно OpenCV не успевает их показывать
+        for frame_id in range(10):
+            video.dispatch_detection(make_packet(100 * index + frame_id), None, 0.0)
+
+    assert [video.decision_queue.get(timeout=0) for _ in decisions] == decisions
+    assert video.decision_queue.dropped_count == 0
+    # Для отображения остается только самый свежий кадр
+    assert video.display_queue.get(timeout=0).frame_id == 409
+    assert video.display_queue.get(timeout=0) is None
+    video.stop()
+
+
+class FakeCapture:
+    """cv2.VideoCapture, отдающий заранее заданные результаты чтения."""
+
+    def __init__(self, reads):
+        self.reads = list(reads)
+        self.released = False
+
+    def read(self):
+        return self.reads.pop(0) if self.reads else (False, None)
+
+    def release(self):
+        self.released = True
+
+
+def run_capture(monkeypatch, source, captures):
+    monkeypatch.setattr(Config, "CAMERA_RECONNECT_DELAY", 0.01)
+    monkeypatch.setattr(Config, "CAMERA_RECONNECT_MAX_DELAY", 0.02)
+    opened = []
+
+    def open_capture(value):
+        capture = captures.pop(0) if captures else video.stop() or FakeCapture([])
+        opened.append(capture)
+        return capture
+
+    monkeypatch.setattr(pipeline.cv2, "VideoCapture", open_capture)
+    video = VideoPipeline(source, display=False, live_view=None)
+    video._capture_worker()
+    return video, opened
+
+
+def test_stream_is_reopened_after_failed_read(monkeypatch):
+    frame = np.zeros((8, 8, 3), np.uint8)
+    captures = [FakeCapture([]), FakeCapture([]), FakeCapture([(True, frame)])]
+
+    video, opened = run_capture(monkeypatch, "rtsp://camera-1/stream", captures)
+
+    # Кадр приходит после двух переподключений; третье останавливает конвейер
+    assert video.reconnects == 3
+    assert video.stage_stats["capture"].processed == 1
+    assert all(capture.released for capture in opened)
+
+
+def test_video_file_is_not_reopened(monkeypatch):
+    video, opened = run_capture(monkeypatch, "video.mp4", [FakeCapture([])])
+
+    assert video.reconnects == 0
+    assert len(opened) == 1
+    assert video.stopped
@@ -0,0 +1,11 @@
+from src.utils.plate_format import plate_key, split_plate
+
+
+def test_plate_key_is_canonical():
+    assert plate_key("а123вс 77") == plate_key("A123BC77") == plate_key("А123ВС", "77") == "А123ВС77"
+
+
+def test_split_plate_separates_region():
+    assert split_plate("a123bc 777") == ("А123ВС", "777")
+    assert split_plate("1234 AB 05") == ("1234АВ", "05")
+    assert split_plate("ABC1234") == ("АВС1234", None)
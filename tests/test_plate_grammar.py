@@ -0,0 +1,60 @@
+import pytest
+
+from src.recognition.plate_grammar import PlateGrammar, validate_plate
+
+
+@pytest.fixture
+def grammar():
+    return PlateGrammar(["X000XX", "0000XX"], "АВЕКМНОРСТУХ", ["77", "50", "199"])
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("А123ВС77", "А123ВС77"),
+        # Латиница, нижний регистр, пробелы, перевод строки и надпись RUS
+        ("a123bc 77\n", "А123ВС77"),
+        ("A 123 BC | 199 RUS", "А123ВС199"),
+        ("1234 AB 50", "1234АВ50"),
+    ],
+)
+def test_normalizes_valid_reads(grammar, text, expected):
+    assert grammar.normalize(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        # Буква на месте цифры и цифра на месте буквы
+        ("А12ЗВС77", "А123ВС77"),
+        ("AI23BC77", "А123ВС77"),
+        ("A1230C77", "А123ОС77"),
+        ("A123BC7T", "А123ВС77"),
+    ],
+)
+def test_corrects_confusions_by_position(grammar, text, expected):
+    assert grammar.normalize(text) == expected
+    assert grammar.stats()["corrected"] == 1
+
+
+@pytest.mark.parametrize(
+    "text",
+    # Последние два - по одному исправлению в разных участках (B -> 8 и D -> О)
+    [None, "", "|--", "А123ВС", "А123ВС78", "ЖЖЖ", "А123ВС77777", "ABCDEF77", "AB12CD77", "0B12CD77"],
+)
+def test_rejects_garbage(grammar, text):
+    assert grammar.normalize(text) is None
+
+
+def test_stats_count_repeated_reads(grammar):
+    assert grammar.normalize_batch(["A123BC77", "A123BC77", "O12ЗBC77", "???"]) == [
+        "А123ВС77", "А123ВС77", "О123ВС77", None
+    ]
+    stats = grammar.stats()
+    assert (stats["checked"], stats["accepted"], stats["corrected"], stats["rejected"]) == (4, 3, 1, 1)
+
+
+def test_validate_plate_uses_generator_formats():
+    assert validate_plate("x777xx 199") == "Х777ХХ199"
+    assert validate_plate("1234 AB 55") == "1234АВ55"
+    assert validate_plate("А123ВС00") is None
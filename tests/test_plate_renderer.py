@@ -0,0 +1,38 @@
+import json
+import os
+
+import numpy as np
+
+from src.data_generation.plate_renderer import RenderOptions, render_dataset, render_plate, render_sample
+
+
+def _read_labels(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_render_plate_layouts():
+    assert render_plate("А123ВС", "77", "car").shape == (112, 520, 3)
+    assert render_plate("1234АВ", "05", "motorcycle").shape == (160, 245, 3)
+
+
+def test_render_sample_box_covers_plate_inside_frame():
+    options = RenderOptions(width=320, height=240, plate_width=(80, 120), blur=1.0, noise=1.0, night=1.0)
+    frame, label = render_sample("А123ВС", "77", "car", np.random.default_rng(1), options)
+    x, y, w, h = label["box"]
+    assert frame.shape == (240, 320, 3)
+    assert 0 <= x and 0 <= y and x + w <= 320 and y + h <= 240
+    assert label["license_plate"] == "А123ВС77"
+    assert label["augmentations"]["night"] and "blur_sigma" in label["augmentations"]
+
+
+def test_render_dataset_is_reproducible_across_workers(tmp_path):
+    options = RenderOptions(width=160, height=120, plate_width=(60, 90))
+    single = render_dataset(6, str(tmp_path / "single"), workers=1, seed=3, options=options, chunk_size=4, yolo_labels=True)
+    pooled = render_dataset(6, str(tmp_path / "pooled"), workers=2, seed=3, options=options, chunk_size=4)
+
+    labels = _read_labels(single.labels_path)
+    assert single.rendered == pooled.rendered == 6
+    assert labels == _read_labels(pooled.labels_path)
+    assert all(os.path.exists(tmp_path / "single" / label["image"]) for label in labels)
+    assert len(os.listdir(tmp_path / "single" / "labels")) == 6
@@ -1,18 +1,114 @@
-from src.recognition.plate_recognition import recognize_plate
+import numpy as np
+import pytest
 
+from benchmarks.stubs import StubDetector, StubOcrEngine, make_frame
+from src.recognition.ocr_engine import set_ocr_engine
+from src.recognition.plate_recognition import (
+    _select_best_box,
+    recognize_plate_from_frame,
+    recognize_plates_from_frames,
+    set_model,
+)
 
-def test_recognize_plate_valid_image():
-    # Функция recognize_plate принимает изображение и возвращает номерной знак
-    image_path = "tests/data/valid_plate.jpg"
-    expected_plate_number = "ABC1234"
 
-    result = recognize_plate(image_path)
-    assert result == expected_plate_number, f"Expected {expected_plate_number}, but got {result}"
+@pytest.fixture
+def stub_models():
+    # Детектор и OCR - заглушки: тест не требует весов YOLO и Tesseract
+    ocr_engine = StubOcrEngine(text="A123BC77")
+    set_model(StubDetector())
+    set_ocr_engine(ocr_engine)
+    yield ocr_engine
+    set_model(None)
+    set_ocr_engine(None)
+    ocr_engine.close()
 
 
-def test_recognize_plate_invalid_image():
-    # Тестируем случай, когда изображение не содержит номерного знака
-    image_path = "tests/data/no_plate.jpg"
+def test_recognize_plate_valid_image(stub_models):
+    synthetic = make_frame("A123BC77", seed=3)
 
-    result = recognize_plate(image_path)
-    assert result is None, f"Expected None for image without a plate, but got {result}"
+    result = recognize_plates_from_frames([synthetic.frame])[0]
+    # Латинские двойники заменяются кириллицей по формату номера
+    assert result.raw_text == "A123BC77"
+    assert result.text == "А123ВС77"
+    # Бокс детектора совпадает с табличкой с точностью до границ Canny
+    x, y, w, h = synthetic.box
+    assert abs(result.box[0] - x) <= 2 and abs(result.box[1] - y) <= 2
+    assert result.crop.shape[:2] == (result.box[3], result.box[2])
+
+
+def test_recognize_plate_invalid_image(stub_models):
+    # Однородный кадр без номерного знака: детектор ничего не находит
+    frame = np.full((480, 640, 3), 60, dtype=np.uint8)
+
+    assert recognize_plate_from_frame(frame) is None
+
+
+def test_recognize_plate_rejects_garbage(stub_models):
+    synthetic = make_frame("A123BC77", seed=3)
+    stub_models.text = "|-- 1I"
+
+    # Отдельная камера: в кэше OCR камеры по умолчанию этот номер уже прочитан
+    result = recognize_plates_from_frames([synthetic.frame], camera_id="garbage")[0]
+    assert result.raw_text == "|-- 1I"
+    assert result.text is None
+
+
+def test_recognize_plates_batch_keeps_frame_order(stub_models):
+    first, second = make_frame("A123BC77", seed=3), make_frame("A123BC77", seed=5)
+    blank = np.full((480, 640, 3), 60, dtype=np.uint8)
+
+    results = recognize_plates_from_frames([first.frame, blank, second.frame], camera_id="batch")
+
+    assert results[1] is None
+    for result, synthetic in ((results[0], first), (results[2], second)):
+        assert abs(result.box[0] - synthetic.box[0]) <= 2 and abs(result.box[1] - synthetic.box[1]) <= 2
+
+
+class Boxes:
+    """Боксы результата YOLO: массивы xyxy и conf."""
+
+    def __init__(self, xyxy, conf):
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+
+
+def legacy_select_best_box(boxes):
+    """Прежний выбор бокса: обход боксов по одному, порог 0.5, первый из самых уверенных."""
+    selected, confidences = [], []
+    for xyxy, confidence in zip(boxes.xyxy, boxes.conf):
+        x1, y1, x2, y2 = map(int, xyxy)
+        if confidence > 0.5:
+            selected.append([x1, y1, x2 - x1, y2 - y1])
+            confidences.append(float(confidence))
+    if not selected:
+        return None
+    best = int(np.argmax(confidences))
+    return (*selected[best], confidences[best])
+
+
+def test_select_best_box_matches_per_box_selection():
+    rng = np.random.default_rng(3)
+    frame_shape = (480, 640, 3)
+    for count in range(0, 40):
+        x1 = rng.uniform(0, 500, count)
+        y1 = rng.uniform(0, 400, count)
+        xyxy = np.stack([x1, y1, x1 + rng.uniform(5, 140, count), y1 + rng.uniform(5, 80, count)], axis=1)
+        # Уверенности с повторами и значениями ровно на пороге
+        conf = rng.choice([0.3, 0.5, 0.51, 0.7, 0.9, 0.9], count)
+        boxes = Boxes(xyxy, conf)
+        assert _select_best_box(boxes, frame_shape) == legacy_select_best_box(boxes)
+
+
+def test_select_best_box_edge_cases():
+    frame_shape = (480, 640, 3)
+    assert _select_best_box(Boxes([], []), frame_shape) is None
+    assert _select_best_box(Boxes([[10, 10, 50, 30]], [0.5]), frame_shape) is None
+
+    # При равной уверенности выбирается первый бокс
+    tie = Boxes([[10, 10, 50, 30], [100, 100, 180, 130]], [0.8, 0.8])
+    assert _select_best_box(tie, frame_shape)[:4] == (10, 10, 40, 20)
+
+    # Бокс на уменьшенном входе пересчитывается в координаты кадра и обрезается по его краям
+    scaled = Boxes([[100, 50, 330, 80]], [0.9])
+    assert _select_best_box(scaled, frame_shape, scale=(2.0, 2.0))[:4] == (200, 100, 440, 60)
+    assert _select_best_box(Boxes([[300, 200, 400, 260]], [0.9]), frame_shape, (2.0, 2.0))[:4] == (600, 400, 40, 80)
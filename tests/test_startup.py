@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.startup import HEAVY_MODULES
+
+_SCRIPT = """
+import json, os, sys
+import src.web.app, src.database.database, src.database.engine, src.recognition.plate_recognition
+app = src.web.app.create_app()
+print(json.dumps({
+    "heavy": [m for m in %r if m in sys.modules],
+    "files": os.listdir("."),
+    "engines": len(src.database.engine.engines.stats()),
+    "routes": [route.path for route in app.routes],
+}))
+"""
+
+
+def test_imports_have_no_side_effects(tmp_path):
+    # Импорт в чистом процессе из пустого каталога: не должно появиться ни файлов логов,
+    # ни движка базы данных, ни torch/ultralytics
+    result = subprocess.run(
+        [sys.executable, "-c", _SCRIPT % (HEAVY_MODULES,)],
+        cwd=tmp_path, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parents[1])},
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report["heavy"] == []
+    assert report["files"] == []
+    assert report["engines"] == 0
+    assert "/ready" in report["routes"]
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from src.recognition.tracking import PlateTracker, box_iou
+
+
+@pytest.fixture
+def tracker():
+    return PlateTracker(iou_threshold=0.3, track_timeout=1.0, max_reads=3, decision_timeout=10.0)
+
+
+def make_crop(sharpness: int):
+    # Чем больше полос, тем резче изображение для crop_quality
+    crop = np.zeros((20, 60, 3), dtype=np.uint8)
+    crop[:, ::max(1, 60 // sharpness)] = 255
+    return crop
+
+
+def test_box_iou():
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (20, 20, 10, 10)) == 0.0
+
+
+def test_same_plate_keeps_track_id(tracker):
+    first = tracker.update((100, 100, 60, 20), now=0.0)
+    second = tracker.update((104, 101, 60, 20), now=0.1)
+    assert first.track_id == second.track_id
+    assert second.hits == 2
+
+
+def test_ocr_only_on_better_crops(tracker):
+    track = tracker.update((100, 100, 60, 20), now=0.0)
+    assert tracker.should_read(track, make_crop(10)) is True
+    tracker.add_read(track, "А123ВС77\n", 0.9, now=0.0)
+
+    # Такое же изображение повторно не читается
+    assert tracker.should_read(track, make_crop(10)) is False
+    assert tracker.stats()["ocr_skipped"] == 1
+
+
+def test_single_decision_per_track_by_weighted_vote(tracker):
+    track = tracker.update((100, 100, 60, 20), now=0.0)
+    tracker.add_read(track, "А123ВС77", 0.9, now=0.0)
+    tracker.add_read(track, "А123ВС71", 0.4, now=0.1)
+    tracker.add_read(track, "А123ВС77", 0.8, now=0.2)
+
+    decisions = tracker.pop_decisions(now=0.3)
+    assert [decision.text for decision in decisions] == ["А123ВС77"]
+
+    # Повторные детекции того же номера не порождают новых решений
+    tracker.update((101, 100, 60, 20), now=0.4)
+    assert tracker.pop_decisions(now=0.5) == []
+
+
+def test_garbage_reads_do_not_vote(tracker):
+    track = tracker.update((100, 100, 60, 20), now=0.0)
+    tracker.add_read(track, "|-- 1I", 0.99, now=0.0)
+    tracker.add_read(track, "A123BC 77", 0.5, now=0.1)
+
+    assert tracker.stats()["rejected_reads"] == 1
+    assert [decision.text for decision in tracker.pop_decisions(now=2.0)] == ["А123ВС77"]
+
+
+def test_next_car_in_same_place_gets_new_decision(tracker):
+    # Детекции каждые 0.1 с
+    for now in (0.0, 0.1, 0.2):
+        first = tracker.update((100, 100, 60, 20), now=now)
+        tracker.add_read(first, "А123ВС77", 0.9, now=now)
+    assert [decision.text for decision in tracker.pop_decisions(now=0.2)] == ["А123ВС77"]
+
+    # Первый автомобиль уехал, второй встал на то же место раньше track_timeout,
+    # но после перерыва в несколько интервалов между детекциями
+    second = tracker.update((102, 100, 60, 20), now=0.8)
+    assert second.track_id != first.track_id
+    assert tracker.should_read(second, make_crop(10)) is True
+    tracker.add_read(second, "Е456КМ199", 0.9, now=0.8)
+    assert [decision.text for decision in tracker.pop_decisions(now=2.0)] == ["Е456КМ199"]
+
+
+def test_parked_car_with_slow_detection_gets_one_decision():
+    # Детекция медленнее прежнего фиксированного порога (CPU, пропуск кадров, пачки полос)
+    tracker = PlateTracker(iou_threshold=0.3, track_timeout=1.0, max_reads=3, decision_timeout=0.5)
+    decisions = []
+    for step in range(13):
+        now = step * 0.4
+        track = tracker.update((100 + step % 2, 100, 60, 20), now=now)
+        if tracker.should_read(track, make_crop(10 + step)):
+            tracker.add_read(track, "А123ВС77", 0.9, now=now)
+        decisions += tracker.pop_decisions(now)
+    decisions += tracker.pop_decisions(now=10.0)
+
+    assert [decision.text for decision in decisions] == ["А123ВС77"]
+    assert tracker.stats()["ocr_calls"] <= 3
+
+
+def test_decision_carries_ocr_confidence_of_voted_text(tracker):
+    track = tracker.update((100, 100, 60, 20), now=0.0)
+    tracker.add_read(track, "А123ВС77", 0.9, now=0.0, ocr_confidence=0.9)
+    tracker.add_read(track, "А123ВС71", 0.5, now=0.1, ocr_confidence=0.5)
+    tracker.add_read(track, "А123ВС77", 0.7, now=0.2, ocr_confidence=0.7)
+
+    decision, = tracker.pop_decisions(now=0.3)
+    assert decision.text == "А123ВС77"
+    assert decision.ocr_confidence == pytest.approx(0.8)
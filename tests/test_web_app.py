@@ -0,0 +1,203 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.config.config import Config
+from src.database import database
+from src.database.models import Vehicle, VehicleType
+
+PLATES = ["Х999ХХ01", "a123bc 77", "Е456КМ199", "А123ВС77", "О001ОО50"]
+EXPECTED = [
+    {"license_plate": "Х999ХХ01", "access_granted": False},
+    {"license_plate": "a123bc 77", "access_granted": True},
+    {"license_plate": "Е456КМ199", "access_granted": True},
+    {"license_plate": "А123ВС77", "access_granted": True},
+    {"license_plate": "О001ОО50", "access_granted": False},
+]
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Общая база приложения - временный файл SQLite; индекс номеров не загружен,
+    # поэтому проверки идут в базу
+    monkeypatch.setattr(Config, "DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path / 'web.db'}")
+
+    async def setup():
+        await database.dispose_engines()
+        await database.create_database()
+        async with database.AsyncSessionLocal() as session:
+            session.add_all([
+                Vehicle(license_plate="А123ВС77", vehicle_type=VehicleType.CAR),
+                Vehicle(license_plate="Е456КМ199", vehicle_type=VehicleType.TRUCK),
+            ])
+            await session.commit()
+
+    asyncio.run(setup())
+    from src.web.app import create_app
+
+    yield create_app()
+    asyncio.run(database.dispose_engines())
+
+
+def post_batch(app, plates):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/check_access/batch", json={"plates": plates})
+
+    return asyncio.run(scenario())
+
+
+def test_batch_returns_decisions_in_request_order(app):
+    response = post_batch(app, PLATES + ["А123ВС77"])
+
+    assert response.status_code == 200
+    # Повторы номера схлопываются, порядок - порядок первого появления
+    assert response.json() == EXPECTED
+
+
+def test_large_batch_is_streamed_in_chunks(app, monkeypatch):
+    monkeypatch.setattr(Config, "BATCH_STREAM_THRESHOLD", 2)
+
+    response = post_batch(app, PLATES)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    # Части по BATCH_STREAM_THRESHOLD номеров склеиваются в один корректный массив
+    assert json.loads(response.text) == EXPECTED
+
+
+def test_streamed_batch_deduplicates_across_chunks(app, monkeypatch):
+    from src.web import app as app_module
+
+    chunks = []
+    check_access_batch = app_module.access_manager.check_access_batch
+
+    async def recording_check(plates, db_session):
+        chunks.append(list(plates))
+        return await check_access_batch(plates, db_session)
+
+    monkeypatch.setattr(app_module.access_manager, "check_access_batch", recording_check)
+    monkeypatch.setattr(Config, "BATCH_STREAM_THRESHOLD", 2)
+
+    # Повторы попадают в разные части, если делить исходный список
+    response = post_batch(app, ["А123ВС77"] + PLATES + ["Х999ХХ01", "А123ВС77"])
+
+    assert json.loads(response.text) == [EXPECTED[3]] + [item for item in EXPECTED if item != EXPECTED[3]]
+    # Каждый номер проверяется один раз, результат совпадает с обычным ответом
+    assert sum(len(chunk) for chunk in chunks) == len(PLATES)
+    monkeypatch.setattr(Config, "BATCH_STREAM_THRESHOLD", 1000)
+    assert post_batch(app, ["А123ВС77"] + PLATES + ["Х999ХХ01", "А123ВС77"]).json() == json.loads(response.text)
+
+
+def test_zero_stream_threshold_streams_every_plate(app, monkeypatch):
+    monkeypatch.setattr(Config, "BATCH_STREAM_THRESHOLD", 0)
+
+    assert json.loads(post_batch(app, PLATES).text) == EXPECTED
+
+
+def test_empty_batch(app):
+    assert post_batch(app, []).json() == []
+
+
+def test_metrics_toggle_requires_configured_token(app, monkeypatch):
+    from src.utils.metrics import metrics_enabled, set_metrics_enabled
+
+    async def toggle(headers):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/metrics/toggle", params={"enabled": "false"}, headers=headers)
+
+    # Без токена в конфигурации сбор метрик задается только METRICS_ENABLED
+    monkeypatch.setattr(Config, "METRICS_TOGGLE_TOKEN", "")
+    assert asyncio.run(toggle({"X-Metrics-Token": "secret"})).status_code == 404
+
+    monkeypatch.setattr(Config, "METRICS_TOGGLE_TOKEN", "secret")
+    assert asyncio.run(toggle({})).status_code == 403
+    assert asyncio.run(toggle({"X-Metrics-Token": "wrong"})).status_code == 403
+    assert metrics_enabled()
+
+    try:
+        response = asyncio.run(toggle({"X-Metrics-Token": "secret"}))
+        assert response.status_code == 200
+        assert response.json() == {"enabled": False}
+    finally:
+        set_metrics_enabled(True)
+
+
+def test_video_decisions_are_checked_in_the_app_loop(app, monkeypatch):
+    from src.recognition.pipeline import FramePacket
+    from src.web import app as app_module
+
+    calls = []
+
+    async def recording_check(license_plate, db_session, **journal_fields):
+        calls.append((license_plate, journal_fields))
+        return True
+
+    monkeypatch.setattr(app_module.access_manager, "check_access", recording_check)
+
+    async def scenario():
+        on_plate = app_module.video_access_handler(asyncio.get_running_loop())
+        packet = FramePacket(1, "lane-1", None, 0.0, text="А123ВС77", track_id=7, confidence=0.8)
+        # Обработчик вызывается из потока стадии решения
+        await asyncio.to_thread(on_plate, packet)
+        while not calls:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert calls == [("А123ВС77", {"lane": "lane-1", "ocr_confidence": 0.8, "source": "video"})]
+
+
+def test_video_decision_fills_journal_lane_and_confidence(app, monkeypatch):
+    from src.access_control.event_journal import AccessEventJournal
+    from src.web import app as app_module
+
+    journal = AccessEventJournal(database.AsyncSessionLocal, batch_size=100, flush_interval=60)
+    monkeypatch.setattr(app_module.access_manager, "journal", journal)
+
+    async def scenario():
+        granted = await app_module.check_video_plate("A123BC77", "lane-1", 0.8)
+        await journal.flush()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return granted, await client.get("/access_events", params={"lane": "lane-1"})
+
+    granted, response = asyncio.run(scenario())
+    assert granted is True
+    event, = response.json()
+    assert (event["license_plate"], event["lane"], event["ocr_confidence"], event["source"]) == (
+        "A123BC77", "lane-1", 0.8, "video"
+    )
+
+
+def test_lifespan_runs_video_processing_when_enabled(monkeypatch):
+    from src.web import app as app_module
+
+    events = []
+
+    class FakeManager:
+        def stop(self):
+            events.append("stop")
+
+    class FakeThread:
+        def join(self, timeout=None):
+            events.append("join")
+
+    def start_video_processing(loop):
+        events.append("start")
+        return FakeManager(), FakeThread()
+
+    monkeypatch.setattr(Config, "MODEL_PRELOAD", False)
+    monkeypatch.setattr(app_module, "start_video_processing", start_video_processing)
+
+    async def run(video_app):
+        async with video_app.router.lifespan_context(video_app):
+            events.append("serving")
+
+    asyncio.run(run(app_module.create_app(video=False)))
+    assert events == ["serving"]
+    asyncio.run(run(app_module.create_app(video=True)))
+    assert events == ["serving", "start", "serving", "stop", "join"]